@@ -0,0 +1,170 @@
+// Modales con contenido bajo demanda: el botón que abre el modal indica en
+// data-url el fragmento a cargar, y solo se pide cuando el modal se abre.
+// El navegador revalida con ETag, así que un modal ya visto vuelve con 304.
+(function () {
+    function cargar(contenido, url) {
+        contenido.innerHTML = '<div class="modal-body text-center py-5"><div class="spinner-border text-primary"></div></div>';
+        fetch(url, { headers: { 'X-Requested-With': 'XMLHttpRequest' }, credentials: 'same-origin' })
+            .then(function (respuesta) {
+                if (!respuesta.ok) {
+                    throw new Error(respuesta.status);
+                }
+                return respuesta.text();
+            })
+            .then(function (html) {
+                contenido.innerHTML = html;
+            })
+            .catch(function () {
+                contenido.innerHTML = '<div class="modal-body"><div class="alert alert-danger mb-0">No se pudo cargar la información.</div></div>';
+            });
+    }
+
+    document.addEventListener('show.bs.modal', function (evento) {
+        var disparador = evento.relatedTarget;
+        if (!disparador || !disparador.dataset.url) {
+            return;
+        }
+        cargar(evento.target.querySelector('.modal-content'), disparador.dataset.url);
+    });
+
+    // Botones dentro de un fragmento que reemplazan el contenido del modal
+    document.addEventListener('click', function (evento) {
+        var boton = evento.target.closest('[data-cargar-url]');
+        if (boton) {
+            cargar(boton.closest('.modal-content'), boton.dataset.cargarUrl);
+        }
+    });
+})();
+
+// Campos con autocompletado: en lugar de un <select> con todas las filas, el
+// contenedor .autocompletar tiene un input oculto con el id elegido, el texto
+// visible y un menú. Las sugerencias se piden a data-url?q= mientras se
+// escribe (con una pausa corta) y se recuerdan mientras la página esté abierta.
+(function () {
+    var ESPERA_MS = 200;
+    var MENSAJE = 'Seleccione una opción de la lista';
+    var recordadas = {};
+
+    function partes(contenedor) {
+        return {
+            valor: contenedor.querySelector('input[type="hidden"]'),
+            texto: contenedor.querySelector('input[type="text"]'),
+            menu: contenedor.querySelector('.dropdown-menu')
+        };
+    }
+
+    function cerrar(contenedor) {
+        partes(contenedor).menu.classList.remove('show');
+    }
+
+    function mostrar(contenedor, resultados) {
+        var menu = partes(contenedor).menu;
+        menu.innerHTML = '';
+        if (!resultados.length) {
+            var vacio = document.createElement('span');
+            vacio.className = 'dropdown-item-text text-muted';
+            vacio.textContent = 'Sin resultados';
+            menu.appendChild(vacio);
+        }
+        resultados.forEach(function (resultado) {
+            var opcion = document.createElement('button');
+            opcion.type = 'button';
+            opcion.className = 'dropdown-item';
+            opcion.dataset.id = resultado.id;
+            opcion.textContent = resultado.texto;
+            menu.appendChild(opcion);
+        });
+        menu.classList.add('show');
+    }
+
+    function elegir(contenedor, opcion) {
+        var campo = partes(contenedor);
+        campo.valor.value = opcion.dataset.id;
+        campo.texto.value = opcion.textContent;
+        campo.texto.setCustomValidity('');
+        cerrar(contenedor);
+        campo.valor.dispatchEvent(new Event('change', { bubbles: true }));
+    }
+
+    function buscar(contenedor) {
+        var consulta = partes(contenedor).texto.value.trim();
+        var url = contenedor.dataset.url + '?q=' + encodeURIComponent(consulta);
+        if (recordadas[url]) {
+            mostrar(contenedor, recordadas[url]);
+            return;
+        }
+        if (contenedor.peticion) {
+            contenedor.peticion.abort();
+        }
+        contenedor.peticion = new AbortController();
+        fetch(url, { headers: { 'X-Requested-With': 'XMLHttpRequest' }, credentials: 'same-origin', signal: contenedor.peticion.signal })
+            .then(function (respuesta) {
+                if (!respuesta.ok) {
+                    throw new Error(respuesta.status);
+                }
+                return respuesta.json();
+            })
+            .then(function (datos) {
+                recordadas[url] = datos.resultados;
+                if (partes(contenedor).texto === document.activeElement) {
+                    mostrar(contenedor, datos.resultados);
+                }
+            })
+            .catch(function () {});
+    }
+
+    document.addEventListener('input', function (evento) {
+        var contenedor = evento.target.closest('.autocompletar');
+        if (!contenedor || evento.target.type !== 'text') {
+            return;
+        }
+        // Escribir anula la selección anterior hasta elegir otra opción
+        var campo = partes(contenedor);
+        campo.valor.value = '';
+        campo.texto.setCustomValidity(campo.texto.value.trim() ? MENSAJE : '');
+        clearTimeout(contenedor.pausa);
+        contenedor.pausa = setTimeout(function () { buscar(contenedor); }, ESPERA_MS);
+    });
+
+    document.addEventListener('focusin', function (evento) {
+        var contenedor = evento.target.closest('.autocompletar');
+        if (contenedor && evento.target.type === 'text') {
+            buscar(contenedor);
+        }
+    });
+
+    document.addEventListener('click', function (evento) {
+        var opcion = evento.target.closest('.autocompletar .dropdown-item[data-id]');
+        if (opcion) {
+            elegir(opcion.closest('.autocompletar'), opcion);
+        }
+        document.querySelectorAll('.autocompletar .dropdown-menu.show').forEach(function (menu) {
+            if (!menu.parentNode.contains(evento.target)) {
+                cerrar(menu.parentNode);
+            }
+        });
+    });
+
+    document.addEventListener('keydown', function (evento) {
+        var contenedor = evento.target.closest('.autocompletar');
+        if (!contenedor) {
+            return;
+        }
+        var opciones = Array.prototype.slice.call(contenedor.querySelectorAll('.dropdown-item[data-id]'));
+        var actual = opciones.indexOf(document.activeElement);
+        if (evento.key === 'ArrowDown' || evento.key === 'ArrowUp') {
+            evento.preventDefault();
+            var siguiente = actual + (evento.key === 'ArrowDown' ? 1 : -1);
+            if (siguiente < 0) {
+                partes(contenedor).texto.focus();
+            } else if (opciones[Math.min(siguiente, opciones.length - 1)]) {
+                opciones[Math.min(siguiente, opciones.length - 1)].focus();
+            }
+        } else if (evento.key === 'Enter' && actual < 0 && opciones.length && partes(contenedor).menu.classList.contains('show')) {
+            evento.preventDefault();
+            elegir(contenedor, opciones[0]);
+        } else if (evento.key === 'Escape') {
+            cerrar(contenedor);
+        }
+    });
+})();
@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class InventarioCaccConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'inventario_cacc'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,74 @@
+import hashlib
+
+from django.core.cache import cache
+
+from .busqueda import buscar_ids
+from .catalogo import version_catalogo
+from .models import Categoria, Cliente, Producto, Proveedor
+
+
+# =========================
+# AUTOCOMPLETADO DE FORMULARIOS
+# =========================
+# Los formularios ya no traen todos los productos, categorías, proveedores y
+# clientes como <option>: el campo pide sugerencias mientras se escribe y
+# cada respuesta trae como mucho LIMITE_SUGERENCIAS filas.
+#   - productos: índice invertido de búsqueda (prefijo de cualquier término
+#     del nombre, la categoría o la descripción), por relevancia,
+#   - categorías, proveedores y clientes: prefijo del nombre, sobre el
+#     índice de nombre de cada tabla.
+# Las respuestas se guardan TTL_SUGERENCIAS segundos en la caché de Django.
+# La clave lleva la versión del catálogo, así que un cambio de producto,
+# categoría, proveedor o stock no deja sugerencias viejas; los clientes solo
+# dependen del TTL.
+
+LIMITE_SUGERENCIAS = 20
+TTL_SUGERENCIAS = 30
+LONGITUD_MAXIMA_CONSULTA = 100
+
+
+def _productos(consulta, limite):
+    productos = Producto.objects.order_by('nombre')
+    ids = buscar_ids(consulta, limite) if consulta else None
+    if ids is not None:
+        # Respetar el orden por relevancia del índice
+        filas = {p['id']: p for p in productos.filter(id__in=ids).values('id', 'nombre', 'stock')}
+        filas = [filas[i] for i in ids if i in filas]
+    else:
+        # Sin términos de búsqueda (vacía o de una letra): prefijo del nombre
+        filas = list(productos.filter(nombre__istartswith=consulta).values('id', 'nombre', 'stock')[:limite])
+    return [
+        {'id': p['id'], 'texto': f"{p['nombre']} (Stock: {p['stock']})", 'stock': p['stock']}
+        for p in filas
+    ]
+
+
+def _por_nombre(modelo):
+    def sugerencias(consulta, limite):
+        filas = modelo.objects.filter(nombre__istartswith=consulta).order_by('nombre').values_list('id', 'nombre')[:limite]
+        return [{'id': id, 'texto': nombre} for id, nombre in filas]
+    return sugerencias
+
+
+FUENTES = {
+    'productos': _productos,
+    'categorias': _por_nombre(Categoria),
+    'proveedores': _por_nombre(Proveedor),
+    'clientes': _por_nombre(Cliente),
+}
+
+
+def sugerencias(tipo, consulta, limite=LIMITE_SUGERENCIAS):
+    """Lista de {'id', 'texto', ...} para el tipo indicado. KeyError si el tipo no existe."""
+    fuente = FUENTES[tipo]
+    consulta = ' '.join((consulta or '').split())[:LONGITUD_MAXIMA_CONSULTA]
+    limite = max(1, min(limite, LIMITE_SUGERENCIAS))
+
+    # istartswith y el índice no distinguen mayúsculas
+    huella = hashlib.md5(consulta.lower().encode()).hexdigest()
+    clave = f'autocompletar:{tipo}:{version_catalogo()}:{limite}:{huella}'
+    resultado = cache.get(clave)
+    if resultado is None:
+        resultado = fuente(consulta, limite)
+        cache.set(clave, resultado, TTL_SUGERENCIAS)
+    return resultado
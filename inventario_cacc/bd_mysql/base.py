@@ -0,0 +1,126 @@
+import threading
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.base.base import NO_DB_ALIAS
+from django.db.backends.mysql.base import Database
+from django.db.backends.mysql.base import DatabaseWrapper as MySQLDatabaseWrapper
+
+from .pool import PoolAgotado, PoolConexiones
+
+
+# =========================
+# BACKEND MYSQL CON POOL
+# =========================
+# El backend MySQL de Django con un pool de conexiones por alias, activado
+# con OPTIONS['pool'] (True o un diccionario con min_size, max_size,
+# timeout, max_lifetime, max_idle y check_idle; ver pool.py). Igual que el
+# pool del backend PostgreSQL de Django, exige CONN_MAX_AGE = 0: Django
+# "cierra" la conexión al terminar cada petición y eso la devuelve al pool.
+# Sin OPTIONS['pool'] se comporta exactamente como django.db.backends.mysql.
+
+def _conectar(parametros):
+    conexion = Database.connect(**parametros)
+    # Mismo ajuste que hace el backend de Django al conectar
+    if conexion.encoders.get(bytes) is bytes:
+        conexion.encoders.pop(bytes)
+    return conexion
+
+
+def _ping(conexion):
+    conexion.ping()
+    return True
+
+
+def _cerrar(conexion):
+    conexion.close()
+
+
+class DatabaseWrapper(MySQLDatabaseWrapper):
+    _pools = {}
+    _pools_lock = threading.Lock()
+
+    def _clave_pool(self):
+        # Las pruebas cambian NAME por el de la base de pruebas: es otro pool
+        ajustes = self.settings_dict
+        return (self.alias, ajustes['NAME'], ajustes['HOST'], ajustes['PORT'], ajustes['USER'])
+
+    @property
+    def pool(self):
+        opciones = self.settings_dict['OPTIONS'].get('pool')
+        if self.alias == NO_DB_ALIAS or not opciones:
+            return None
+
+        clave = self._clave_pool()
+        pool = self._pools.get(clave)
+        if pool is None:
+            if self.settings_dict.get('CONN_MAX_AGE', 0) != 0:
+                raise ImproperlyConfigured("El pool de conexiones no admite conexiones persistentes (CONN_MAX_AGE).")
+            opciones = {} if opciones is True else dict(opciones)
+            parametros = self.get_connection_params()
+            try:
+                pool = PoolConexiones(
+                    crear=lambda: _conectar(parametros),
+                    verificar=_ping,
+                    cerrar=_cerrar,
+                    **opciones,
+                )
+            except (TypeError, ValueError) as e:
+                raise ImproperlyConfigured(f"Opciones de pool no válidas para '{self.alias}': {e}")
+            with self._pools_lock:
+                pool = self._pools.setdefault(clave, pool)
+        return pool
+
+    def close_pool(self):
+        pool = self.pool
+        if pool:
+            pool.cerrar_todas()
+            with self._pools_lock:
+                self._pools.pop(self._clave_pool(), None)
+
+    def get_connection_params(self):
+        parametros = super().get_connection_params()
+        parametros.pop('pool', None)
+        return parametros
+
+    def get_new_connection(self, conn_params):
+        pool = self.pool
+        if pool is None:
+            return super().get_new_connection(conn_params)
+        try:
+            return pool.obtener()
+        except PoolAgotado as e:
+            raise Database.OperationalError(str(e)) from e
+
+    def init_connection_state(self):
+        # Las variables de sesión (aislamiento, SQL_AUTO_IS_NULL) sobreviven en
+        # la conexión: solo se fijan la primera vez que el pool la entrega
+        if self.pool and getattr(self.connection, 'estado_inicializado', False):
+            return
+        super().init_connection_state()
+        if self.pool:
+            self.connection.estado_inicializado = True
+
+    def _close(self):
+        pool = self.pool
+        if pool is None or self.connection is None:
+            return super()._close()
+
+        conexion, self.connection = self.connection, None
+        # Tras un error de base de datos solo se reutiliza si responde
+        reutilizable = not self.errors_occurred or pool.sana(conexion)
+        if reutilizable:
+            # Nunca devolver una conexión con una transacción abierta
+            try:
+                if self.in_atomic_block or not conexion.get_autocommit():
+                    conexion.rollback()
+                    conexion.autocommit(self.settings_dict['AUTOCOMMIT'])
+            except Database.Error:
+                reutilizable = False
+        pool.devolver(conexion, reutilizable)
+
+    def close_if_health_check_failed(self):
+        if self.pool:
+            # El pool verifica la conexión al entregarla
+            return
+        return super().close_if_health_check_failed()
+
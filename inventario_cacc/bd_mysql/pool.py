@@ -0,0 +1,243 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+# =========================
+# POOL DE CONEXIONES
+# =========================
+# Conexiones abiertas compartidas por todos los hilos del proceso (hilos del
+# servidor WSGI o hilos de sync_to_async bajo ASGI). Django pide una al
+# conectar y la devuelve al cerrar, que con CONN_MAX_AGE = 0 ocurre al final
+# de cada petición, así que una petición ya no paga el establecimiento de la
+# conexión. Reglas:
+#   - como mucho max_size conexiones entre libres y en uso; si no hay ninguna
+#     libre se espera hasta timeout segundos y luego se falla (agotado),
+#   - se mantienen al menos min_size abiertas; las libres que pasan max_idle
+#     segundos sin usarse por encima de ese mínimo se cierran,
+#   - ninguna conexión vive más de max_lifetime segundos,
+#   - al entregar una conexión que estuvo libre más de check_idle segundos se
+#     verifica con un ping; si falla se descarta y se entrega otra.
+# Un proceso hijo (fork) no puede usar los sockets del padre: si cambia el
+# pid el pool se olvida de las conexiones heredadas y empieza de cero.
+
+
+class PoolAgotado(Exception):
+    pass
+
+
+class PoolConexiones:
+    def __init__(self, crear, verificar, cerrar, min_size=2, max_size=10, timeout=10.0,
+                 max_lifetime=1800.0, max_idle=600.0, check_idle=0.0):
+        if not 0 <= min_size <= max_size or max_size < 1:
+            raise ValueError("Se requiere 0 <= min_size <= max_size y max_size >= 1")
+        self.crear = crear
+        self.verificar = verificar
+        self.cerrar = cerrar
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.max_idle = max_idle
+        self.check_idle = check_idle
+        self._cond = threading.Condition()
+        self._reiniciar()
+
+    def _reiniciar(self):
+        self._pid = os.getpid()
+        self._libres = deque()  # (conexión, creada, devuelta); la más reciente a la derecha
+        self._creadas = {}  # id(conexión) -> instante de creación, para las que están en uso
+        self._total = 0
+        self._prellenado = False
+        self._metricas = {
+            'entregadas': 0, 'creadas': 0, 'reutilizadas': 0, 'esperas': 0,
+            'espera_total_ms': 0.0, 'espera_max_ms': 0.0, 'agotado': 0,
+            'descartadas_salud': 0, 'descartadas_vida': 0, 'descartadas_inactivas': 0,
+            'descartadas_error': 0,
+        }
+
+    def _verificar_proceso(self):
+        if self._pid != os.getpid():
+            self._reiniciar()
+
+    def _cerrar_todas(self, conexiones):
+        for conexion in conexiones:
+            try:
+                self.cerrar(conexion)
+            except Exception:
+                pass
+
+    # =========================
+    # ENTREGA Y DEVOLUCIÓN
+    # =========================
+    def obtener(self):
+        inicio = time.monotonic()
+        limite = inicio + self.timeout
+        espero = False
+        while True:
+            candidata, crear, vencidas = None, False, []
+            with self._cond:
+                self._verificar_proceso()
+                while True:
+                    ahora = time.monotonic()
+                    while self._libres:
+                        conexion, creada, devuelta = self._libres.pop()
+                        if ahora - creada >= self.max_lifetime:
+                            vencidas.append(conexion)
+                            self._total -= 1
+                            self._metricas['descartadas_vida'] += 1
+                            continue
+                        candidata = (conexion, creada, devuelta)
+                        break
+                    if candidata:
+                        break
+                    if self._total < self.max_size:
+                        self._total += 1
+                        crear = True
+                        break
+                    restante = limite - ahora
+                    if restante <= 0:
+                        self._metricas['agotado'] += 1
+                        self._cerrar_todas(vencidas)
+                        logger.warning(
+                            "Pool de conexiones agotado: %d en uso, sin conexión libre tras %.1fs",
+                            self._total, self.timeout
+                        )
+                        raise PoolAgotado(
+                            f"No hubo conexión libre en {self.timeout}s ({self.max_size} en uso)"
+                        )
+                    espero = True
+                    self._cond.wait(restante)
+            self._cerrar_todas(vencidas)
+
+            if crear:
+                try:
+                    conexion = self.crear()
+                except Exception:
+                    with self._cond:
+                        self._total -= 1
+                        self._cond.notify()
+                    raise
+                creada = time.monotonic()
+                self._prellenar()
+                return self._entregar(conexion, creada, inicio, espero, nueva=True)
+
+            conexion, creada, devuelta = candidata
+            if time.monotonic() - devuelta > self.check_idle and not self.sana(conexion):
+                with self._cond:
+                    self._total -= 1
+                    self._metricas['descartadas_salud'] += 1
+                    self._cond.notify()
+                self._cerrar_todas([conexion])
+                continue
+            return self._entregar(conexion, creada, inicio, espero, nueva=False)
+
+    def sana(self, conexion):
+        try:
+            return self.verificar(conexion)
+        except Exception:
+            return False
+
+    def _entregar(self, conexion, creada, inicio, espero, nueva):
+        espera_ms = (time.monotonic() - inicio) * 1000
+        with self._cond:
+            self._creadas[id(conexion)] = creada
+            self._metricas['entregadas'] += 1
+            self._metricas['creadas' if nueva else 'reutilizadas'] += 1
+            if espero:
+                self._metricas['esperas'] += 1
+                self._metricas['espera_total_ms'] += espera_ms
+                self._metricas['espera_max_ms'] = max(self._metricas['espera_max_ms'], espera_ms)
+        return conexion
+
+    def _prellenar(self):
+        # Con la primera conexión del proceso se abren también las que faltan hasta min_size
+        with self._cond:
+            if self._prellenado:
+                return
+            self._prellenado = True
+        for _ in range(self.min_size - 1):
+            with self._cond:
+                if self._total >= self.min_size:
+                    return
+                self._total += 1
+            try:
+                conexion = self.crear()
+            except Exception:
+                with self._cond:
+                    self._total -= 1
+                return
+            ahora = time.monotonic()
+            with self._cond:
+                self._libres.appendleft((conexion, ahora, ahora))
+                self._metricas['creadas'] += 1
+                self._cond.notify()
+
+    def devolver(self, conexion, reutilizable=True):
+        descartadas = []
+        with self._cond:
+            if self._pid != os.getpid():
+                return  # heredada del proceso padre: ni se guarda ni se cierra
+            creada = self._creadas.pop(id(conexion), None)
+            ahora = time.monotonic()
+            if creada is None:
+                descartadas.append(conexion)  # no es de este pool
+            elif not reutilizable:
+                self._total -= 1
+                self._metricas['descartadas_error'] += 1
+                descartadas.append(conexion)
+            elif ahora - creada >= self.max_lifetime:
+                self._total -= 1
+                self._metricas['descartadas_vida'] += 1
+                descartadas.append(conexion)
+            else:
+                self._libres.append((conexion, creada, ahora))
+
+            # Las libres más antiguas están a la izquierda
+            while (
+                len(self._libres) > self.min_size
+                and ahora - self._libres[0][2] > self.max_idle
+            ):
+                descartadas.append(self._libres.popleft()[0])
+                self._total -= 1
+                self._metricas['descartadas_inactivas'] += 1
+            self._cond.notify()
+        self._cerrar_todas(descartadas)
+
+    def cerrar_todas(self):
+        """Cierra las conexiones libres; las que están en uso se cierran al devolverse."""
+        with self._cond:
+            libres = [conexion for conexion, _, _ in self._libres]
+            self._total -= len(libres)
+            self._libres.clear()
+        self._cerrar_todas(libres)
+
+    def estadisticas(self):
+        with self._cond:
+            self._verificar_proceso()
+            datos = dict(self._metricas)
+            datos.update({
+                'en_uso': self._total - len(self._libres),
+                'libres': len(self._libres),
+                'min_size': self.min_size,
+                'max_size': self.max_size,
+            })
+        datos['espera_total_ms'] = round(datos['espera_total_ms'], 2)
+        datos['espera_max_ms'] = round(datos['espera_max_ms'], 2)
+        return datos
+
+
+def estadisticas_pools():
+    """Métricas de los pools de este proceso, por alias de base de datos."""
+    from django.db import connections
+
+    datos = {}
+    for alias in connections:
+        pool = getattr(connections[alias], 'pool', None)
+        if isinstance(pool, PoolConexiones):
+            datos[alias] = pool.estadisticas()
+    return datos
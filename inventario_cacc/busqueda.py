@@ -0,0 +1,123 @@
+import operator
+import re
+import unicodedata
+from functools import reduce
+
+from django.db import transaction
+from django.db.models import Case, IntegerField, Max, Q, Sum, Value, When
+
+from .models import Producto, TerminoBusqueda
+
+
+# =========================
+# ÍNDICE INVERTIDO DE PRODUCTOS
+# =========================
+# Cada producto se descompone en términos normalizados (sin tildes, en
+# minúsculas) de su nombre, descripción y categoría. La búsqueda busca los
+# términos por prefijo en la tabla termino_busqueda, que está indexada por
+# termino, en lugar de recorrer producto con LIKE '%...%'.
+
+PESO_NOMBRE = 3
+PESO_CATEGORIA = 2
+PESO_DESCRIPCION = 1
+
+LONGITUD_MINIMA = 2
+LONGITUD_MAXIMA = 64
+MAX_TERMINOS_CONSULTA = 8
+LIMITE_RESULTADOS = 500
+
+
+def normalizar(texto):
+    texto = unicodedata.normalize('NFKD', texto or '')
+    return ''.join(c for c in texto if not unicodedata.combining(c)).lower()
+
+
+def tokenizar(texto):
+    return [
+        t[:LONGITUD_MAXIMA]
+        for t in re.findall(r'[a-z0-9]+', normalizar(texto))
+        if len(t) >= LONGITUD_MINIMA
+    ]
+
+
+def terminos_producto(producto, nombre_categoria=None):
+    """Diccionario termino -> peso para un producto."""
+    if nombre_categoria is None and producto.categoria_id:
+        nombre_categoria = producto.categoria.nombre
+
+    terminos = {}
+    for texto, peso in (
+        (producto.nombre, PESO_NOMBRE),
+        (nombre_categoria, PESO_CATEGORIA),
+        (producto.descripcion, PESO_DESCRIPCION),
+    ):
+        for termino in tokenizar(texto):
+            terminos[termino] = max(terminos.get(termino, 0), peso)
+    return terminos
+
+
+def indexar_productos(productos, tam_lote=1000):
+    """Reconstruye las entradas del índice de los productos indicados."""
+    productos = list(productos)
+    if not productos:
+        return
+    with transaction.atomic():
+        TerminoBusqueda.objects.filter(producto_id__in=[p.id for p in productos]).delete()
+        TerminoBusqueda.objects.bulk_create(
+            [
+                TerminoBusqueda(termino=termino, producto_id=producto.id, peso=peso)
+                for producto in productos
+                for termino, peso in terminos_producto(producto).items()
+            ],
+            batch_size=tam_lote,
+        )
+
+
+def indexar_producto(producto):
+    indexar_productos([producto])
+
+
+def reindexar_todo(tam_lote=1000):
+    """Reconstruye el índice completo recorriendo producto por bloques de id."""
+    ultimo_id = 0
+    total = 0
+    while True:
+        lote = list(
+            Producto.objects.select_related('categoria')
+            .filter(id__gt=ultimo_id)
+            .order_by('id')[:tam_lote]
+        )
+        if not lote:
+            return total
+        indexar_productos(lote, tam_lote=tam_lote)
+        ultimo_id = lote[-1].id
+        total += len(lote)
+
+
+def buscar_ids(consulta, limite=LIMITE_RESULTADOS, filtros=None):
+    """
+    Ids de productos que contienen todos los términos de ``consulta``
+    (por prefijo), ordenados por relevancia. ``filtros`` son condiciones
+    sobre Producto (p. ej. {'stock__gt': 0}) que se aplican antes del
+    límite, para que no recorte coincidencias que sí cumplen. Devuelve None
+    si la consulta no tiene términos utilizables.
+    """
+    terminos = list(dict.fromkeys(tokenizar(consulta)))[:MAX_TERMINOS_CONSULTA]
+    if not terminos:
+        return None
+
+    filtro = reduce(operator.or_, (Q(termino__startswith=t) for t in terminos))
+    if filtros:
+        filtro &= Q(**{f'producto__{campo}': valor for campo, valor in filtros.items()})
+    cubiertos = reduce(operator.add, (
+        Max(Case(When(termino__startswith=t, then=Value(1)), default=Value(0), output_field=IntegerField()))
+        for t in terminos
+    ))
+    return list(
+        TerminoBusqueda.objects.filter(filtro)
+        .values('producto_id')
+        .annotate(cubiertos=cubiertos, puntaje=Sum('peso'))
+        .filter(cubiertos=len(terminos))
+        .order_by('-puntaje', 'producto_id')
+        .values_list('producto_id', flat=True)[:limite]
+    )
@@ -0,0 +1,190 @@
+from decimal import Decimal
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+
+from .models import LineaCarrito
+
+
+# =========================
+# CARRITO DE COMPRAS
+# =========================
+# El carrito ya no vive en la sesión: cada línea es un par compacto
+# producto_id -> (cantidad, precio) guardado en un almacén intercambiable
+# (settings.CARRITO_ALMACEN). Agregar un producto es una escritura pequeña
+# sobre su línea. En la base de datos el contador del encabezado es un SUM
+# sobre las líneas del usuario (índice único usuario, producto), siempre
+# exacto sin importar qué proceso atendió el cambio; el almacén 'cache'
+# guarda el total junto a las líneas en la caché compartida.
+
+
+class AlmacenBD:
+    """Una fila de carrito_linea por producto."""
+
+    def __init__(self, usuario_id):
+        self.usuario_id = usuario_id
+
+    def _lineas(self):
+        return LineaCarrito.objects.filter(usuario_id=self.usuario_id)
+
+    def lineas(self):
+        return {
+            producto_id: (cantidad, precio)
+            for producto_id, cantidad, precio in self._lineas().order_by('id').values_list('producto_id', 'cantidad', 'precio')
+        }
+
+    async def alineas(self):
+        return {
+            producto_id: (cantidad, precio)
+            async for producto_id, cantidad, precio in self._lineas().order_by('id').values_list('producto_id', 'cantidad', 'precio')
+        }
+
+    def cantidad(self, producto_id):
+        return self._lineas().filter(producto_id=producto_id).values_list('cantidad', flat=True).first() or 0
+
+    def agregar(self, producto_id, cantidad, precio):
+        if not self._lineas().filter(producto_id=producto_id).update(cantidad=F('cantidad') + cantidad):
+            try:
+                with transaction.atomic():
+                    LineaCarrito.objects.create(
+                        usuario_id=self.usuario_id, producto_id=producto_id, cantidad=cantidad, precio=precio
+                    )
+            except IntegrityError:
+                # Otra petición creó la línea entre el UPDATE y el INSERT
+                self._lineas().filter(producto_id=producto_id).update(cantidad=F('cantidad') + cantidad)
+
+    def fijar(self, producto_id, cantidad):
+        self._lineas().filter(producto_id=producto_id).update(cantidad=cantidad)
+
+    def quitar(self, producto_id):
+        self._lineas().filter(producto_id=producto_id).delete()
+
+    def vaciar(self):
+        self._lineas().delete()
+
+    def conteo(self):
+        return self._lineas().aggregate(total=Sum('cantidad'))['total'] or 0
+
+    async def aconteo(self):
+        return (await self._lineas().aaggregate(total=Sum('cantidad')))['total'] or 0
+
+
+class AlmacenCache:
+    """Todo el carrito en una sola entrada de la caché: {'n': unidades, 'l': líneas}."""
+
+    def __init__(self, usuario_id):
+        self.clave = f'carrito:{usuario_id}'
+
+    def _leer(self):
+        return cache.get(self.clave) or {'n': 0, 'l': {}}
+
+    def _guardar(self, datos):
+        cache.set(self.clave, datos, None)
+
+    def _lineas_de(self, datos):
+        return {producto_id: (cantidad, Decimal(precio)) for producto_id, (cantidad, precio) in datos['l'].items()}
+
+    def lineas(self):
+        return self._lineas_de(self._leer())
+
+    async def alineas(self):
+        return self._lineas_de(await cache.aget(self.clave) or {'n': 0, 'l': {}})
+
+    def cantidad(self, producto_id):
+        return self._leer()['l'].get(producto_id, (0, None))[0]
+
+    def agregar(self, producto_id, cantidad, precio):
+        datos = self._leer()
+        actual, precio_actual = datos['l'].get(producto_id, (0, str(precio)))
+        datos['l'][producto_id] = (actual + cantidad, precio_actual)
+        datos['n'] += cantidad
+        self._guardar(datos)
+
+    def fijar(self, producto_id, cantidad):
+        datos = self._leer()
+        if producto_id in datos['l']:
+            actual, precio = datos['l'][producto_id]
+            datos['l'][producto_id] = (cantidad, precio)
+            datos['n'] += cantidad - actual
+            self._guardar(datos)
+
+    def quitar(self, producto_id):
+        datos = self._leer()
+        if producto_id in datos['l']:
+            datos['n'] -= datos['l'].pop(producto_id)[0]
+            self._guardar(datos)
+
+    def vaciar(self):
+        cache.delete(self.clave)
+
+    def conteo(self):
+        return self._leer()['n']
+
+    async def aconteo(self):
+        return (await cache.aget(self.clave) or {'n': 0})['n']
+
+
+ALMACENES = {
+    'bd': AlmacenBD,
+    'cache': AlmacenCache,
+}
+
+
+class Carrito:
+    def __init__(self, usuario, almacen=None):
+        almacen = almacen or getattr(settings, 'CARRITO_ALMACEN', 'bd')
+        self.almacen = ALMACENES[almacen](usuario.pk)
+
+    def lineas(self):
+        """Diccionario producto_id -> (cantidad, precio)."""
+        return self.almacen.lineas()
+
+    def cantidad(self, producto_id):
+        return self.almacen.cantidad(int(producto_id))
+
+    def agregar(self, producto_id, cantidad, precio):
+        self.almacen.agregar(int(producto_id), cantidad, precio)
+
+    def fijar(self, producto_id, cantidad):
+        self.almacen.fijar(int(producto_id), cantidad)
+
+    def quitar(self, producto_id):
+        self.almacen.quitar(int(producto_id))
+
+    def vaciar(self):
+        self.almacen.vaciar()
+
+    def conteo(self):
+        return self.almacen.conteo()
+
+    async def alineas(self):
+        return await self.almacen.alineas()
+
+    async def aconteo(self):
+        return await self.almacen.aconteo()
+
+
+def carrito_de(request):
+    """
+    Carrito del usuario autenticado. Si la sesión aún trae un carrito del
+    formato anterior, se pasa al almacén y se borra de la sesión.
+    """
+    carrito = Carrito(request.user)
+    anterior = request.session.pop('carrito', None)
+    if anterior:
+        for producto_id, item in anterior.items():
+            carrito.agregar(producto_id, item['cantidad'], Decimal(str(item['precio'])))
+    return carrito
+
+
+async def acarrito_de(request):
+    """Versión asíncrona de carrito_de para las vistas async."""
+    carrito = Carrito(await request.auser())
+    anterior = await request.session.apop('carrito', None)
+    if anterior:
+        for producto_id, item in anterior.items():
+            await sync_to_async(carrito.agregar)(producto_id, item['cantidad'], Decimal(str(item['precio'])))
+    return carrito
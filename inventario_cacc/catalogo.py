@@ -0,0 +1,219 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from .busqueda import LONGITUD_MAXIMA, buscar_ids, tokenizar
+from .models import Categoria, Producto
+
+
+# =========================
+# CACHÉ DEL CATÁLOGO
+# =========================
+# Las páginas del catálogo (home) se guardan por (búsqueda, categoría, orden)
+# en una caché LRU del proceso. Cada entrada lleva la versión del catálogo
+# con la que se construyó; la versión vive en la caché de Django y se
+# incrementa cada vez que cambia un producto, una categoría, un proveedor o
+# el stock, así que basta con compararla para saber si la entrada sigue
+# vigente. Para que un cambio atendido por un worker invalide el catálogo de
+# los demás, esa caché tiene que ser compartida entre procesos (CACHES en
+# settings: base de datos o Redis, nunca LocMem con varios workers). El TTL
+# es solo un respaldo.
+# Armar las tarjetas de productos cuesta mucho más que la consulta, así que
+# su HTML (Fragmentos/catalogo_tarjetas.html) también se guarda, en la caché
+# de Django para compartirlo entre procesos, con una clave que lleva la
+# página y la versión del catálogo con la que se construyó.
+
+MAX_ENTRADAS = 256
+TTL_CATALOGO = 300
+CLAVE_VERSION = 'catalogo:version'
+
+ORDENES_VALIDOS = ('nombre', '-nombre', 'precio', '-precio')
+
+
+def version_catalogo():
+    version = cache.get(CLAVE_VERSION)
+    if version is None:
+        cache.add(CLAVE_VERSION, 1, None)
+        version = cache.get(CLAVE_VERSION, 1)
+    return version
+
+
+async def aversion_catalogo():
+    version = await cache.aget(CLAVE_VERSION)
+    if version is None:
+        await cache.aadd(CLAVE_VERSION, 1, None)
+        version = await cache.aget(CLAVE_VERSION, 1)
+    return version
+
+
+class CacheCatalogo:
+    def __init__(self, max_entradas=MAX_ENTRADAS, ttl=TTL_CATALOGO):
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.expulsiones = 0
+        self.invalidaciones = 0
+
+    def _vigente(self, clave, version):
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada and entrada[0] == version and entrada[1] > time.monotonic():
+                self._entradas.move_to_end(clave)
+                self.aciertos += 1
+                return entrada[2]
+            self.fallos += 1
+        return None
+
+    def _guardar(self, clave, version, valor):
+        with self._lock:
+            self._entradas[clave] = (version, time.monotonic() + self.ttl, valor)
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+                self.expulsiones += 1
+        return valor
+
+    def obtener(self, clave, construir):
+        version = version_catalogo()
+        valor = self._vigente(clave, version)
+        if valor is None:
+            valor = self._guardar(clave, version, construir(version))
+        return valor
+
+    async def aobtener(self, clave, construir):
+        """Como obtener, pero ``construir`` es una corrutina."""
+        version = await aversion_catalogo()
+        valor = self._vigente(clave, version)
+        if valor is None:
+            valor = self._guardar(clave, version, await construir(version))
+        return valor
+
+    def limpiar(self):
+        with self._lock:
+            self._entradas.clear()
+            self.invalidaciones += 1
+
+    def estadisticas(self):
+        with self._lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                'version': version_catalogo(),
+                'entradas': len(self._entradas),
+                'max_entradas': self.max_entradas,
+                'aciertos': self.aciertos,
+                'fallos': self.fallos,
+                'tasa_aciertos': round(self.aciertos / consultas, 4) if consultas else 0.0,
+                'expulsiones': self.expulsiones,
+                'invalidaciones': self.invalidaciones,
+            }
+
+
+cache_catalogo = CacheCatalogo()
+
+
+def invalidar_catalogo():
+    """Marca como obsoletas todas las páginas cacheadas del catálogo."""
+    try:
+        cache.incr(CLAVE_VERSION)
+    except ValueError:
+        cache.set(CLAVE_VERSION, version_catalogo() + 1, None)
+    cache_catalogo.limpiar()
+
+
+def _filtros_catalogo(categoria_id):
+    # Solo productos con stock
+    filtros = {'stock__gt': 0}
+    if categoria_id:
+        filtros['categoria_id'] = categoria_id
+    return filtros
+
+
+def _consulta_catalogo(relevancia, categoria_id, orden, texto_corto=''):
+    productos = Producto.objects.filter(**_filtros_catalogo(categoria_id)).select_related('categoria', 'proveedor')
+
+    # Búsqueda por índice invertido (ya filtrada por stock y categoría), ordenada por relevancia
+    if relevancia is not None:
+        productos = productos.filter(id__in=relevancia)
+    # Texto sin términos indexables (una sola letra, símbolos): por nombre
+    elif texto_corto:
+        productos = productos.filter(nombre__icontains=texto_corto)
+
+    if orden:
+        return productos.order_by(orden)
+    if relevancia:
+        return productos
+    return productos.order_by('nombre')
+
+
+def _por_relevancia(productos, relevancia, orden):
+    if orden or not relevancia:
+        return productos
+    posicion = {producto_id: i for i, producto_id in enumerate(relevancia)}
+    return sorted(productos, key=lambda producto: posicion[producto.id])
+
+
+def _clave_tarjetas(version, clave):
+    huella = hashlib.md5('|'.join(clave).encode()).hexdigest()
+    return f'catalogo:tarjetas:{version}:{huella}'
+
+
+def _construir_catalogo(version, terminos, texto_corto, categoria_id, orden):
+    relevancia = buscar_ids(terminos, filtros=_filtros_catalogo(categoria_id)) if terminos else None
+    productos = list(_consulta_catalogo(relevancia, categoria_id, orden, texto_corto))
+    return {
+        'productos': _por_relevancia(productos, relevancia, orden),
+        'categorias': list(Categoria.objects.all()),
+        'clave_tarjetas': _clave_tarjetas(version, (terminos, texto_corto, categoria_id, orden)),
+    }
+
+
+async def _aconstruir_catalogo(version, terminos, texto_corto, categoria_id, orden):
+    relevancia = await sync_to_async(buscar_ids)(terminos, filtros=_filtros_catalogo(categoria_id)) if terminos else None
+    productos = [p async for p in _consulta_catalogo(relevancia, categoria_id, orden, texto_corto)]
+    return {
+        'productos': _por_relevancia(productos, relevancia, orden),
+        'categorias': [c async for c in Categoria.objects.all()],
+        'clave_tarjetas': _clave_tarjetas(version, (terminos, texto_corto, categoria_id, orden)),
+    }
+
+
+def _clave(buscar, categoria_id, orden):
+    terminos = ' '.join(tokenizar(buscar))
+    texto_corto = '' if terminos else ' '.join((buscar or '').split())[:LONGITUD_MAXIMA].lower()
+    categoria_id = categoria_id if str(categoria_id).isdigit() else ''
+    orden = orden if orden in ORDENES_VALIDOS else ''
+    return terminos, texto_corto, categoria_id, orden
+
+
+def obtener_catalogo(buscar='', categoria_id='', orden=''):
+    """Productos y categorías para home, servidos desde la caché si es posible."""
+    clave = _clave(buscar, categoria_id, orden)
+    return cache_catalogo.obtener(clave, lambda version: _construir_catalogo(version, *clave))
+
+
+async def aobtener_catalogo(buscar='', categoria_id='', orden=''):
+    """Versión asíncrona de obtener_catalogo: un acierto no sale del event loop."""
+    clave = _clave(buscar, categoria_id, orden)
+    return await cache_catalogo.aobtener(clave, lambda version: _aconstruir_catalogo(version, *clave))
+
+
+async def atarjetas_catalogo(catalogo, filtrado=False):
+    """HTML de las tarjetas de productos de home, desde la caché si es posible."""
+    clave = f"{catalogo['clave_tarjetas']}:{int(filtrado)}"
+    tarjetas = await cache.aget(clave)
+    if tarjetas is None:
+        tarjetas = render_to_string(
+            'Fragmentos/catalogo_tarjetas.html',
+            {'productos': catalogo['productos'], 'filtrado': filtrado},
+        )
+        await cache.aset(clave, tarjetas, TTL_CATALOGO)
+    return mark_safe(tarjetas)
@@ -0,0 +1,89 @@
+from django.db import transaction
+from django.db.models import F, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from .historico import DELTA
+from .models import MovimientoInventario, Producto
+
+
+# =========================
+# CONCILIACIÓN STOCK / HISTORIAL
+# =========================
+# Producto.stock debería ser la suma de sus movimientos (entradas menos
+# salidas), pero crear o editar un producto fija el stock sin dejar
+# movimiento. La revisión va por tramos de ids: cada tramo es una sola
+# consulta de lectura (stock y suma del historial en la misma sentencia, así
+# que ambos valores son coherentes entre sí) y no bloquea la tabla. Solo la
+# corrección de un producto toma su fila con SELECT ... FOR UPDATE, lo que
+# la serializa con los cambios de stock en curso de ese producto.
+# Los movimientos de ajuste van marcados (ajuste=True) y no suman al resumen
+# diario: una merma dada de baja no es demanda para el pronóstico de compras.
+
+DESCRIPCION_AJUSTE = "Ajuste por conciliación de stock"
+
+
+def _libro(producto):
+    return Coalesce(
+        Subquery(
+            MovimientoInventario.objects
+            .filter(producto=producto)
+            .order_by()
+            .values('producto')
+            .annotate(neto=Sum(DELTA))
+            .values('neto')
+        ),
+        0,
+    )
+
+
+def tramos(tam_tramo):
+    """Rangos [desde, hasta) de ids de producto que cubren toda la tabla."""
+    ids = Producto.objects.order_by('id').values_list('id', flat=True)
+    primero, ultimo = ids.first(), ids.last()
+    if primero is None:
+        return []
+    return [(desde, min(desde + tam_tramo, ultimo + 1)) for desde in range(primero, ultimo + 1, tam_tramo)]
+
+
+def diferencias(desde, hasta):
+    """Productos del rango de ids cuyo stock no coincide con su historial."""
+    return list(
+        Producto.objects
+        .filter(id__gte=desde, id__lt=hasta)
+        .annotate(libro=_libro(OuterRef('pk')))
+        .filter(~Q(stock=F('libro')))
+        .order_by('id')
+        .values('id', 'nombre', 'stock', 'libro')
+    )
+
+
+def corregir(producto_id):
+    """
+    Registra un movimiento de ajuste para que el historial vuelva a sumar el
+    stock actual, sin tocar el stock. Devuelve el movimiento, o None si al
+    volver a revisar con el producto bloqueado ya no había diferencia.
+    """
+    with transaction.atomic():
+        stock = Producto.objects.select_for_update().filter(id=producto_id).values_list('stock', flat=True).first()
+        if stock is None:
+            return None
+        libro = MovimientoInventario.objects.filter(producto_id=producto_id).aggregate(neto=Sum(DELTA))['neto'] or 0
+        diferencia = stock - libro
+        if not diferencia:
+            return None
+        movimiento = MovimientoInventario.objects.create(
+            producto_id=producto_id,
+            tipo='ENTRADA' if diferencia > 0 else 'SALIDA',
+            cantidad=abs(diferencia),
+            descripcion=DESCRIPCION_AJUSTE,
+            ajuste=True,
+        )
+    return movimiento
+
+
+def revisar_tramo(tramo, corregir_diferencias=False):
+    """Unidad de trabajo de cada proceso: revisa un tramo y, si se pide, lo corrige."""
+    filas = diferencias(*tramo)
+    for fila in filas:
+        fila['corregido'] = bool(corregir_diferencias and corregir(fila['id']))
+    return filas
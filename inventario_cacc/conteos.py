@@ -0,0 +1,45 @@
+import hashlib
+
+from django.core.cache import cache
+from django.db import connection
+
+
+# =========================
+# CONTEOS APROXIMADOS Y CACHEADOS
+# =========================
+# Las tarjetas de estadísticas no necesitan un COUNT(*) exacto en cada
+# petición: se sirven desde caché durante unos segundos, y el total sin
+# filtros se toma de las estadísticas de la tabla cuando la base es MySQL.
+
+TTL_CONTEOS = 60
+
+
+def conteo_aproximado(modelo):
+    """Número estimado de filas de la tabla del modelo."""
+    if connection.vendor == 'mysql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT TABLE_ROWS FROM information_schema.TABLES "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+                [modelo._meta.db_table],
+            )
+            fila = cursor.fetchone()
+        if fila and fila[0] is not None:
+            return fila[0]
+    return conteo_cacheado(modelo._meta.db_table, modelo.objects.all())
+
+
+def conteo_cacheado(clave, queryset, ttl=TTL_CONTEOS):
+    """``queryset.count()`` guardado en caché durante ``ttl`` segundos."""
+    clave = f"conteo:{clave}"
+    valor = cache.get(clave)
+    if valor is None:
+        valor = queryset.count()
+        cache.set(clave, valor, ttl)
+    return valor
+
+
+def clave_filtros(prefijo, filtros):
+    """Clave de caché estable para un diccionario de filtros."""
+    crudo = '&'.join(f"{k}={v}" for k, v in sorted(filtros.items()) if v)
+    return f"{prefijo}:{hashlib.md5(crudo.encode()).hexdigest()}"
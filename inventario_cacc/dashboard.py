@@ -0,0 +1,105 @@
+import time
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import connection
+
+from .models import Categoria, Cliente, MovimientoInventario, Perfil, Producto, Proveedor
+
+
+# =========================
+# MÉTRICAS DEL DASHBOARD
+# =========================
+# Todos los contadores salen de una sola consulta con subconsultas escalares,
+# y el resultado se guarda como snapshot durante TTL_DASHBOARD segundos.
+# Cuando el snapshot vence, solo el proceso que obtiene el candado lo
+# recalcula; los demás siguen sirviendo la versión anterior mientras tanto.
+
+TTL_DASHBOARD = 30
+TTL_BLOQUEO = 10
+CLAVE_SNAPSHOT = 'dashboard:snapshot'
+CLAVE_BLOQUEO = 'dashboard:bloqueo'
+MOVIMIENTOS_RECIENTES = 10
+
+
+def _contadores():
+    q = connection.ops.quote_name
+    subconsultas = [
+        ('total_categorias', f"SELECT COUNT(*) FROM {q(Categoria._meta.db_table)}"),
+        ('total_proveedores', f"SELECT COUNT(*) FROM {q(Proveedor._meta.db_table)}"),
+        ('total_productos', f"SELECT COUNT(*) FROM {q(Producto._meta.db_table)}"),
+        ('total_clientes', f"SELECT COUNT(*) FROM {q(Cliente._meta.db_table)}"),
+        # Usuarios clientes del sistema
+        ('total_usuarios', f"SELECT COUNT(*) FROM {q(Perfil._meta.db_table)} WHERE {q('rol')} = 2"),
+    ]
+    sql = "SELECT " + ", ".join(f"({consulta})" for _, consulta in subconsultas)
+    with connection.cursor() as cursor:
+        cursor.execute(sql)
+        fila = cursor.fetchone()
+    return {nombre: valor for (nombre, _), valor in zip(subconsultas, fila)}
+
+
+def calcular_metricas():
+    metricas = _contadores()
+    metricas['movimientos'] = list(
+        MovimientoInventario.objects.select_related('producto', 'usuario', 'cliente')
+        .order_by('-fecha')[:MOVIMIENTOS_RECIENTES]
+    )
+    return metricas
+
+
+async def acalcular_metricas():
+    # No hay cursor asíncrono para SQL crudo: la consulta de contadores va a un hilo
+    metricas = await sync_to_async(_contadores)()
+    metricas['movimientos'] = [
+        movimiento async for movimiento in
+        MovimientoInventario.objects.select_related('producto', 'usuario', 'cliente')
+        .order_by('-fecha')[:MOVIMIENTOS_RECIENTES]
+    ]
+    return metricas
+
+
+def metricas_dashboard():
+    snapshot = cache.get(CLAVE_SNAPSHOT)
+    if snapshot and snapshot['vence'] > time.time():
+        return snapshot['metricas']
+
+    # Vencido o inexistente: solo un proceso recalcula
+    if cache.add(CLAVE_BLOQUEO, 1, TTL_BLOQUEO):
+        try:
+            metricas = calcular_metricas()
+            cache.set(
+                CLAVE_SNAPSHOT,
+                {'metricas': metricas, 'vence': time.time() + TTL_DASHBOARD},
+                TTL_DASHBOARD * 10,
+            )
+            return metricas
+        finally:
+            cache.delete(CLAVE_BLOQUEO)
+
+    if snapshot:
+        return snapshot['metricas']
+    return calcular_metricas()
+
+
+async def ametricas_dashboard():
+    """Versión asíncrona de metricas_dashboard, con el mismo snapshot y candado."""
+    snapshot = await cache.aget(CLAVE_SNAPSHOT)
+    if snapshot and snapshot['vence'] > time.time():
+        return snapshot['metricas']
+
+    if await cache.aadd(CLAVE_BLOQUEO, 1, TTL_BLOQUEO):
+        try:
+            metricas = await acalcular_metricas()
+            await cache.aset(
+                CLAVE_SNAPSHOT,
+                {'metricas': metricas, 'vence': time.time() + TTL_DASHBOARD},
+                TTL_DASHBOARD * 10,
+            )
+            return metricas
+        finally:
+            await cache.adelete(CLAVE_BLOQUEO)
+
+    if snapshot:
+        return snapshot['metricas']
+    return await acalcular_metricas()
@@ -0,0 +1,30 @@
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.contrib.auth.decorators import login_required
+from django.http import HttpResponseForbidden
+
+from .models import Perfil
+
+
+def admin_requerido(vista):
+    """Como login_required, pero además exige el rol Administrador (vistas sync o async)."""
+    if iscoroutinefunction(vista):
+        @wraps(vista)
+        @login_required
+        async def envoltura_async(request, *args, **kwargs):
+            usuario = await request.auser()
+            es_admin = usuario.is_superuser or await Perfil.objects.filter(user=usuario, rol=1).aexists()
+            if not es_admin:
+                return HttpResponseForbidden("No tienes permisos para ver esta página.")
+            return await vista(request, *args, **kwargs)
+        return envoltura_async
+
+    @wraps(vista)
+    @login_required
+    def envoltura(request, *args, **kwargs):
+        es_admin = request.user.is_superuser or Perfil.objects.filter(user=request.user, rol=1).exists()
+        if not es_admin:
+            return HttpResponseForbidden("No tienes permisos para ver esta página.")
+        return vista(request, *args, **kwargs)
+    return envoltura
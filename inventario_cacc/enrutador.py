@@ -0,0 +1,122 @@
+import random
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+
+
+# =========================
+# LECTURAS EN RÉPLICAS
+# =========================
+# Las peticiones de solo lectura (GET/HEAD/OPTIONS) leen de una de las
+# réplicas de settings.BD_REPLICAS; todo lo demás va a 'default':
+#   - las escrituras, siempre,
+#   - las lecturas dentro de una transacción de la primaria (select_for_update,
+#     pedidos, movimientos),
+#   - las lecturas posteriores a una escritura en la misma petición,
+#   - todas las lecturas de un usuario durante BD_FIJACION_SEGUNDOS después
+#     de una petición suya que escribió (cookie COOKIE_FIJACION), para que no
+#     vea stock ni pedidos atrasados por el retraso de replicación.
+# La caché compartida (DatabaseCache) y las sesiones siempre van a la
+# primaria y no fijan al usuario: cualquier GET las escribe (un fallo de
+# caché, una sesión que se renueva) y no cambian lo que el usuario ve.
+# Fuera de una petición (comandos, tareas) no hay estado y todo va a la
+# primaria. El estado de la petición es un diccionario en una ContextVar:
+# se comparte con los hilos de sync_to_async de las vistas async, y las
+# respuestas en streaming (exportaciones) lo vuelven a fijar en cada trozo,
+# porque sus consultas corren después de que el middleware ya terminó.
+
+COOKIE_FIJACION = 'bd_primaria'
+METODOS_LECTURA = ('GET', 'HEAD', 'OPTIONS')
+APPS_SOLO_PRIMARIA = ('django_cache', 'sessions')
+
+_peticion = ContextVar('peticion_replicas', default=None)
+
+
+class EnrutadorReplicas:
+    def __init__(self):
+        self.replicas = list(getattr(settings, 'BD_REPLICAS', []))
+
+    def db_for_read(self, model, **hints):
+        # La caché compartida y las sesiones no pueden leerse con retraso
+        if model._meta.app_label in APPS_SOLO_PRIMARIA:
+            return 'default'
+        estado = _peticion.get()
+        if not (self.replicas and estado and estado['replica'] and not estado['escribio']):
+            return 'default'
+        if connections['default'].in_atomic_block:
+            return 'default'
+        return random.choice(self.replicas)
+
+    def db_for_write(self, model, **hints):
+        estado = _peticion.get()
+        if estado is not None and model._meta.app_label not in APPS_SOLO_PRIMARIA:
+            estado['escribio'] = True
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Primaria y réplicas tienen los mismos datos
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Las réplicas reciben el esquema por replicación
+        return db not in self.replicas
+
+
+def _con_estado(contenido, estado):
+    iterador = iter(contenido)
+    while True:
+        token = _peticion.set(estado)
+        try:
+            trozo = next(iterador)
+        except StopIteration:
+            return
+        finally:
+            _peticion.reset(token)
+        yield trozo
+
+
+class ReplicasMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.fijacion = getattr(settings, 'BD_FIJACION_SEGUNDOS', 5)
+        self.es_async = iscoroutinefunction(get_response)
+        if self.es_async:
+            markcoroutinefunction(self)
+
+    def _estado(self, request):
+        return {
+            'replica': request.method in METODOS_LECTURA and COOKIE_FIJACION not in request.COOKIES,
+            'escribio': False,
+        }
+
+    def _fijar(self, estado, response):
+        if response.streaming and not response.is_async:
+            response.streaming_content = _con_estado(response.streaming_content, estado)
+        if estado['escribio']:
+            response.set_cookie(COOKIE_FIJACION, '1', max_age=self.fijacion, httponly=True, samesite='Lax')
+        return response
+
+    def __call__(self, request):
+        if self.es_async:
+            return self.__acall__(request)
+        estado = self._estado(request)
+        token = _peticion.set(estado)
+        try:
+            response = self.get_response(request)
+        finally:
+            _peticion.reset(token)
+        return self._fijar(estado, response)
+
+    async def __acall__(self, request):
+        estado = self._estado(request)
+        token = _peticion.set(estado)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _peticion.reset(token)
+        return self._fijar(estado, response)
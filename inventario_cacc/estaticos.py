@@ -0,0 +1,194 @@
+import gzip
+import logging
+import mimetypes
+import os
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage, staticfiles_storage
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import rcssmin
+except ImportError:
+    rcssmin = None
+
+try:
+    import rjsmin
+except ImportError:
+    rjsmin = None
+
+logger = logging.getLogger(__name__)
+
+
+# =========================
+# ARCHIVOS ESTÁTICOS
+# =========================
+# collectstatic copia Public/ en STATIC_ROOT y, con AlmacenEstaticos:
+#   - añade el hash del contenido al nombre (Js/aplication.3f2a9c1b.js) y
+#     guarda la correspondencia en staticfiles.json; {% static %} usa ese
+#     nombre, así que cada versión de un archivo tiene su propia URL,
+#   - minifica los .css y .js que no vienen ya minificados si están
+#     instalados rcssmin y rjsmin (sin ellos se copian tal cual: quitar solo
+#     comentarios y sangrías apenas ahorra frente a la compresión),
+#   - genera al lado de cada archivo comprimible su variante .gz y, si está
+#     instalado el paquete brotli, .br.
+# EstaticosMiddleware sirve STATIC_ROOT eligiendo la variante comprimida
+# según Accept-Encoding; los nombres con hash llevan caché de un año
+# (immutable) porque su contenido no cambia nunca, el resto caché corta.
+# Con DEBUG el servidor de desarrollo sirve Public/ directamente, como antes.
+
+EXTENSIONES_COMPRIMIBLES = ('.css', '.js', '.svg', '.json', '.txt', '.html', '.xml', '.map', '.ico')
+TAMANO_MINIMO_COMPRESION = 256
+MAX_AGE_HASH = 365 * 24 * 60 * 60
+MAX_AGE_SIN_HASH = 60
+CODIFICACIONES = (('br', '.br'), ('gzip', '.gz'))
+
+
+MINIFICADORES = {}
+if rcssmin:
+    MINIFICADORES['.css'] = lambda texto: rcssmin.cssmin(texto, keep_bang_comments=True)
+if rjsmin:
+    MINIFICADORES['.js'] = lambda texto: rjsmin.jsmin(texto, keep_bang_comments=True)
+
+
+class AlmacenEstaticos(ManifestStaticFilesStorage):
+    # Las hojas de estilo de terceros pueden apuntar a archivos que no se
+    # copiaron (las fuentes de bootstrap-icons): esas URL quedan como están
+    def url_converter(self, name, hashed_files, template=None):
+        convertir = super().url_converter(name, hashed_files, template)
+
+        def tolerante(coincidencia):
+            try:
+                return convertir(coincidencia)
+            except ValueError as e:
+                logger.warning("%s: referencia sin resolver (%s)", name, e)
+                return coincidencia[0]
+        return tolerante
+
+    def stored_name(self, name):
+        # Sin collectstatic (desarrollo, pruebas) se usa el nombre original
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for nombre in sorted(set(self.hashed_files.values())):
+            procesado = False
+            extension = os.path.splitext(nombre)[1]
+            if extension in MINIFICADORES and '.min.' not in nombre:
+                procesado = self._minificar(nombre, MINIFICADORES[extension])
+            if extension in EXTENSIONES_COMPRIMIBLES:
+                procesado = self._comprimir(nombre) or procesado
+            if procesado:
+                yield nombre, nombre, True
+
+    def _minificar(self, nombre, minificador):
+        ruta = Path(self.path(nombre))
+        original = ruta.read_text(encoding='utf-8')
+        minificado = minificador(original)
+        if len(minificado) >= len(original):
+            return False
+        ruta.write_text(minificado, encoding='utf-8')
+        return True
+
+    def _comprimir(self, nombre):
+        ruta = Path(self.path(nombre))
+        contenido = ruta.read_bytes()
+        if len(contenido) < TAMANO_MINIMO_COMPRESION:
+            return False
+        variantes = {'.gz': gzip.compress(contenido, compresslevel=9, mtime=0)}
+        if brotli:
+            variantes['.br'] = brotli.compress(contenido, quality=11)
+        escrito = False
+        for sufijo, comprimido in variantes.items():
+            # Solo vale la pena si ahorra al menos un 5 %
+            if len(comprimido) < len(contenido) * 0.95:
+                ruta.with_name(ruta.name + sufijo).write_bytes(comprimido)
+                escrito = True
+        return escrito
+
+
+def _codificaciones_aceptadas(request):
+    aceptadas = set()
+    for parte in request.headers.get('Accept-Encoding', '').split(','):
+        codificacion, _, parametros = parte.strip().partition(';')
+        if parametros.replace(' ', '') not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            aceptadas.add(codificacion.strip().lower())
+    return aceptadas
+
+
+class EstaticosMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.raiz = settings.STATIC_ROOT
+        self.prefijo = '/' + settings.STATIC_URL.lstrip('/') if settings.STATIC_URL else None
+        # Nombres con hash según el manifiesto de collectstatic
+        self.con_hash = set(getattr(staticfiles_storage, 'hashed_files', {}).values())
+        self.es_async = iscoroutinefunction(get_response)
+        if self.es_async:
+            markcoroutinefunction(self)
+
+    def _servir(self, request):
+        if not (self.raiz and self.prefijo and request.path.startswith(self.prefijo)):
+            return None
+        if request.method not in ('GET', 'HEAD'):
+            return None
+        nombre = request.path[len(self.prefijo):]
+        try:
+            ruta = safe_join(self.raiz, nombre)
+        except SuspiciousFileOperation:
+            return None
+        if nombre.endswith(('.gz', '.br')) or not os.path.isfile(ruta):
+            return None
+
+        estado = os.stat(ruta)
+        inmutable = nombre in self.con_hash
+        if not inmutable and not was_modified_since(request.headers.get('If-Modified-Since'), estado.st_mtime):
+            return HttpResponseNotModified()
+
+        tipo, _ = mimetypes.guess_type(ruta)
+        aceptadas = _codificaciones_aceptadas(request)
+        archivo, codificacion = ruta, None
+        for nombre_codificacion, sufijo in CODIFICACIONES:
+            if nombre_codificacion in aceptadas and os.path.isfile(ruta + sufijo):
+                archivo, codificacion = ruta + sufijo, nombre_codificacion
+                break
+
+        response = FileResponse(open(archivo, 'rb'), content_type=tipo or 'application/octet-stream')
+        # FileResponse lo añade por el nombre del archivo (.gz / .br incluidos)
+        del response.headers['Content-Disposition']
+        if codificacion:
+            response.headers['Content-Encoding'] = codificacion
+        response.headers['Vary'] = 'Accept-Encoding'
+        response.headers['Last-Modified'] = http_date(estado.st_mtime)
+        if inmutable:
+            response.headers['Cache-Control'] = f'public, max-age={MAX_AGE_HASH}, immutable'
+        else:
+            response.headers['Cache-Control'] = f'public, max-age={MAX_AGE_SIN_HASH}'
+        return response
+
+    def __call__(self, request):
+        if self.es_async:
+            return self.__acall__(request)
+        return self._servir(request) or self.get_response(request)
+
+    async def __acall__(self, request):
+        return self._servir(request) or await self.get_response(request)
@@ -0,0 +1,207 @@
+import csv
+import io
+import re
+import zipfile
+from datetime import datetime
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from .filtros import filtrar_movimientos, filtrar_pedidos
+from .models import DetallePedido, MovimientoInventario, Pedido
+from .paginacion import lotes_por_id
+
+
+# =========================
+# EXPORTACIÓN EN STREAMING
+# =========================
+# Las filas se leen por bloques de id (paginacion.lotes_por_id) y cada bloque
+# se serializa y se envía antes de pedir el siguiente, así que la memoria es
+# constante y el primer byte sale de inmediato. El XLSX se escribe a mano
+# (hoja con cadenas en línea) dentro de un zip en modo streaming, sin
+# dependencias externas.
+
+TAM_LOTE = 2000
+
+FORMATOS = {
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+    'xlsx': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'xlsx'),
+}
+
+
+# =========================
+# DATOS
+# =========================
+def _movimientos(filtros):
+    encabezados = ['ID', 'Fecha', 'Tipo', 'Producto', 'Cantidad', 'Cliente', 'Usuario', 'Pedido', 'Descripción']
+    queryset = filtrar_movimientos(MovimientoInventario.objects.all(), filtros).values_list(
+        'id', 'fecha', 'tipo', 'producto__nombre', 'cantidad',
+        'cliente__nombre', 'usuario__username', 'pedido_id', 'descripcion'
+    )
+    return encabezados, queryset
+
+
+def _pedidos(filtros):
+    encabezados = [
+        'ID Detalle', 'Pedido', 'Fecha', 'Usuario', 'Estado', 'Total Pedido', 'Dirección',
+        'Producto', 'Cantidad', 'Precio Unitario', 'Subtotal'
+    ]
+    pedidos = filtrar_pedidos(Pedido.objects.all(), filtros)
+    queryset = DetallePedido.objects.filter(pedido__in=pedidos.values('id')).values_list(
+        'id', 'pedido_id', 'pedido__fecha', 'pedido__usuario__username', 'pedido__estado',
+        'pedido__total', 'pedido__direccion_entrega', 'producto__nombre',
+        'cantidad', 'precio_unitario', 'subtotal'
+    )
+    return encabezados, queryset
+
+
+EXPORTACIONES = {
+    'movimientos': _movimientos,
+    'pedidos': _pedidos,
+}
+
+
+def _valor(valor):
+    if valor is None:
+        return ''
+    if isinstance(valor, datetime):
+        return timezone.localtime(valor).strftime('%Y-%m-%d %H:%M:%S')
+    return valor
+
+
+# =========================
+# CSV
+# =========================
+def generar_csv(encabezados, lotes):
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    escritor.writerow(encabezados)
+    yield '\ufeff' + buffer.getvalue()  # BOM para que Excel detecte UTF-8
+
+    for lote in lotes:
+        buffer.seek(0)
+        buffer.truncate()
+        escritor.writerows([_valor(v) for v in fila] for fila in lote)
+        yield buffer.getvalue()
+
+
+# =========================
+# XLSX
+# =========================
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{hoja}" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+_HOJA_INICIO = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+_HOJA_FIN = '</sheetData></worksheet>'
+
+_CARACTERES_INVALIDOS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+class _Tubo(io.RawIOBase):
+    """Destino no posicionable: acumula lo que escribe el zip hasta vaciarlo."""
+
+    def __init__(self):
+        self._partes = []
+
+    def writable(self):
+        return True
+
+    def write(self, datos):
+        self._partes.append(bytes(datos))
+        return len(datos)
+
+    def vaciar(self):
+        datos = b''.join(self._partes)
+        self._partes.clear()
+        return datos
+
+
+def _celda(valor):
+    valor = _valor(valor)
+    if isinstance(valor, bool):
+        valor = str(valor)
+    if isinstance(valor, (int, float, Decimal)):
+        return f'<c><v>{valor}</v></c>'
+    texto = escape(_CARACTERES_INVALIDOS.sub('', str(valor)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{texto}</t></is></c>'
+
+
+def _fila(valores):
+    return '<row>' + ''.join(_celda(v) for v in valores) + '</row>'
+
+
+def generar_xlsx(encabezados, lotes, hoja='Datos'):
+    tubo = _Tubo()
+    with zipfile.ZipFile(tubo, 'w', zipfile.ZIP_DEFLATED) as archivo:
+        archivo.writestr('[Content_Types].xml', _CONTENT_TYPES)
+        archivo.writestr('_rels/.rels', _RELS)
+        archivo.writestr('xl/workbook.xml', _WORKBOOK.format(hoja=escape(hoja)))
+        archivo.writestr('xl/_rels/workbook.xml.rels', _WORKBOOK_RELS)
+        yield tubo.vaciar()
+
+        with archivo.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as destino:
+            destino.write((_HOJA_INICIO + _fila(encabezados)).encode())
+            for lote in lotes:
+                destino.write(''.join(_fila(fila) for fila in lote).encode())
+                datos = tubo.vaciar()
+                if datos:
+                    yield datos
+            destino.write(_HOJA_FIN.encode())
+    yield tubo.vaciar()
+
+
+# =========================
+# PUNTOS DE ENTRADA
+# =========================
+def generar_exportacion(nombre, formato, filtros, tam_lote=TAM_LOTE):
+    """Iterador de bloques (str para CSV, bytes para XLSX) de la exportación."""
+    encabezados, queryset = EXPORTACIONES[nombre](filtros)
+    lotes = lotes_por_id(queryset, tam_lote)
+    if formato == 'xlsx':
+        return generar_xlsx(encabezados, lotes, hoja=nombre.capitalize())
+    return generar_csv(encabezados, lotes)
+
+
+def respuesta_exportacion(nombre, formato, filtros):
+    formato = formato if formato in FORMATOS else 'csv'
+    content_type, extension = FORMATOS[formato]
+    response = StreamingHttpResponse(generar_exportacion(nombre, formato, filtros), content_type=content_type)
+    archivo = f"{nombre}_{timezone.localdate():%Y%m%d}.{extension}"
+    response['Content-Disposition'] = f'attachment; filename="{archivo}"'
+    return response
@@ -0,0 +1,78 @@
+from datetime import datetime
+
+from django.db.models import Count
+
+from .models import DetallePedido, MovimientoInventario, Pedido
+
+
+# =========================
+# FILTROS COMPARTIDOS
+# =========================
+# Los mismos filtros de las vistas movimientos y pedidos_admin se usan en las
+# exportaciones; ``params`` puede ser request.GET o un diccionario. Las
+# consultas completas de esas vistas también viven aquí para que
+# verificar_indices revise exactamente lo que ejecutan.
+
+CAMPOS_MOVIMIENTOS = ('tipo', 'producto', 'fecha_desde', 'fecha_hasta')
+CAMPOS_PEDIDOS = ('estado', 'fecha_desde', 'fecha_hasta')
+
+
+def _fin_del_dia(fecha):
+    fecha_dt = datetime.strptime(fecha, '%Y-%m-%d')
+    return fecha_dt.replace(hour=23, minute=59, second=59)
+
+
+def leer_filtros(params, campos):
+    return {campo: params.get(campo) for campo in campos}
+
+
+def filtrar_movimientos(queryset, filtros):
+    if filtros.get('tipo'):
+        queryset = queryset.filter(tipo=filtros['tipo'])
+    if filtros.get('producto'):
+        queryset = queryset.filter(producto_id=filtros['producto'])
+    if filtros.get('fecha_desde'):
+        queryset = queryset.filter(fecha__gte=filtros['fecha_desde'])
+    if filtros.get('fecha_hasta'):
+        queryset = queryset.filter(fecha__lte=_fin_del_dia(filtros['fecha_hasta']))
+    return queryset
+
+
+def filtrar_pedidos(queryset, filtros):
+    if filtros.get('estado'):
+        queryset = queryset.filter(estado=filtros['estado'])
+    if filtros.get('fecha_desde'):
+        queryset = queryset.filter(fecha__gte=filtros['fecha_desde'])
+    if filtros.get('fecha_hasta'):
+        queryset = queryset.filter(fecha__lte=_fin_del_dia(filtros['fecha_hasta']))
+    return queryset
+
+
+# =========================
+# CONSULTAS DE LAS VISTAS
+# =========================
+def consulta_movimientos(filtros):
+    """Movimientos filtrados con las relaciones que muestra la vista movimientos."""
+    return filtrar_movimientos(
+        MovimientoInventario.objects.select_related('producto', 'cliente', 'usuario', 'pedido__usuario'),
+        filtros,
+    )
+
+
+def consulta_pedidos(filtros):
+    """Pedidos filtrados de la vista pedidos_admin."""
+    return filtrar_pedidos(Pedido.objects.select_related('usuario'), filtros)
+
+
+def consulta_mis_pedidos(usuario_id):
+    return Pedido.objects.filter(usuario_id=usuario_id).order_by('-fecha')
+
+
+def items_por_pedido(pedido_ids):
+    """Pares (pedido_id, artículos) de los pedidos indicados, en un solo GROUP BY."""
+    return (
+        DetallePedido.objects.filter(pedido_id__in=pedido_ids)
+        .values_list('pedido_id')
+        .annotate(total=Count('id'))
+        .order_by()
+    )
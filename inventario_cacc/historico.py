@@ -0,0 +1,137 @@
+from datetime import datetime, time, timedelta
+
+from django.db.models import Case, F, Max, Min, OuterRef, Subquery, Sum, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import CorteStock, MovimientoInventario, Producto
+from .paginacion import lotes_por_id
+
+
+# =========================
+# STOCK HISTÓRICO
+# =========================
+# El stock en una fecha pasada sale del corte (foto del stock de todos los
+# productos, tabla corte_stock) más cercano a esa fecha, aplicando solo los
+# movimientos entre el corte y la fecha pedida: hacia adelante si el corte es
+# anterior, hacia atrás si es posterior. El stock actual cuenta como un corte
+# más. Así el costo depende de la distancia al corte y no de los años de
+# historial acumulado.
+#
+# Un corte se toma MARGEN_CORTE antes de "ahora": la fecha de un movimiento
+# se asigna al guardarlo, antes de que su transacción confirme, y con el
+# margen todo movimiento fechado antes del corte ya es visible al leerlo.
+# Los ajustes hechos editando el stock del producto (sin movimiento) no
+# quedan en el historial; el siguiente corte los absorbe.
+
+MARGEN_CORTE = timedelta(minutes=5)
+
+# Efecto de cada movimiento sobre el stock
+DELTA = Case(When(tipo='ENTRADA', then=F('cantidad')), default=-F('cantidad'))
+
+
+def fin_del_dia(dia):
+    return timezone.make_aware(datetime.combine(dia, time.max))
+
+
+def tomar_corte(momento=None, tam_lote=1000):
+    """
+    Guarda el stock de todos los productos en ``momento`` (por defecto, ahora
+    menos MARGEN_CORTE). Cada lote se calcula en una sola consulta: stock
+    actual menos lo que se movió después del momento. Devuelve el número de
+    filas escritas.
+    """
+    momento = momento or timezone.now() - MARGEN_CORTE
+    posteriores = (
+        MovimientoInventario.objects
+        .filter(producto=OuterRef('pk'), fecha__gt=momento)
+        .order_by()
+        .values('producto')
+        .annotate(neto=Sum(DELTA))
+        .values('neto')
+    )
+    productos = (
+        Producto.objects
+        .filter(fecha_creacion__lte=timezone.localdate(momento))
+        .annotate(posterior=Coalesce(Subquery(posteriores), 0))
+        .values_list('id', 'stock', 'posterior')
+    )
+
+    escritas = 0
+    for lote in lotes_por_id(productos, tam_lote):
+        CorteStock.objects.bulk_create(
+            [CorteStock(producto_id=pid, fecha=momento, stock=stock - posterior) for pid, stock, posterior in lote],
+            ignore_conflicts=True,
+        )
+        escritas += len(lote)
+    return escritas
+
+
+def _netos(desde, hasta, productos):
+    """Efecto neto por producto de los movimientos con fecha en (desde, hasta]."""
+    return dict(
+        MovimientoInventario.objects
+        .filter(fecha__gt=desde, fecha__lte=hasta, producto__in=productos.values('id'))
+        .order_by()
+        .values_list('producto_id')
+        .annotate(neto=Sum(DELTA))
+    )
+
+
+def _cortes_vecinos(momento):
+    anterior = CorteStock.objects.filter(fecha__lte=momento).aggregate(fecha=Max('fecha'))['fecha']
+    siguiente = CorteStock.objects.filter(fecha__gt=momento).aggregate(fecha=Min('fecha'))['fecha']
+    return anterior, siguiente
+
+
+def stock_en(momento, productos=None):
+    """
+    Stock de cada producto en ``momento``: {producto_id: stock}. ``productos``
+    es un queryset de Producto (por defecto, todos); los creados después del
+    momento no aparecen.
+    """
+    productos = productos if productos is not None else Producto.objects.all()
+    ahora = timezone.now()
+    if momento >= ahora:
+        return dict(productos.values_list('id', 'stock'))
+    productos = productos.filter(fecha_creacion__lte=timezone.localdate(momento))
+
+    # Partir del corte más cercano; el stock actual es el corte de "ahora"
+    anterior, siguiente = _cortes_vecinos(momento)
+    origen = min(
+        [fecha for fecha in (anterior, siguiente) if fecha] + [ahora],
+        key=lambda fecha: abs(fecha - momento),
+    )
+
+    actuales = dict(productos.values_list('id', 'stock'))
+    if origen == ahora:
+        base, netos, signo = actuales, _netos(momento, ahora, productos), -1
+    else:
+        base = dict(
+            CorteStock.objects.filter(fecha=origen, producto__in=productos.values('id'))
+            .values_list('producto_id', 'stock')
+        )
+        if origen <= momento:
+            netos, signo = _netos(origen, momento, productos), 1
+        else:
+            netos, signo = _netos(momento, origen, productos), -1
+
+    resultado = {pid: stock + signo * netos.get(pid, 0) for pid, stock in base.items()}
+
+    # Productos que no estaban en ese corte: se calculan desde el stock actual
+    faltantes = actuales.keys() - resultado.keys()
+    if faltantes:
+        netos = _netos(momento, ahora, productos.filter(id__in=faltantes))
+        resultado.update({pid: actuales[pid] - netos.get(pid, 0) for pid in faltantes})
+    return resultado
+
+
+def stock_por_categoria_en(momento, productos=None):
+    """Stock total por categoría en ``momento``: {categoria_id: unidades}."""
+    productos = productos if productos is not None else Producto.objects.all()
+    stocks = stock_en(momento, productos)
+    totales = {}
+    for pid, categoria_id in productos.values_list('id', 'categoria_id').iterator():
+        if pid in stocks:
+            totales[categoria_id] = totales.get(categoria_id, 0) + stocks[pid]
+    return totales
@@ -0,0 +1,353 @@
+import csv
+import io
+import json
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+from django.db import transaction
+from django.db.models import Case, F, When
+
+from .busqueda import indexar_productos
+from .catalogo import invalidar_catalogo
+from .models import Categoria, MovimientoInventario, Producto, Proveedor
+from .resumen import acumular, dia_de
+
+
+# =========================
+# IMPORTACIÓN MASIVA DE PRODUCTOS
+# =========================
+# El archivo (CSV o JSON) se lee como un flujo de filas que se procesan por
+# lotes: cada lote se valida, se resuelve contra un diccionario en memoria de
+# categorías y proveedores por nombre, y se escribe con un bulk_create para
+# los productos nuevos y un bulk_update para los existentes (identificados
+# por id si la fila lo trae, o por nombre sin distinguir mayúsculas). De un
+# producto existente solo se actualizan las columnas que la fila trae con
+# valor: una columna ausente o vacía conserva lo que había. El stock no se
+# escribe directamente: el archivo indica el stock deseado y la diferencia se
+# registra como un movimiento de entrada o salida. Como en el checkout, cada
+# lote ajusta el stock con un número fijo de consultas (bloqueo de las filas
+# en orden de id, un UPDATE con CASE, una inserción masiva de movimientos y
+# la suma al resumen diario) e invalida el catálogo una sola vez. Los errores
+# se reportan por fila sin detener el resto de la importación.
+
+TAM_LOTE = 1000
+MAX_ERRORES_REPORTADOS = 1000
+CAMPOS_ACTUALIZABLES = ('descripcion', 'categoria', 'proveedor', 'precio')
+# Límites de las columnas: DecimalField(max_digits=12, decimal_places=2) e IntegerField
+PRECIO_MAXIMO = Decimal('9999999999.99')
+STOCK_MAXIMO = 2147483647
+DESCRIPCION_IMPORTACION = "Importación de productos"
+
+
+class ResultadoImportacion:
+    def __init__(self):
+        self.filas = 0
+        self.creados = 0
+        self.actualizados = 0
+        self.errores = []
+        self.total_errores = 0
+
+    def error(self, fila, mensaje):
+        self.total_errores += 1
+        if len(self.errores) < MAX_ERRORES_REPORTADOS:
+            self.errores.append((fila, mensaje))
+
+    def __str__(self):
+        return (
+            f"{self.filas} filas: {self.creados} creados, "
+            f"{self.actualizados} actualizados, {self.total_errores} con errores"
+        )
+
+
+# =========================
+# LECTURA
+# =========================
+def _texto(archivo):
+    if isinstance(archivo, io.TextIOBase):
+        return archivo
+    return io.TextIOWrapper(archivo, encoding='utf-8-sig', newline='')
+
+
+def leer_filas(archivo, formato='csv'):
+    """
+    Itera (número de fila, diccionario) sobre un CSV con encabezados, un JSON
+    Lines (un objeto por línea) o un arreglo JSON.
+    """
+    texto = _texto(archivo)
+    if formato == 'csv':
+        for numero, fila in enumerate(csv.DictReader(texto), start=2):
+            yield numero, fila
+        return
+
+    primera = texto.readline()
+    if primera.lstrip().startswith('['):
+        # Arreglo JSON: no se puede leer por partes sin dependencias extra
+        for numero, fila in enumerate(json.loads(primera + texto.read()), start=1):
+            yield numero, fila
+        return
+
+    for numero, linea in enumerate(_lineas(primera, texto), start=1):
+        if linea.strip():
+            try:
+                yield numero, json.loads(linea)
+            except ValueError as e:
+                yield numero, {'__error__': f"JSON inválido: {e}"}
+
+
+def _lineas(primera, texto):
+    yield primera
+    yield from texto
+
+
+# =========================
+# VALIDACIÓN
+# =========================
+class _Catalogos:
+    """Categorías y proveedores por nombre (sin distinguir mayúsculas)."""
+
+    def __init__(self, crear_faltantes=False):
+        self.crear_faltantes = crear_faltantes
+        self.categorias = {c.nombre.strip().lower(): c for c in Categoria.objects.all()}
+        self.proveedores = {p.nombre.strip().lower(): p for p in Proveedor.objects.all()}
+
+    def resolver(self, nombre, tabla, modelo, etiqueta):
+        nombre = (nombre or '').strip()
+        if not nombre:
+            return None
+        objeto = tabla.get(nombre.lower())
+        if objeto is None:
+            if not self.crear_faltantes:
+                raise ValueError(f"{etiqueta} '{nombre}' no existe")
+            objeto = tabla[nombre.lower()] = modelo.objects.create(nombre=nombre)
+        return objeto
+
+    def categoria(self, nombre):
+        return self.resolver(nombre, self.categorias, Categoria, "La categoría")
+
+    def proveedor(self, nombre):
+        return self.resolver(nombre, self.proveedores, Proveedor, "El proveedor")
+
+
+def _clave_nombre(nombre):
+    return nombre.strip().lower()
+
+
+def _con_valor(fila, campo):
+    valor = fila.get(campo)
+    return valor is not None and str(valor).strip() != ''
+
+
+def _validar(fila, catalogos):
+    """
+    Datos de la fila ya convertidos. Solo incluye los campos que la fila trae
+    con valor (además de id y nombre), que son los que se escriben.
+    """
+    if not isinstance(fila, dict):
+        raise ValueError("La fila no es un objeto con campos")
+    if '__error__' in fila:
+        raise ValueError(fila['__error__'])
+
+    nombre = str(fila.get('nombre') or '').strip()
+    if not nombre:
+        raise ValueError("El nombre es obligatorio")
+    if len(nombre) > 150:
+        raise ValueError("El nombre supera los 150 caracteres")
+
+    datos = {'id': None, 'nombre': nombre}
+
+    if _con_valor(fila, 'id'):
+        try:
+            datos['id'] = int(fila['id'])
+        except (TypeError, ValueError):
+            raise ValueError(f"Id no válido: {fila['id']}")
+
+    if _con_valor(fila, 'descripcion'):
+        datos['descripcion'] = str(fila['descripcion'])
+    if _con_valor(fila, 'categoria'):
+        datos['categoria'] = catalogos.categoria(fila['categoria'])
+    if _con_valor(fila, 'proveedor'):
+        datos['proveedor'] = catalogos.proveedor(fila['proveedor'])
+
+    if _con_valor(fila, 'precio'):
+        try:
+            precio = Decimal(str(fila['precio']))
+            if not precio.is_finite():
+                raise InvalidOperation
+            datos['precio'] = precio.quantize(Decimal('0.01'))
+        except InvalidOperation:
+            raise ValueError(f"Precio no válido: {fila['precio']}")
+        if datos['precio'] < 0:
+            raise ValueError("El precio no puede ser negativo")
+        if datos['precio'] > PRECIO_MAXIMO:
+            raise ValueError(f"El precio supera el máximo ({PRECIO_MAXIMO})")
+
+    if _con_valor(fila, 'stock'):
+        try:
+            datos['stock'] = int(fila['stock'])
+        except (TypeError, ValueError, OverflowError):
+            raise ValueError(f"Stock no válido: {fila['stock']}")
+        if datos['stock'] < 0:
+            raise ValueError("El stock no puede ser negativo")
+        if datos['stock'] > STOCK_MAXIMO:
+            raise ValueError(f"El stock supera el máximo ({STOCK_MAXIMO})")
+
+    return datos
+
+
+# =========================
+# ESCRITURA
+# =========================
+def _aplicar(producto, datos):
+    """Copia al producto los campos de la fila y devuelve los que cambió."""
+    campos = ['nombre'] + [campo for campo in CAMPOS_ACTUALIZABLES if campo in datos]
+    for campo in campos:
+        setattr(producto, campo, datos[campo])
+    return tuple(campos)
+
+
+def _ajustar_stocks(objetivos, usuario):
+    """
+    Lleva cada producto al stock indicado registrando la diferencia como
+    movimiento. Las filas quedan bloqueadas (en orden de id) entre la lectura
+    del stock actual y el UPDATE, así que un pedido o movimiento concurrente
+    no se pierde. Debe llamarse dentro de la transacción del lote.
+    """
+    actuales = dict(
+        Producto.objects.select_for_update().filter(id__in=objetivos).order_by('id').values_list('id', 'stock')
+    )
+    diferencias = {
+        producto_id: objetivos[producto_id] - stock_actual
+        for producto_id, stock_actual in actuales.items()
+        if objetivos[producto_id] != stock_actual
+    }
+    if not diferencias:
+        return
+    ids = sorted(diferencias)
+
+    Producto.objects.filter(id__in=ids).update(
+        stock=Case(
+            *[When(id=pid, then=F('stock') + diferencias[pid]) for pid in ids],
+            default=F('stock'),
+        )
+    )
+
+    MovimientoInventario.objects.bulk_create([
+        MovimientoInventario(
+            producto_id=pid,
+            tipo='ENTRADA' if diferencias[pid] > 0 else 'SALIDA',
+            cantidad=abs(diferencias[pid]),
+            usuario=usuario,
+            descripcion=DESCRIPCION_IMPORTACION,
+        )
+        for pid in ids
+    ])
+    hoy = dia_de()
+    acumular(hoy, 'ENTRADA', {pid: d for pid, d in diferencias.items() if d > 0})
+    acumular(hoy, 'SALIDA', {pid: -d for pid, d in diferencias.items() if d < 0})
+
+
+def _recuperar_creados(crear, existentes):
+    """
+    Productos recién insertados con su id. MySQL no devuelve los ids de un
+    bulk_create, así que se buscan por nombre; como la comparación de la base
+    no distingue mayúsculas ni acentos, solo se aceptan los nombres exactos
+    que se insertaron (el de id mayor si se repite) y se dejan fuera los
+    productos que ya existían.
+    """
+    if all(p.pk is not None for p in crear):
+        return crear
+    insertados = {p.nombre: p for p in crear}
+    recuperados = {}
+    for producto in Producto.objects.filter(nombre__in=insertados).exclude(id__in=existentes).order_by('id'):
+        if producto.nombre in insertados:
+            recuperados[producto.nombre] = producto
+    creados = []
+    for nombre, producto in recuperados.items():
+        original = insertados[nombre]
+        producto.categoria, producto.proveedor = original.categoria, original.proveedor
+        creados.append(producto)
+    return creados
+
+
+def _guardar_lote(validas, resultado, tam_lote, usuario):
+    # Si un producto aparece varias veces en el lote, gana la última fila
+    por_id = {d['id']: d for d in validas if d['id']}
+    por_nombre = {_clave_nombre(d['nombre']): d for d in validas if not d['id']}
+
+    existentes = list(Producto.objects.filter(id__in=por_id)) if por_id else []
+    for producto_id in set(por_id) - {p.id for p in existentes}:
+        resultado.error(por_id[producto_id]['fila'], f"El producto con id {producto_id} no existe")
+
+    por_nombre_existentes = {}
+    nombres = [d['nombre'] for d in por_nombre.values()]
+    for producto in Producto.objects.filter(nombre__in=nombres).order_by('id') if nombres else []:
+        por_nombre_existentes.setdefault(_clave_nombre(producto.nombre), producto)
+
+    # Productos a actualizar agrupados por las columnas que trae su fila
+    actualizar = {}
+    objetivos = {}
+    for producto in existentes:
+        actualizar.setdefault(_aplicar(producto, por_id[producto.id]), []).append(producto)
+        if 'stock' in por_id[producto.id]:
+            objetivos[producto.id] = por_id[producto.id]['stock']
+    crear = []
+    for clave, datos in por_nombre.items():
+        producto = por_nombre_existentes.get(clave)
+        if producto:
+            actualizar.setdefault(_aplicar(producto, datos), []).append(producto)
+            if 'stock' in datos:
+                objetivos[producto.id] = datos['stock']
+        else:
+            producto = Producto(stock=0)
+            _aplicar(producto, datos)
+            crear.append(producto)
+    actualizados = [producto for grupo in actualizar.values() for producto in grupo]
+
+    with transaction.atomic():
+        for campos, productos in actualizar.items():
+            Producto.objects.bulk_update(productos, campos, batch_size=tam_lote)
+        Producto.objects.bulk_create(crear, batch_size=tam_lote)
+        creados = _recuperar_creados(crear, [p.id for p in actualizados])
+
+        # Los productos nuevos empiezan en 0 y reciben su stock como entrada
+        for producto in creados:
+            stock = por_nombre[_clave_nombre(producto.nombre)].get('stock')
+            if stock:
+                objetivos[producto.id] = stock
+        if objetivos:
+            _ajustar_stocks(objetivos, usuario)
+
+        indexar_productos(actualizados + creados)
+        # bulk_create, bulk_update y el UPDATE de stock no disparan señales
+        transaction.on_commit(invalidar_catalogo)
+
+    resultado.creados += len(crear)
+    resultado.actualizados += len(actualizados)
+
+
+def importar_productos(archivo, formato='csv', tam_lote=TAM_LOTE, crear_faltantes=False, usuario=None):
+    """Importa productos desde ``archivo`` y devuelve un ResultadoImportacion."""
+    resultado = ResultadoImportacion()
+    catalogos = _Catalogos(crear_faltantes)
+    filas = leer_filas(archivo, formato)
+
+    while True:
+        lote = list(islice(filas, tam_lote))
+        if not lote:
+            break
+        resultado.filas += len(lote)
+
+        validas = []
+        for numero, fila in lote:
+            try:
+                datos = _validar(fila, catalogos)
+            except ValueError as e:
+                resultado.error(numero, str(e))
+                continue
+            datos['fila'] = numero
+            validas.append(datos)
+
+        if validas:
+            _guardar_lote(validas, resultado, tam_lote, usuario)
+
+    return resultado
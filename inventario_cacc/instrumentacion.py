@@ -0,0 +1,228 @@
+import logging
+import random
+import re
+import threading
+import time
+from collections import Counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger(__name__)
+
+
+# =========================
+# INSTRUMENTACIÓN POR VISTA
+# =========================
+# Una fracción de las peticiones (settings.INSTRUMENTACION_MUESTREO) se mide:
+# tiempo total, número y tiempo de consultas SQL y huellas de consultas
+# repetidas (la misma consulta con distintos parámetros, típico de un N+1).
+# Los acumulados viven en memoria del proceso y se vuelcan cada
+# INTERVALO_VOLCADO segundos a la tabla metrica_vista, que es la que leen el
+# endpoint de administración y el comando reporte_vistas. Con el muestreo en
+# 0 el middleware solo llama a la vista.
+#
+# La conexión a la base es propia de cada hilo y las vistas async consultan
+# desde los hilos de sync_to_async, así que el registro de la petición no se
+# cuelga de una conexión concreta: viaja en una ContextVar (que sí pasa a
+# esos hilos) y un execute_wrapper instalado en todas las conexiones lo usa
+# cuando está presente.
+
+INTERVALO_VOLCADO = 60
+MAX_DUPLICADAS = 10
+
+_LITERALES = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_LISTAS = re.compile(r"\(\s*(?:\?|%s)(?:\s*,\s*(?:\?|%s))*\s*\)")
+
+
+def huella(sql):
+    """Consulta sin literales: dos consultas con la misma huella difieren solo en parámetros."""
+    return _LISTAS.sub('(...)', _LITERALES.sub('?', sql))
+
+
+class _Registro:
+    def __init__(self):
+        self.consultas = 0
+        self.tiempo_sql = 0.0
+        self.huellas = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.tiempo_sql += time.perf_counter() - inicio
+            self.consultas += 1
+            self.huellas[huella(sql)] += 1
+
+    def duplicadas(self):
+        return {sql: veces for sql, veces in self.huellas.items() if veces > 1}
+
+
+_registro_actual = ContextVar('registro_instrumentacion', default=None)
+
+
+def _envoltura(execute, sql, params, many, context):
+    registro = _registro_actual.get()
+    if registro is None:
+        return execute(sql, params, many, context)
+    return registro(execute, sql, params, many, context)
+
+
+def _instalar(sender=None, connection=None, **kwargs):
+    if _envoltura not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_envoltura)
+
+
+connection_created.connect(_instalar)
+
+
+class Acumulador:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._vistas = {}
+        self._ultimo_volcado = time.monotonic()
+
+    def registrar(self, vista, tiempo, registro, exceso):
+        with self._lock:
+            datos = self._vistas.setdefault(vista, {
+                'peticiones': 0, 'tiempo_ms': 0.0, 'tiempo_max_ms': 0.0, 'consultas': 0,
+                'consultas_max': 0, 'tiempo_sql_ms': 0.0, 'excesos': 0, 'duplicadas': Counter(),
+            })
+            datos['peticiones'] += 1
+            datos['tiempo_ms'] += tiempo * 1000
+            datos['tiempo_max_ms'] = max(datos['tiempo_max_ms'], tiempo * 1000)
+            datos['consultas'] += registro.consultas
+            datos['consultas_max'] = max(datos['consultas_max'], registro.consultas)
+            datos['tiempo_sql_ms'] += registro.tiempo_sql * 1000
+            datos['excesos'] += exceso
+            datos['duplicadas'].update(registro.duplicadas())
+
+    def pendiente_volcado(self):
+        return time.monotonic() - self._ultimo_volcado >= INTERVALO_VOLCADO
+
+    def tomar(self):
+        with self._lock:
+            vistas, self._vistas = self._vistas, {}
+            self._ultimo_volcado = time.monotonic()
+        return vistas
+
+    def volcar(self):
+        """Suma lo acumulado en memoria a la tabla metrica_vista."""
+        from .models import MetricaVista
+
+        vistas = self.tomar()
+        if not vistas:
+            return
+        with transaction.atomic():
+            existentes = {
+                m.vista: m for m in MetricaVista.objects.select_for_update().filter(vista__in=vistas).order_by('vista')
+            }
+            for vista, datos in vistas.items():
+                metrica = existentes.get(vista) or MetricaVista(vista=vista)
+                metrica.peticiones += datos['peticiones']
+                metrica.tiempo_ms += datos['tiempo_ms']
+                metrica.tiempo_max_ms = max(metrica.tiempo_max_ms, datos['tiempo_max_ms'])
+                metrica.consultas += datos['consultas']
+                metrica.consultas_max = max(metrica.consultas_max, datos['consultas_max'])
+                metrica.tiempo_sql_ms += datos['tiempo_sql_ms']
+                metrica.excesos += datos['excesos']
+                duplicadas = Counter(metrica.duplicadas) + datos['duplicadas']
+                metrica.duplicadas = dict(duplicadas.most_common(MAX_DUPLICADAS))
+                metrica.save()
+
+
+acumulador = Acumulador()
+
+
+def resumen(metricas):
+    """Filas con promedios a partir de objetos MetricaVista."""
+    filas = []
+    for m in metricas:
+        n = m.peticiones or 1
+        filas.append({
+            'vista': m.vista,
+            'peticiones': m.peticiones,
+            'tiempo_medio_ms': round(m.tiempo_ms / n, 2),
+            'tiempo_max_ms': round(m.tiempo_max_ms, 2),
+            'consultas_medias': round(m.consultas / n, 2),
+            'consultas_max': m.consultas_max,
+            'tiempo_sql_medio_ms': round(m.tiempo_sql_ms / n, 2),
+            'excesos': m.excesos,
+            'duplicadas': m.duplicadas,
+        })
+    return filas
+
+
+class InstrumentacionMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.muestreo = getattr(settings, 'INSTRUMENTACION_MUESTREO', 0.0)
+        self.presupuestos = getattr(settings, 'INSTRUMENTACION_PRESUPUESTOS', {})
+        self.es_async = iscoroutinefunction(get_response)
+        if self.es_async:
+            markcoroutinefunction(self)
+        # Conexión ya abierta en este hilo (las nuevas llegan por connection_created)
+        _instalar(connection=connection)
+
+    def _muestrear(self):
+        return self.muestreo > 0 and random.random() < self.muestreo
+
+    def __call__(self, request):
+        if self.es_async:
+            return self.__acall__(request)
+        if not self._muestrear():
+            return self.get_response(request)
+
+        registro = _Registro()
+        token = _registro_actual.set(registro)
+        inicio = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _registro_actual.reset(token)
+        self._registrar(request, time.perf_counter() - inicio, registro)
+        if acumulador.pendiente_volcado():
+            self._volcar()
+        return response
+
+    async def __acall__(self, request):
+        if not self._muestrear():
+            return await self.get_response(request)
+
+        registro = _Registro()
+        token = _registro_actual.set(registro)
+        inicio = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _registro_actual.reset(token)
+        self._registrar(request, time.perf_counter() - inicio, registro)
+        if acumulador.pendiente_volcado():
+            await sync_to_async(self._volcar)()
+        return response
+
+    def _registrar(self, request, tiempo, registro):
+        match = request.resolver_match
+        vista = match.view_name if match else 'sin_ruta'
+        presupuesto = self.presupuestos.get(vista)
+        exceso = presupuesto is not None and registro.consultas > presupuesto
+        if exceso:
+            logger.warning(
+                "La vista %s hizo %d consultas (presupuesto %d) en %s",
+                vista, registro.consultas, presupuesto, request.path
+            )
+        acumulador.registrar(vista, tiempo, registro, exceso)
+
+    def _volcar(self):
+        try:
+            acumulador.volcar()
+        except Exception:
+            logger.exception("No se pudieron guardar las métricas de instrumentación")
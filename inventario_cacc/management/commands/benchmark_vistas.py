@@ -0,0 +1,357 @@
+import json
+import math
+import time
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+from django.urls import get_resolver, reverse
+from django.utils import timezone
+
+from inventario_cacc.carrito import Carrito
+from inventario_cacc.models import Categoria, Cliente, MovimientoInventario, Pedido, Perfil, Producto, Proveedor
+from inventario_cacc.stock import registrar_movimiento
+
+
+# =========================
+# BENCHMARK DE VISTAS
+# =========================
+# Recorre las vistas de urls.py con el cliente de pruebas de Django sobre una
+# base de prueba sembrada con generar_datos (o sobre la base actual con
+# --bd-actual) y mide por escenario la latencia p50/p95 y el número de
+# consultas SQL. Con --guardar escribe la línea base en JSON; sin él compara
+# contra la línea base y termina con error si algún escenario empeora más de
+# lo tolerado.
+
+LINEA_BASE = Path(settings.BASE_DIR) / 'benchmark_linea_base.json'
+
+# Diferencias de tiempo por debajo de este margen se consideran ruido
+MARGEN_MS = 5
+
+
+def _percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[max(math.ceil(p / 100 * len(ordenados)) - 1, 0)]
+
+
+# =========================
+# ESCENARIOS
+# =========================
+# Cada escenario: vista (nombre en urls.py), usuario ('admin', 'cliente' o
+# None), método, url y datos. url y datos pueden ser funciones del contexto;
+# 'preparar' se ejecuta antes de cada medición sin contar su tiempo.
+
+def _url(nombre, *args):
+    return lambda ctx: reverse(nombre, args=[ctx[a] if isinstance(a, str) else a for a in args])
+
+
+def _llenar_carrito(ctx):
+    Carrito(ctx['cliente']).agregar(ctx['producto'], 1, ctx['precio'])
+
+
+def _movimiento_temporal(ctx):
+    movimiento = registrar_movimiento(ctx['producto'], 'ENTRADA', 1, usuario=ctx['admin'], descripcion='benchmark')
+    ctx['movimiento_temporal'] = movimiento.id
+
+
+def _categoria_temporal(ctx):
+    ctx['categoria_temporal'] = Categoria.objects.create(nombre='Benchmark').id
+
+
+def _proveedor_temporal(ctx):
+    ctx['proveedor_temporal'] = Proveedor.objects.create(nombre='Benchmark').id
+
+
+def _cliente_temporal(ctx):
+    ctx['cliente_temporal'] = Cliente.objects.create(nombre='Benchmark').id
+
+
+def _producto_temporal(ctx):
+    ctx['producto_temporal'] = Producto.objects.create(nombre='Benchmark', precio=1, stock=0).id
+
+
+def _archivo_importacion(ctx):
+    contenido = 'nombre,precio,stock\n' + ''.join(f'Importado {i},{i + 1},{i}\n' for i in range(50))
+    return {'archivo': SimpleUploadedFile('productos.csv', contenido.encode())}
+
+
+ESCENARIOS = [
+    {'nombre': 'login', 'vista': 'login', 'usuario': None, 'url': '/'},
+    {'nombre': 'registro', 'vista': 'registro', 'usuario': None, 'url': '/registro/'},
+    {'nombre': 'catalogo', 'vista': 'home', 'usuario': 'cliente', 'url': '/home/'},
+    {'nombre': 'catalogo busqueda', 'vista': 'home', 'usuario': 'cliente', 'url': '/home/?buscar=leche+light'},
+    {'nombre': 'catalogo categoria', 'vista': 'home', 'usuario': 'cliente', 'url': lambda ctx: f"/home/?categoria={ctx['categoria']}&orden=precio"},
+    {'nombre': 'fragmento producto', 'vista': 'fragmento_producto', 'usuario': 'cliente', 'url': _url('fragmento_producto', 'producto')},
+    {'nombre': 'carrito agregar', 'vista': 'agregar_carrito', 'usuario': 'cliente', 'metodo': 'post',
+     'url': '/carrito/agregar/', 'datos': lambda ctx: {'producto_id': ctx['producto'], 'cantidad': 1}},
+    {'nombre': 'carrito ver', 'vista': 'ver_carrito', 'usuario': 'cliente', 'url': '/carrito/'},
+    {'nombre': 'carrito actualizar', 'vista': 'actualizar_cantidad_carrito', 'usuario': 'cliente', 'metodo': 'post',
+     'url': _url('actualizar_cantidad_carrito', 'producto'), 'datos': {'cantidad': 1}, 'preparar': _llenar_carrito},
+    {'nombre': 'carrito eliminar linea', 'vista': 'eliminar_del_carrito', 'usuario': 'cliente',
+     'url': _url('eliminar_del_carrito', 'producto'), 'preparar': _llenar_carrito},
+    {'nombre': 'carrito vaciar', 'vista': 'vaciar_carrito', 'usuario': 'cliente', 'url': '/carrito/vaciar/',
+     'preparar': _llenar_carrito},
+    {'nombre': 'checkout', 'vista': 'confirmar_pedido', 'usuario': 'cliente', 'metodo': 'post',
+     'url': '/confirmar-pedido/', 'datos': {'direccion_entrega': 'Calle 1'}, 'preparar': _llenar_carrito},
+    {'nombre': 'mis pedidos', 'vista': 'mis_pedidos', 'usuario': 'cliente', 'url': '/mis-pedidos/'},
+    {'nombre': 'fragmento pedido', 'vista': 'fragmento_pedido', 'usuario': 'admin', 'url': _url('fragmento_pedido', 'pedido')},
+    {'nombre': 'dashboard', 'vista': 'admin_dashboard', 'usuario': 'admin', 'url': '/admin-dashboard/'},
+    {'nombre': 'productos', 'vista': 'productos', 'usuario': 'admin', 'url': '/productos/'},
+    {'nombre': 'fragmento producto editar', 'vista': 'fragmento_producto_editar', 'usuario': 'admin',
+     'url': _url('fragmento_producto_editar', 'producto')},
+    {'nombre': 'producto crear', 'vista': 'crear_producto', 'usuario': 'admin', 'metodo': 'post', 'url': '/productos/crear/',
+     'datos': lambda ctx: {'nombre': 'Benchmark', 'categoria': ctx['categoria'], 'precio': 1, 'stock': 0}},
+    {'nombre': 'producto editar', 'vista': 'editar_producto', 'usuario': 'admin', 'metodo': 'post',
+     'url': _url('editar_producto', 'producto_temporal'), 'datos': {'nombre': 'Benchmark editado', 'precio': 2, 'stock': 0},
+     'preparar': _producto_temporal},
+    {'nombre': 'producto eliminar', 'vista': 'eliminar_producto', 'usuario': 'admin', 'metodo': 'post',
+     'url': _url('eliminar_producto', 'producto_temporal'), 'preparar': _producto_temporal},
+    {'nombre': 'productos importar (50 filas)', 'vista': 'importar_productos', 'usuario': 'admin', 'metodo': 'post',
+     'url': '/productos/importar/', 'datos': _archivo_importacion},
+    {'nombre': 'stock historico (hace 30 dias)', 'vista': 'stock_historico', 'usuario': 'admin',
+     'url': lambda ctx: f"/productos/stock-historico/?fecha={ctx['hace_30_dias']}"},
+    {'nombre': 'stock historico por categoria', 'vista': 'stock_historico', 'usuario': 'admin',
+     'url': lambda ctx: f"/productos/stock-historico/?fecha={ctx['hace_30_dias']}&categoria={ctx['categoria']}"},
+    {'nombre': 'categorias', 'vista': 'categorias', 'usuario': 'admin', 'url': '/categorias/'},
+    {'nombre': 'categoria crear', 'vista': 'crear_categoria', 'usuario': 'admin', 'metodo': 'post',
+     'url': '/categorias/crear/', 'datos': {'nombre': 'Benchmark'}},
+    {'nombre': 'categoria editar', 'vista': 'editar_categoria', 'usuario': 'admin', 'metodo': 'post',
+     'url': _url('editar_categoria', 'categoria_temporal'), 'datos': {'nombre': 'Benchmark editada'},
+     'preparar': _categoria_temporal},
+    {'nombre': 'categoria eliminar', 'vista': 'eliminar_categoria', 'usuario': 'admin', 'metodo': 'post',
+     'url': _url('eliminar_categoria', 'categoria_temporal'), 'preparar': _categoria_temporal},
+    {'nombre': 'proveedores', 'vista': 'proveedores', 'usuario': 'admin', 'url': '/proveedores/'},
+    {'nombre': 'proveedor crear', 'vista': 'crear_proveedor', 'usuario': 'admin', 'metodo': 'post',
+     'url': '/proveedores/crear/', 'datos': {'nombre': 'Benchmark'}},
+    {'nombre': 'proveedor editar', 'vista': 'editar_proveedor', 'usuario': 'admin', 'metodo': 'post',
+     'url': _url('editar_proveedor', 'proveedor_temporal'), 'datos': {'nombre': 'Benchmark editado'},
+     'preparar': _proveedor_temporal},
+    {'nombre': 'proveedor eliminar', 'vista': 'eliminar_proveedor', 'usuario': 'admin', 'metodo': 'post',
+     'url': _url('eliminar_proveedor', 'proveedor_temporal'), 'preparar': _proveedor_temporal},
+    {'nombre': 'sugerencias de compra', 'vista': 'sugerencias_compra', 'usuario': 'admin',
+     'url': '/proveedores/sugerencias-compra/'},
+    {'nombre': 'clientes', 'vista': 'clientes', 'usuario': 'admin', 'url': '/clientes/'},
+    {'nombre': 'clientes busqueda', 'vista': 'clientes', 'usuario': 'admin', 'url': '/clientes/?buscar=garcia'},
+    {'nombre': 'cliente crear', 'vista': 'crear_cliente', 'usuario': 'admin', 'metodo': 'post',
+     'url': '/clientes/crear/', 'datos': {'nombre': 'Benchmark'}},
+    {'nombre': 'cliente editar', 'vista': 'editar_cliente', 'usuario': 'admin', 'metodo': 'post',
+     'url': _url('editar_cliente', 'cliente_temporal'), 'datos': {'nombre': 'Benchmark editado'},
+     'preparar': _cliente_temporal},
+    {'nombre': 'cliente eliminar', 'vista': 'eliminar_cliente', 'usuario': 'admin', 'metodo': 'post',
+     'url': _url('eliminar_cliente', 'cliente_temporal'), 'preparar': _cliente_temporal},
+    {'nombre': 'movimientos', 'vista': 'movimientos', 'usuario': 'admin', 'url': '/movimientos/'},
+    {'nombre': 'movimientos pagina 2', 'vista': 'movimientos', 'usuario': 'admin',
+     'url': lambda ctx: f"/movimientos/?despues={ctx['cursor_movimientos']}"},
+    {'nombre': 'movimientos por tipo', 'vista': 'movimientos', 'usuario': 'admin', 'url': '/movimientos/?tipo=SALIDA'},
+    {'nombre': 'movimientos por producto y fecha', 'vista': 'movimientos', 'usuario': 'admin',
+     'url': lambda ctx: f"/movimientos/?producto={ctx['producto']}&fecha_desde={ctx['hace_30_dias']}"},
+    {'nombre': 'tendencia movimientos (90 días)', 'vista': 'tendencia_movimientos', 'usuario': 'admin',
+     'url': '/movimientos/tendencia/?dias=90'},
+    {'nombre': 'movimiento crear', 'vista': 'crear_movimiento', 'usuario': 'admin', 'metodo': 'post', 'url': '/movimientos/crear/',
+     'datos': lambda ctx: {'producto': ctx['producto'], 'tipo': 'ENTRADA', 'cantidad': 1}},
+    {'nombre': 'movimiento eliminar', 'vista': 'eliminar_movimiento', 'usuario': 'admin', 'metodo': 'post',
+     'url': _url('eliminar_movimiento', 'movimiento_temporal'), 'preparar': _movimiento_temporal},
+    {'nombre': 'fragmento movimiento', 'vista': 'fragmento_movimiento', 'usuario': 'admin', 'url': _url('fragmento_movimiento', 'movimiento')},
+    {'nombre': 'pedidos admin', 'vista': 'pedidos_admin', 'usuario': 'admin', 'url': '/pedidos/'},
+    {'nombre': 'pedidos admin por estado', 'vista': 'pedidos_admin', 'usuario': 'admin', 'url': '/pedidos/?estado=PENDIENTE'},
+    {'nombre': 'pedido cambiar estado', 'vista': 'cambiar_estado_pedido', 'usuario': 'admin', 'metodo': 'post',
+     'url': _url('cambiar_estado_pedido', 'pedido'), 'datos': {'nuevo_estado': 'PROCESANDO'}},
+    {'nombre': 'fragmento pedido estado', 'vista': 'fragmento_pedido_estado', 'usuario': 'admin',
+     'url': _url('fragmento_pedido_estado', 'pedido')},
+    {'nombre': 'exportar movimientos (30 días)', 'vista': 'exportar_movimientos', 'usuario': 'admin',
+     'url': lambda ctx: f"/movimientos/exportar/?fecha_desde={ctx['hace_30_dias']}"},
+    {'nombre': 'exportar pedidos (30 días)', 'vista': 'exportar_pedidos', 'usuario': 'admin',
+     'url': lambda ctx: f"/pedidos/exportar/?fecha_desde={ctx['hace_30_dias']}"},
+    {'nombre': 'estadisticas catalogo', 'vista': 'catalogo_estadisticas', 'usuario': 'admin', 'url': '/catalogo/estadisticas/'},
+    {'nombre': 'estadisticas instrumentacion', 'vista': 'instrumentacion_estadisticas', 'usuario': 'admin',
+     'url': '/instrumentacion/'},
+    {'nombre': 'autocompletar productos', 'vista': 'autocompletar', 'usuario': 'admin', 'url': '/autocompletar/productos/?q=lech'},
+    {'nombre': 'autocompletar clientes', 'vista': 'autocompletar', 'usuario': 'admin', 'url': '/autocompletar/clientes/?q=ma'},
+    {'nombre': 'autocompletar categorias', 'vista': 'autocompletar', 'usuario': 'admin', 'url': '/autocompletar/categorias/?q=l'},
+    {'nombre': 'autocompletar proveedores', 'vista': 'autocompletar', 'usuario': 'admin', 'url': '/autocompletar/proveedores/?q=dis'},
+    {'nombre': 'logout', 'vista': 'logout', 'usuario': None, 'url': '/logout/'},
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide p50/p95 y consultas SQL de las vistas sobre datos sembrados y compara contra una "
+        "línea base en JSON; falla si algún escenario empeora más de lo tolerado."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--escala', choices=['pequena', 'mediana', 'grande'], default='pequena')
+        parser.add_argument('--repeticiones', type=int, default=20)
+        parser.add_argument('--calentamiento', type=int, default=2, help="Repeticiones previas sin medir.")
+        parser.add_argument('--linea-base', default=str(LINEA_BASE))
+        parser.add_argument('--guardar', action='store_true', help="Escribe la línea base en lugar de comparar.")
+        parser.add_argument('--tolerancia-tiempo', type=float, default=0.25,
+                            help="Aumento relativo de p50 permitido (0.25 = 25%%).")
+        parser.add_argument('--tolerancia-p95', type=float, default=0.5,
+                            help="Aumento relativo de p95 permitido; la cola es más ruidosa que la mediana.")
+        parser.add_argument('--tolerancia-consultas', type=int, default=0,
+                            help="Consultas adicionales permitidas por escenario.")
+        parser.add_argument('--filtro', help="Solo los escenarios cuyo nombre contiene este texto.")
+        parser.add_argument('--bd-actual', action='store_true',
+                            help="Usa la base configurada (ya sembrada) en lugar de crear una base de prueba.")
+
+    def handle(self, *args, **options):
+        escenarios = [e for e in ESCENARIOS if not options['filtro'] or options['filtro'] in e['nombre']]
+        nombre_bd = None
+        setup_test_environment()
+        try:
+            if not options['bd_actual']:
+                nombre_bd = connection.settings_dict['NAME']
+                connection.creation.create_test_db(verbosity=0, autoclobber=True)
+                call_command('generar_datos', escala=options['escala'], stdout=self.stdout)
+            resultados = self._medir(escenarios, options['repeticiones'], options['calentamiento'])
+        finally:
+            if nombre_bd is not None:
+                connection.creation.destroy_test_db(nombre_bd, verbosity=0)
+            teardown_test_environment()
+
+        self._imprimir(resultados)
+        self._cobertura(ESCENARIOS)
+
+        ruta = Path(options['linea_base'])
+        base = json.loads(ruta.read_text()) if ruta.exists() else {}
+        if options['guardar']:
+            base[options['escala']] = resultados
+            ruta.write_text(json.dumps(base, indent=2, ensure_ascii=False, sort_keys=True))
+            self.stdout.write(self.style.SUCCESS(f"Línea base '{options['escala']}' guardada en {ruta}."))
+            return
+
+        if options['escala'] not in base:
+            self.stdout.write(self.style.WARNING(f"Sin línea base '{options['escala']}' en {ruta}; use --guardar."))
+            return
+        tolerancias = {'p50_ms': options['tolerancia_tiempo'], 'p95_ms': options['tolerancia_p95']}
+        regresiones = self._comparar(base[options['escala']], resultados, tolerancias, options['tolerancia_consultas'])
+        if regresiones:
+            for regresion in regresiones:
+                self.stdout.write(self.style.ERROR(regresion))
+            raise CommandError(f"{len(regresiones)} regresiones respecto a la línea base.")
+        self.stdout.write(self.style.SUCCESS("Sin regresiones respecto a la línea base."))
+
+    # =========================
+    # MEDICIÓN
+    # =========================
+    def _contexto(self):
+        admin, _ = User.objects.get_or_create(username='benchmark_admin')
+        Perfil.objects.get_or_create(user=admin, defaults={'rol': 1})
+        cliente, _ = User.objects.get_or_create(username='benchmark_cliente')
+        Perfil.objects.get_or_create(user=cliente, defaults={'rol': 2})
+
+        producto = Producto.objects.order_by('-stock', 'id').first()
+        if producto is None:
+            raise CommandError("La base no tiene productos; siembre datos con generar_datos.")
+        # Stock de sobra para que las compras del benchmark no lo agoten
+        Producto.objects.filter(id=producto.id).update(stock=producto.stock + 100_000)
+        MovimientoInventario.objects.create(
+            producto=producto, tipo='ENTRADA', cantidad=100_000, descripcion='benchmark', usuario=admin
+        )
+        Carrito(cliente).vaciar()
+
+        ctx = {
+            'admin': admin,
+            'cliente': cliente,
+            'producto': producto.id,
+            'precio': producto.precio,
+            'categoria': producto.categoria_id or 0,
+            'movimiento': MovimientoInventario.objects.order_by('-id').values_list('id', flat=True).first(),
+            'hace_30_dias': (timezone.localdate() - timedelta(days=30)).isoformat(),
+        }
+
+        # Al menos un pedido propio para mis_pedidos y los fragmentos
+        _llenar_carrito(ctx)
+        navegador = Client()
+        navegador.force_login(cliente)
+        navegador.post('/confirmar-pedido/', {'direccion_entrega': 'Calle 1'})
+        ctx['pedido'] = Pedido.objects.filter(usuario=cliente).order_by('-id').values_list('id', flat=True).first()
+
+        navegador.force_login(admin)
+        pagina = navegador.get('/movimientos/').context['pagina']
+        ctx['cursor_movimientos'] = pagina.cursor_siguiente or ''
+        return ctx
+
+    def _medir(self, escenarios, repeticiones, calentamiento):
+        ctx = self._contexto()
+        # Los errores 500 se registran como estado en vez de cortar el benchmark
+        clientes = {None: Client(raise_request_exception=False)}
+        for usuario in ('admin', 'cliente'):
+            clientes[usuario] = Client(raise_request_exception=False)
+            clientes[usuario].force_login(ctx[usuario])
+
+        resultados = {}
+        for escenario in escenarios:
+            navegador = clientes[escenario['usuario']]
+            metodo = getattr(navegador, escenario.get('metodo', 'get'))
+            tiempos, consultas, estado = [], [], None
+
+            for i in range(calentamiento + repeticiones):
+                if escenario.get('preparar'):
+                    escenario['preparar'](ctx)
+                url = escenario['url'](ctx) if callable(escenario['url']) else escenario['url']
+                datos = escenario.get('datos') or {}
+                datos = datos(ctx) if callable(datos) else datos
+
+                with CaptureQueriesContext(connection) as capturadas:
+                    inicio = time.perf_counter()
+                    response = metodo(url, datos)
+                    if response.streaming:
+                        b''.join(response.streaming_content)
+                    transcurrido = time.perf_counter() - inicio
+                estado = response.status_code
+                if i >= calentamiento:
+                    tiempos.append(transcurrido * 1000)
+                    consultas.append(len(capturadas))
+
+            resultados[escenario['nombre']] = {
+                'p50_ms': round(_percentil(tiempos, 50), 2),
+                'p95_ms': round(_percentil(tiempos, 95), 2),
+                'consultas': max(consultas),
+                'estado': estado,
+            }
+        return resultados
+
+    # =========================
+    # REPORTE
+    # =========================
+    def _imprimir(self, resultados):
+        self.stdout.write(f"{'Escenario':<36}{'p50 ms':>10}{'p95 ms':>10}{'SQL':>6}{'HTTP':>6}")
+        for nombre, r in resultados.items():
+            linea = f"{nombre[:35]:<36}{r['p50_ms']:>10}{r['p95_ms']:>10}{r['consultas']:>6}{r['estado']:>6}"
+            self.stdout.write(self.style.ERROR(linea) if r['estado'] >= 400 else linea)
+
+    def _cobertura(self, escenarios):
+        cubiertas = {e['vista'] for e in escenarios}
+        nombres = {n for n in get_resolver().reverse_dict if isinstance(n, str)}
+        faltantes = sorted(nombres - cubiertas)
+        if faltantes:
+            self.stdout.write(f"Vistas sin escenario: {', '.join(faltantes)}")
+
+    def _comparar(self, base, resultados, tolerancias, tolerancia_consultas):
+        regresiones = []
+        for nombre, actual in resultados.items():
+            # Una vista que empieza a fallar suele ser más rápida y hacer menos consultas
+            if actual['estado'] >= 400:
+                regresiones.append(f"{nombre}: HTTP {actual['estado']}")
+            anterior = base.get(nombre)
+            if not anterior:
+                continue
+            if actual['estado'] != anterior.get('estado') and actual['estado'] < 400:
+                regresiones.append(f"{nombre}: HTTP {anterior.get('estado')} -> {actual['estado']}")
+            for medida, tolerancia in tolerancias.items():
+                limite = max(anterior[medida] * (1 + tolerancia), anterior[medida] + MARGEN_MS)
+                if actual[medida] > limite:
+                    aumento = f"+{(actual[medida] / anterior[medida] - 1) * 100:.0f}%" if anterior[medida] else "antes 0"
+                    regresiones.append(f"{nombre}: {medida} {anterior[medida]} -> {actual[medida]} ({aumento})")
+            if actual['consultas'] > anterior['consultas'] + tolerancia_consultas:
+                regresiones.append(f"{nombre}: consultas {anterior['consultas']} -> {actual['consultas']}")
+        return regresiones
@@ -0,0 +1,86 @@
+import csv
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+
+from inventario_cacc.conciliacion import revisar_tramo, tramos
+
+MAX_LISTADO = 50
+
+
+def _iniciar_proceso():
+    # Con "spawn" el proceso hijo arranca sin Django configurado; con "fork" no hace nada
+    django.setup()
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara el stock de cada producto con la suma de sus movimientos, repartiendo tramos "
+        "de ids entre varios procesos, e informa las diferencias. Con --corregir registra un "
+        "movimiento de ajuste por producto para que el historial cuadre con el stock actual."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--procesos', type=int, default=min(os.cpu_count() or 1, 8))
+        parser.add_argument('--tramo', type=int, default=5000, help="Productos por tramo de ids.")
+        parser.add_argument('--corregir', action='store_true', help="Registra movimientos de ajuste.")
+        parser.add_argument('--csv', help="Ruta donde escribir el informe completo de diferencias.")
+
+    def handle(self, *args, **options):
+        if options['procesos'] < 1 or options['tramo'] < 1:
+            raise CommandError("--procesos y --tramo deben ser mayores que cero.")
+        inicio = time.monotonic()
+        pendientes = tramos(options['tramo'])
+
+        procesos = options['procesos']
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            procesos = 1  # otra conexión no vería una base en memoria
+
+        filas = []
+        if procesos == 1 or len(pendientes) <= 1:
+            for tramo in pendientes:
+                filas.extend(revisar_tramo(tramo, options['corregir']))
+        else:
+            # Cada proceso abre su propia conexión: no deben heredar la del padre
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=procesos, initializer=_iniciar_proceso) as pool:
+                futuros = [pool.submit(revisar_tramo, tramo, options['corregir']) for tramo in pendientes]
+                for hechos, futuro in enumerate(as_completed(futuros), 1):
+                    filas.extend(futuro.result())
+                    if options['verbosity'] > 1:
+                        self.stdout.write(f"Tramo {hechos}/{len(futuros)} revisado.")
+        filas.sort(key=lambda fila: fila['id'])
+
+        self._informe(filas, options)
+        corregidos = sum(fila['corregido'] for fila in filas)
+        resumen = (
+            f"{len(pendientes)} tramos revisados con {procesos} procesos en {time.monotonic() - inicio:.1f}s: "
+            f"{len(filas)} productos con diferencias"
+        )
+        if options['corregir']:
+            resumen += f", {corregidos} corregidos"
+        self.stdout.write((self.style.WARNING if filas else self.style.SUCCESS)(resumen + "."))
+
+    def _informe(self, filas, options):
+        for fila in filas[:MAX_LISTADO]:
+            self.stdout.write(
+                f"#{fila['id']} {fila['nombre']}: stock {fila['stock']}, historial {fila['libro']}, "
+                f"diferencia {fila['stock'] - fila['libro']:+d}" + (" (corregido)" if fila['corregido'] else "")
+            )
+        if len(filas) > MAX_LISTADO:
+            self.stdout.write(f"... y {len(filas) - MAX_LISTADO} más.")
+
+        if options['csv']:
+            with open(options['csv'], 'w', newline='', encoding='utf-8') as archivo:
+                escritor = csv.writer(archivo)
+                escritor.writerow(['producto_id', 'nombre', 'stock', 'historial', 'diferencia', 'corregido'])
+                for fila in filas:
+                    escritor.writerow([
+                        fila['id'], fila['nombre'], fila['stock'], fila['libro'],
+                        fila['stock'] - fila['libro'], 'si' if fila['corregido'] else 'no',
+                    ])
+            self.stdout.write(f"Informe completo en {options['csv']}.")
@@ -0,0 +1,37 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from inventario_cacc.exportar import EXPORTACIONES, FORMATOS, TAM_LOTE, generar_exportacion
+
+
+class Command(BaseCommand):
+    help = "Exporta movimientos o pedidos a CSV/XLSX en streaming, con los mismos filtros de las vistas."
+
+    def add_arguments(self, parser):
+        parser.add_argument('datos', choices=sorted(EXPORTACIONES))
+        parser.add_argument('--formato', choices=sorted(FORMATOS), default='csv')
+        parser.add_argument('--salida', help="Archivo de destino (por defecto, la salida estándar).")
+        parser.add_argument('--lote', type=int, default=TAM_LOTE, help="Filas por bloque.")
+        parser.add_argument('--tipo', help="Movimientos: ENTRADA o SALIDA.")
+        parser.add_argument('--producto', help="Movimientos: id del producto.")
+        parser.add_argument('--estado', help="Pedidos: estado del pedido.")
+        parser.add_argument('--fecha-desde', dest='fecha_desde', help="AAAA-MM-DD")
+        parser.add_argument('--fecha-hasta', dest='fecha_hasta', help="AAAA-MM-DD")
+
+    def handle(self, *args, **options):
+        filtros = {
+            campo: options[campo]
+            for campo in ('tipo', 'producto', 'estado', 'fecha_desde', 'fecha_hasta')
+        }
+        bloques = generar_exportacion(options['datos'], options['formato'], filtros, options['lote'])
+
+        destino = open(options['salida'], 'wb') if options['salida'] else sys.stdout.buffer
+        try:
+            for bloque in bloques:
+                destino.write(bloque.encode() if isinstance(bloque, str) else bloque)
+        finally:
+            if options['salida']:
+                destino.close()
+            else:
+                destino.flush()
@@ -0,0 +1,403 @@
+import math
+import random
+import time
+from datetime import datetime, time as hora, timedelta
+from decimal import Decimal
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from inventario_cacc.busqueda import indexar_productos
+from inventario_cacc.catalogo import invalidar_catalogo
+from inventario_cacc.historico import fin_del_dia, tomar_corte
+from inventario_cacc.resumen import dia_de, reconstruir
+from inventario_cacc.models import (
+    Categoria, Cliente, DetallePedido, MovimientoInventario, Pedido, Perfil, Producto, Proveedor
+)
+from inventario_cacc.paginacion import lotes_por_id
+
+
+# =========================
+# GENERADOR DE DATOS SINTÉTICOS
+# =========================
+# Llena la base con volúmenes de producción para reproducir lentitud en
+# local. Todo sale de un random.Random con semilla, así que la misma semilla
+# y escala dan los mismos datos. Distribuciones:
+#   - Popularidad de productos tipo Zipf: unos pocos SKU concentran la mayoría
+#     de las ventas.
+#   - Volumen diario estacional: ciclo anual, fines de semana más bajos y
+#     pico en diciembre.
+# El libro de movimientos se simula en orden cronológico con el stock de cada
+# producto en memoria: cada producto arranca con una ENTRADA de inventario
+# inicial, las salidas nunca superan el stock del momento y los productos
+# bajos de stock se reabastecen. Al final Producto.stock queda igual a la
+# suma del libro. Las tablas grandes se insertan con executemany por lotes y
+# ids explícitos (MySQL no devuelve los ids de un INSERT masivo).
+
+ESCALAS = {
+    'pequena': {
+        'categorias': 10, 'proveedores': 20, 'productos': 500, 'clientes': 200,
+        'usuarios': 100, 'pedidos': 2_000, 'movimientos': 20_000,
+    },
+    'mediana': {
+        'categorias': 30, 'proveedores': 100, 'productos': 5_000, 'clientes': 5_000,
+        'usuarios': 2_000, 'pedidos': 50_000, 'movimientos': 500_000,
+    },
+    'grande': {
+        'categorias': 60, 'proveedores': 300, 'productos': 50_000, 'clientes': 100_000,
+        'usuarios': 20_000, 'pedidos': 1_000_000, 'movimientos': 10_000_000,
+    },
+}
+
+EXPONENTE_ZIPF = 1.1
+STOCK_MINIMO = 20
+
+NOMBRES = [
+    'Ana', 'Luis', 'Carlos', 'María', 'Juan', 'Laura', 'Pedro', 'Sofía', 'Andrés', 'Camila',
+    'Jorge', 'Valentina', 'Diego', 'Paula', 'Felipe', 'Daniela', 'Santiago', 'Natalia',
+]
+APELLIDOS = [
+    'García', 'Rodríguez', 'Martínez', 'López', 'González', 'Pérez', 'Sánchez', 'Ramírez',
+    'Torres', 'Flores', 'Rivera', 'Gómez', 'Díaz', 'Cardona', 'Moreno', 'Jiménez',
+]
+CATEGORIAS = [
+    'Bebidas', 'Lácteos', 'Panadería', 'Aseo', 'Snacks', 'Enlatados', 'Granos', 'Carnes',
+    'Frutas', 'Verduras', 'Congelados', 'Licores', 'Mascotas', 'Papelería', 'Ferretería',
+]
+PRODUCTOS = [
+    'Gaseosa', 'Jugo', 'Leche', 'Queso', 'Pan', 'Arroz', 'Fríjol', 'Jabón', 'Detergente',
+    'Galletas', 'Atún', 'Café', 'Chocolate', 'Aceite', 'Azúcar', 'Sal', 'Harina', 'Pasta',
+]
+VARIANTES = ['Clásico', 'Light', 'Premium', 'Familiar', 'Mini', 'Orgánico', 'Extra', 'Económico']
+PRESENTACIONES = ['250 g', '500 g', '1 kg', '350 ml', '1 L', '2 L', 'x6', 'x12']
+
+
+def _peso_dia(fecha):
+    """Volumen relativo de un día: ciclo anual, fin de semana y temporada navideña."""
+    dia_anual = fecha.timetuple().tm_yday
+    peso = 1 + 0.35 * math.sin(2 * math.pi * (dia_anual - 80) / 365)
+    if fecha.weekday() >= 5:
+        peso *= 0.6
+    if fecha.month == 12 and fecha.day >= 10:
+        peso *= 1.8
+    return peso
+
+
+def _repartir(total, pesos):
+    """Reparte ``total`` en enteros proporcionales a ``pesos`` (suman exactamente ``total``)."""
+    suma = sum(pesos)
+    resultado, acumulado, asignado = [], 0.0, 0
+    for peso in pesos:
+        acumulado += total * peso / suma
+        cantidad = round(acumulado) - asignado
+        resultado.append(cantidad)
+        asignado += cantidad
+    return resultado
+
+
+def _siguiente_id(modelo):
+    return (modelo.objects.aggregate(maximo=Max('id'))['maximo'] or 0) + 1
+
+
+class _Escritor:
+    """Búferes por tabla que se insertan con executemany cada ``lote`` filas."""
+
+    # Orden de inserción: las filas referenciadas van primero
+    MODELOS = (Pedido, DetallePedido, MovimientoInventario)
+
+    def __init__(self, lote, columnas):
+        self.lote = lote
+        self.columnas = columnas
+        self.buferes = {modelo: [] for modelo in self.MODELOS}
+        self.totales = {modelo: 0 for modelo in self.MODELOS}
+
+    def agregar(self, modelo, fila):
+        self.buferes[modelo].append(fila)
+        if len(self.buferes[modelo]) >= self.lote:
+            self.vaciar()
+
+    def vaciar(self):
+        with transaction.atomic(), connection.cursor() as cursor:
+            for modelo in self.MODELOS:
+                filas = self.buferes[modelo]
+                if not filas:
+                    continue
+                columnas = [modelo._meta.get_field(campo).column for campo in self.columnas[modelo]]
+                sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+                    connection.ops.quote_name(modelo._meta.db_table),
+                    ', '.join(connection.ops.quote_name(c) for c in columnas),
+                    ', '.join(['%s'] * len(columnas)),
+                )
+                cursor.executemany(sql, filas)
+                self.totales[modelo] += len(filas)
+                filas.clear()
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera datos sintéticos reproducibles (categorías, proveedores, productos, clientes, "
+        "usuarios, pedidos y movimientos) a escala configurable, con el stock de cada producto "
+        "igual a la suma de su libro de movimientos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--escala', choices=ESCALAS, default='pequena')
+        for campo in ESCALAS['pequena']:
+            parser.add_argument(f'--{campo}', type=int, help=f"Sobrescribe la cantidad de {campo} de la escala.")
+        parser.add_argument('--dias', type=int, default=365, help="Días de historia hacia atrás desde hoy.")
+        parser.add_argument('--semilla', type=int, default=1677)
+        parser.add_argument('--lote', type=int, default=5000, help="Filas por INSERT masivo.")
+
+    def handle(self, *args, **options):
+        cantidades = dict(ESCALAS[options['escala']])
+        for campo in cantidades:
+            if options[campo] is not None:
+                cantidades[campo] = options[campo]
+        if cantidades['productos'] <= 0 or options['dias'] <= 0:
+            raise CommandError("Se necesita al menos un producto y un día de historia.")
+
+        self.rng = random.Random(options['semilla'])
+        self.lote = options['lote']
+        inicio = time.monotonic()
+
+        categorias = self._categorias(cantidades['categorias'])
+        proveedores = self._proveedores(cantidades['proveedores'])
+        productos = self._productos(cantidades['productos'], categorias, proveedores)
+        clientes = self._clientes(cantidades['clientes'])
+        usuarios = self._usuarios(cantidades['usuarios'])
+        self.stdout.write(f"Catálogo y usuarios listos ({time.monotonic() - inicio:.1f}s).")
+
+        escritor = self._libro(productos, clientes, usuarios, cantidades, options['dias'])
+        self._indexar(productos[0][0])
+        # Los movimientos se insertaron en crudo: el resumen diario se rehace para su rango
+        primer_dia = dia_de() - timedelta(days=options['dias'])
+        reconstruir(desde=primer_dia, hasta=dia_de())
+        self._cortes(productos[0][0], primer_dia)
+        transaction.on_commit(invalidar_catalogo)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(productos)} productos, {len(clientes)} clientes, {len(usuarios)} usuarios, "
+            f"{escritor.totales[Pedido]} pedidos, {escritor.totales[DetallePedido]} detalles y "
+            f"{escritor.totales[MovimientoInventario]} movimientos en {time.monotonic() - inicio:.1f}s."
+        ))
+
+    def _cortes(self, primer_id, primer_dia):
+        # Los productos existen desde el inicio de la historia, con un corte de stock semanal
+        Producto.objects.filter(id__gte=primer_id).update(fecha_creacion=primer_dia)
+        dia = primer_dia + timedelta(days=6)
+        while dia < dia_de():
+            tomar_corte(fin_del_dia(dia))
+            dia += timedelta(days=7)
+
+    # =========================
+    # CATÁLOGO Y USUARIOS
+    # =========================
+    def _categorias(self, cantidad):
+        primer_id = _siguiente_id(Categoria)
+        objetos = [
+            Categoria(
+                id=primer_id + i,
+                nombre=CATEGORIAS[i % len(CATEGORIAS)] + (f' {i // len(CATEGORIAS) + 1}' if i >= len(CATEGORIAS) else ''),
+                descripcion='Categoría generada',
+            )
+            for i in range(cantidad)
+        ]
+        Categoria.objects.bulk_create(objetos, batch_size=self.lote)
+        return [c.id for c in objetos]
+
+    def _proveedores(self, cantidad):
+        primer_id = _siguiente_id(Proveedor)
+        objetos = [
+            Proveedor(
+                id=primer_id + i,
+                nombre=f"Distribuidora {self.rng.choice(APELLIDOS)} {i + 1}",
+                telefono=f"3{self.rng.randint(100000000, 199999999)}",
+                email=f"ventas{primer_id + i}@proveedor.test",
+            )
+            for i in range(cantidad)
+        ]
+        Proveedor.objects.bulk_create(objetos, batch_size=self.lote)
+        return [p.id for p in objetos]
+
+    def _productos(self, cantidad, categorias, proveedores):
+        """Crea los productos con stock 0; devuelve [(id, precio)]."""
+        primer_id = _siguiente_id(Producto)
+        productos = []
+        for inicio in range(0, cantidad, self.lote):
+            objetos = []
+            for i in range(inicio, min(inicio + self.lote, cantidad)):
+                nombre = (
+                    f"{self.rng.choice(PRODUCTOS)} {self.rng.choice(VARIANTES)} "
+                    f"{self.rng.choice(PRESENTACIONES)} #{primer_id + i}"
+                )
+                precio = Decimal(round(self.rng.lognormvariate(2.5, 0.8), 2)).quantize(Decimal('0.01'))
+                objetos.append(Producto(
+                    id=primer_id + i,
+                    nombre=nombre,
+                    descripcion=f"{nombre} de prueba",
+                    categoria_id=self.rng.choice(categorias) if categorias else None,
+                    proveedor_id=self.rng.choice(proveedores) if proveedores else None,
+                    precio=max(precio, Decimal('0.50')),
+                    stock=0,
+                ))
+            Producto.objects.bulk_create(objetos)
+            productos.extend((p.id, p.precio) for p in objetos)
+        return productos
+
+    def _clientes(self, cantidad):
+        primer_id = _siguiente_id(Cliente)
+        ids = []
+        for inicio in range(0, cantidad, self.lote):
+            objetos = [
+                Cliente(
+                    id=primer_id + i,
+                    nombre=f"{self.rng.choice(NOMBRES)} {self.rng.choice(APELLIDOS)}",
+                    telefono=f"3{self.rng.randint(100000000, 199999999)}",
+                    email=f"cliente{primer_id + i}@correo.test",
+                    direccion=f"Calle {self.rng.randint(1, 200)} # {self.rng.randint(1, 99)}-{self.rng.randint(1, 99)}",
+                )
+                for i in range(inicio, min(inicio + self.lote, cantidad))
+            ]
+            Cliente.objects.bulk_create(objetos)
+            ids.extend(c.id for c in objetos)
+        return ids
+
+    def _usuarios(self, cantidad):
+        """Usuarios con rol cliente; todos comparten una contraseña ya cifrada."""
+        primer_id = _siguiente_id(User)
+        primer_perfil = _siguiente_id(Perfil)
+        clave = make_password('demo1234')
+        ids = []
+        for inicio in range(0, cantidad, self.lote):
+            rango = range(inicio, min(inicio + self.lote, cantidad))
+            User.objects.bulk_create([
+                User(
+                    id=primer_id + i,
+                    username=f"usuario{primer_id + i}",
+                    email=f"usuario{primer_id + i}@correo.test",
+                    first_name=self.rng.choice(NOMBRES),
+                    last_name=self.rng.choice(APELLIDOS),
+                    password=clave,
+                )
+                for i in rango
+            ])
+            Perfil.objects.bulk_create([Perfil(id=primer_perfil + i, user_id=primer_id + i, rol=2) for i in rango])
+            ids.extend(primer_id + i for i in rango)
+        return ids
+
+    # =========================
+    # LIBRO DE MOVIMIENTOS
+    # =========================
+    def _libro(self, productos, clientes, usuarios, cantidades, dias):
+        rng = self.rng
+        n = len(productos)
+        ids = [p[0] for p in productos]
+        precios = [p[1] for p in productos]
+        stock = [0] * n
+
+        # Popularidad Zipf sobre un orden aleatorio de productos
+        rangos = list(range(n))
+        rng.shuffle(rangos)
+        pesos = [0.0] * n
+        for posicion, indice in enumerate(rangos):
+            pesos[indice] = 1 / (posicion + 1) ** EXPONENTE_ZIPF
+        acumulados = list(accumulate(pesos))
+
+        escritor = _Escritor(self.lote, {
+            Pedido: ('id', 'usuario', 'fecha', 'total', 'estado', 'direccion_entrega'),
+            DetallePedido: ('pedido', 'producto', 'cantidad', 'precio_unitario', 'subtotal'),
+            MovimientoInventario: ('producto', 'tipo', 'cantidad', 'fecha', 'usuario', 'cliente', 'pedido', 'descripcion'),
+        })
+        fecha_bd = connection.ops.adapt_datetimefield_value
+        zona = timezone.get_current_timezone()
+        ahora = timezone.now()
+        hoy = timezone.localdate()
+        fechas = [hoy - timedelta(days=dias - 1 - d) for d in range(dias)]
+
+        # Inventario inicial el primer día
+        primer_dia = timezone.make_aware(datetime.combine(fechas[0], hora(6)), zona)
+        for i in range(n):
+            stock[i] = rng.randint(50, 300)
+            escritor.agregar(MovimientoInventario, (
+                ids[i], 'ENTRADA', stock[i], fecha_bd(primer_dia), None, None, None, 'Inventario inicial'
+            ))
+
+        pesos_dia = [_peso_dia(f) for f in fechas]
+        pedidos_dia = _repartir(cantidades['pedidos'] if usuarios else 0, pesos_dia)
+        movimientos_dia = _repartir(max(cantidades['movimientos'] - n, 0), pesos_dia)
+        pedido_id = _siguiente_id(Pedido)
+        limite_reciente = hoy - timedelta(days=7)
+
+        for fecha, num_pedidos, num_movimientos in zip(fechas, pedidos_dia, movimientos_dia):
+            # Instantes del día en orden cronológico; cada pedido aporta ~2.5 movimientos
+            total_eventos = num_pedidos + max(num_movimientos - int(num_pedidos * 2.5), 0)
+            eventos = [True] * num_pedidos + [False] * (total_eventos - num_pedidos)
+            rng.shuffle(eventos)
+            segundos = sorted(rng.randrange(6 * 3600, 22 * 3600) for _ in eventos)
+            base = timezone.make_aware(datetime.combine(fecha, hora()), zona)
+
+            for es_pedido, segundo in zip(eventos, segundos):
+                instante = fecha_bd(min(base + timedelta(seconds=segundo), ahora))
+
+                if es_pedido:
+                    usuario = rng.choice(usuarios)
+                    lineas = {}
+                    for indice in rng.choices(rangos, cum_weights=acumulados, k=rng.randint(1, 4)):
+                        cantidad = min(rng.randint(1, 3), stock[indice] - lineas.get(indice, 0))
+                        if cantidad > 0:
+                            lineas[indice] = lineas.get(indice, 0) + cantidad
+                    if not lineas:
+                        continue
+                    total = sum(precios[i] * c for i, c in lineas.items())
+                    if fecha < limite_reciente:
+                        estado = 'CANCELADO' if rng.random() < 0.03 else 'ENTREGADO'
+                    else:
+                        estado = rng.choice(['PENDIENTE', 'PROCESANDO', 'ENVIADO', 'ENTREGADO'])
+                    escritor.agregar(Pedido, (pedido_id, usuario, instante, total, estado, 'Dirección de prueba'))
+                    descripcion = f"Venta - Pedido #{pedido_id} - Cliente: usuario{usuario}"
+                    for indice, cantidad in lineas.items():
+                        stock[indice] -= cantidad
+                        escritor.agregar(DetallePedido, (
+                            pedido_id, ids[indice], cantidad, precios[indice], precios[indice] * cantidad
+                        ))
+                        escritor.agregar(MovimientoInventario, (
+                            ids[indice], 'SALIDA', cantidad, instante, usuario, None, pedido_id, descripcion
+                        ))
+                    pedido_id += 1
+                    continue
+
+                # Movimiento manual: venta en mostrador o reabastecimiento
+                indice = rng.choices(rangos, cum_weights=acumulados)[0]
+                if stock[indice] < STOCK_MINIMO or rng.random() < 0.15:
+                    cantidad = rng.randint(50, 200)
+                    stock[indice] += cantidad
+                    escritor.agregar(MovimientoInventario, (
+                        ids[indice], 'ENTRADA', cantidad, instante, None, None, None, 'Reabastecimiento'
+                    ))
+                else:
+                    cantidad = min(rng.randint(1, 5), stock[indice])
+                    stock[indice] -= cantidad
+                    escritor.agregar(MovimientoInventario, (
+                        ids[indice], 'SALIDA', cantidad, instante, None,
+                        rng.choice(clientes) if clientes else None, None, 'Venta en mostrador'
+                    ))
+
+        escritor.vaciar()
+
+        # Stock final = suma del libro
+        for inicio in range(0, n, self.lote):
+            Producto.objects.bulk_update(
+                [Producto(id=ids[i], stock=stock[i]) for i in range(inicio, min(inicio + self.lote, n))],
+                ['stock'],
+            )
+        return escritor
+
+    def _indexar(self, primer_id):
+        queryset = Producto.objects.select_related('categoria').filter(id__gte=primer_id)
+        for lote in lotes_por_id(queryset, self.lote):
+            indexar_productos(lote, tam_lote=self.lote)
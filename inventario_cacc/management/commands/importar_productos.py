@@ -0,0 +1,36 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from inventario_cacc.importar import TAM_LOTE, importar_productos
+
+
+class Command(BaseCommand):
+    help = (
+        "Importa o actualiza productos desde un CSV o JSON (columnas: id opcional, nombre, "
+        "descripcion, categoria, proveedor, precio, stock)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('archivo')
+        parser.add_argument('--formato', choices=['csv', 'json'], help="Por defecto se deduce de la extensión.")
+        parser.add_argument('--lote', type=int, default=TAM_LOTE, help="Filas por lote.")
+        parser.add_argument(
+            '--crear-faltantes', action='store_true',
+            help="Crea las categorías y proveedores que no existan en lugar de rechazar la fila."
+        )
+
+    def handle(self, *args, **options):
+        ruta = Path(options['archivo'])
+        if not ruta.exists():
+            raise CommandError(f"No existe el archivo {ruta}")
+        formato = options['formato'] or ('json' if ruta.suffix.lower() in ('.json', '.jsonl') else 'csv')
+
+        with ruta.open('rb') as archivo:
+            resultado = importar_productos(
+                archivo, formato, tam_lote=options['lote'], crear_faltantes=options['crear_faltantes']
+            )
+
+        for fila, mensaje in resultado.errores:
+            self.stderr.write(f"Fila {fila}: {mensaje}")
+        self.stdout.write(self.style.SUCCESS(str(resultado)))
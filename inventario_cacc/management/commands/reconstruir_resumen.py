@@ -0,0 +1,25 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from inventario_cacc.resumen import reconstruir
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconstruye el resumen diario de movimientos (tabla resumen_movimiento_diario) a partir "
+        "de movimiento_inventario. Sin fechas recorre todo el historial. Los movimientos que se "
+        "registren durante la reconstrucción de un tramo pueden quedar fuera: conviene correrlo "
+        "con poca actividad o repetirlo sobre los últimos días."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--desde', type=date.fromisoformat, help="Primer día (AAAA-MM-DD).")
+        parser.add_argument('--hasta', type=date.fromisoformat, help="Último día (AAAA-MM-DD).")
+
+    def handle(self, *args, **options):
+        desde, hasta = options['desde'], options['hasta']
+        if desde and hasta and desde > hasta:
+            raise CommandError("--desde no puede ser posterior a --hasta.")
+        filas = reconstruir(desde=desde, hasta=hasta)
+        self.stdout.write(self.style.SUCCESS(f"Resumen diario reconstruido: {filas} filas."))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from inventario_cacc.busqueda import reindexar_todo
+
+
+class Command(BaseCommand):
+    help = "Reconstruye el índice de búsqueda de productos (tabla termino_busqueda)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=1000, help="Productos por lote.")
+
+    def handle(self, *args, **options):
+        total = reindexar_todo(tam_lote=options['lote'])
+        self.stdout.write(self.style.SUCCESS(f"Índice reconstruido para {total} productos."))
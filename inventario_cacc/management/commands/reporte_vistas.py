@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+
+from inventario_cacc.instrumentacion import acumulador, resumen
+from inventario_cacc.models import MetricaVista
+
+ORDENES = {
+    'tiempo': 'tiempo_medio_ms',
+    'consultas': 'consultas_medias',
+    'sql': 'tiempo_sql_medio_ms',
+    'peticiones': 'peticiones',
+    'excesos': 'excesos',
+}
+
+
+class Command(BaseCommand):
+    help = "Muestra las métricas por vista registradas por InstrumentacionMiddleware."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--orden', choices=ORDENES, default='tiempo')
+        parser.add_argument('--limite', type=int, default=30)
+        parser.add_argument('--duplicadas', action='store_true', help="Lista las consultas repetidas de cada vista.")
+        parser.add_argument('--reiniciar', action='store_true', help="Borra las métricas acumuladas.")
+
+    def handle(self, *args, **options):
+        if options['reiniciar']:
+            acumulador.tomar()
+            borradas, _ = MetricaVista.objects.all().delete()
+            self.stdout.write(self.style.SUCCESS(f"{borradas} métricas borradas."))
+            return
+
+        acumulador.volcar()
+        filas = sorted(resumen(MetricaVista.objects.all()), key=lambda f: f[ORDENES[options['orden']]], reverse=True)
+        if not filas:
+            self.stdout.write("Sin métricas. ¿Está INSTRUMENTACION_MUESTREO en 0?")
+            return
+
+        self.stdout.write(
+            f"{'Vista':<32}{'Pet.':>8}{'ms medio':>10}{'ms máx':>10}{'SQL':>7}{'SQL máx':>9}{'ms SQL':>9}{'Excesos':>9}"
+        )
+        for f in filas[:options['limite']]:
+            linea = (
+                f"{f['vista'][:31]:<32}{f['peticiones']:>8}{f['tiempo_medio_ms']:>10}{f['tiempo_max_ms']:>10}"
+                f"{f['consultas_medias']:>7}{f['consultas_max']:>9}{f['tiempo_sql_medio_ms']:>9}{f['excesos']:>9}"
+            )
+            self.stdout.write(self.style.WARNING(linea) if f['excesos'] else linea)
+            if options['duplicadas']:
+                for sql, veces in f['duplicadas'].items():
+                    self.stdout.write(f"    {veces}x {sql[:150]}")
@@ -0,0 +1,54 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Pronostica la demanda diaria de todo el catálogo a partir de las salidas del resumen "
+        "diario, calcula stock de seguridad, punto de reorden y días de cobertura, y lista por "
+        "proveedor los productos a pedir. Requiere NumPy."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--metodo', choices=('media', 'exponencial'), default='media')
+        parser.add_argument('--ventana', type=int, default=90, help="Días de ventas a considerar.")
+        parser.add_argument('--alfa', type=float, default=0.3, help="Factor del suavizado exponencial.")
+        parser.add_argument('--plazo', type=int, default=7, help="Días de entrega del proveedor.")
+        parser.add_argument('--revision', type=int, default=30, help="Días que debe cubrir cada pedido.")
+        parser.add_argument('--servicio', type=float, default=0.95, help="Nivel de servicio (0.5 a 0.999).")
+
+    def handle(self, *args, **options):
+        try:
+            from inventario_cacc.pronostico import calcular, sugerencias_por_proveedor
+        except ImportError:
+            raise CommandError("El pronóstico necesita NumPy: pip install numpy")
+
+        inicio = time.monotonic()
+        try:
+            resultado = calcular(
+                ventana=options['ventana'], metodo=options['metodo'], alfa=options['alfa'],
+                plazo=options['plazo'], revision=options['revision'], servicio=options['servicio'],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+        calculo = time.monotonic() - inicio
+        grupos = sugerencias_por_proveedor(resultado)
+
+        for grupo in grupos:
+            proveedor = grupo['proveedor']
+            titulo = proveedor.nombre if proveedor else "Sin proveedor"
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f"{titulo}: {len(grupo['lineas'])} productos, {grupo['unidades']} unidades"
+            ))
+            for linea in grupo['lineas']:
+                self.stdout.write(
+                    f"  #{linea['producto_id']} {linea['nombre']}: stock {linea['stock']}, "
+                    f"demanda {linea['demanda_diaria']}/día, reorden {linea['punto_reorden']}, "
+                    f"cobertura {linea['dias_cobertura']} días -> pedir {linea['sugerido']}"
+                )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(resultado['ids'])} productos pronosticados en {calculo:.2f}s; "
+            f"{sum(len(g['lineas']) for g in grupos)} por pedir a {len(grupos)} proveedores."
+        ))
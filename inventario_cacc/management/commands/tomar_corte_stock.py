@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from inventario_cacc.historico import tomar_corte
+
+
+class Command(BaseCommand):
+    help = (
+        "Guarda un corte del stock de todos los productos (tabla corte_stock) para acelerar "
+        "las consultas de stock histórico. Pensado para ejecutarse periódicamente (por ejemplo, "
+        "una vez al día desde cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=1000, help="Productos por lote.")
+
+    def handle(self, *args, **options):
+        filas = tomar_corte(tam_lote=options['lote'])
+        self.stdout.write(self.style.SUCCESS(f"Corte de stock guardado para {filas} productos."))
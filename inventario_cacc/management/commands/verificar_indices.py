@@ -0,0 +1,110 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from inventario_cacc.catalogo import _consulta_catalogo
+from inventario_cacc.filtros import consulta_mis_pedidos, consulta_movimientos, consulta_pedidos, items_por_pedido
+from inventario_cacc.models import MovimientoInventario, Pedido, Producto
+from inventario_cacc.paginacion import consulta_pagina
+
+
+# =========================
+# CONSULTAS CRÍTICAS
+# =========================
+# Las consultas se arman con las mismas funciones que usan las vistas
+# (filtros.py, paginacion.py, catalogo.py), así que si una vista cambia su
+# consulta este chequeo revisa la nueva. Cada una debe resolverse con un
+# índice: sin recorrido completo de la tabla ni ordenamiento en memoria
+# (filesort / temp b-tree).
+
+def _cursor(modelo):
+    # Una página intermedia: el cursor de la fila del medio de la tabla
+    total = modelo.objects.count()
+    return modelo.objects.order_by('-fecha', '-id').values_list('fecha', 'id')[total // 2:total // 2 + 1].first()
+
+
+def _consultas():
+    producto = Producto.objects.order_by('id').values_list('id', flat=True).first() or 0
+    usuario = Pedido.objects.order_by('id').values_list('usuario_id', flat=True).first() or 0
+    sin_filtros = {}
+    cursor_movimientos = _cursor(MovimientoInventario)
+    cursor_pedidos = _cursor(Pedido)
+    pedidos_pagina = list(consulta_pagina(consulta_pedidos(sin_filtros)).values_list('id', flat=True))
+
+    return [
+        ('movimientos', consulta_pagina(consulta_movimientos(sin_filtros))),
+        ('movimientos pagina intermedia', consulta_pagina(consulta_movimientos(sin_filtros), despues=cursor_movimientos)),
+        ('movimientos pagina anterior', consulta_pagina(consulta_movimientos(sin_filtros), antes=cursor_movimientos)),
+        ('movimientos por tipo', consulta_pagina(consulta_movimientos({'tipo': 'SALIDA'}))),
+        ('movimientos por producto', consulta_pagina(consulta_movimientos({'producto': producto}))),
+        ('pedidos_admin', consulta_pagina(consulta_pedidos(sin_filtros))),
+        ('pedidos_admin pagina intermedia', consulta_pagina(consulta_pedidos(sin_filtros), despues=cursor_pedidos)),
+        ('pedidos_admin por estado', consulta_pagina(consulta_pedidos({'estado': 'PENDIENTE'}))),
+        ('pedidos_admin articulos', items_por_pedido(pedidos_pagina or [0])),
+        ('mis_pedidos', consulta_mis_pedidos(usuario)),
+        ('home por nombre', _consulta_catalogo(None, None, '')),
+        ('home por precio', _consulta_catalogo(None, None, 'precio')),
+        ('home por precio desc', _consulta_catalogo(None, None, '-precio')),
+    ]
+
+
+# =========================
+# LECTURA DEL PLAN
+# =========================
+def _problemas_mysql(cursor, sql, params):
+    cursor.execute('EXPLAIN ' + sql, params)
+    columnas = [c[0].lower() for c in cursor.description]
+    problemas = []
+    for fila in cursor.fetchall():
+        paso = dict(zip(columnas, fila))
+        extra = paso.get('extra') or ''
+        if paso.get('type') == 'ALL':
+            problemas.append(f"recorrido completo de {paso.get('table')}")
+        if 'Using filesort' in extra or 'Using temporary' in extra:
+            problemas.append(f"{extra} en {paso.get('table')}")
+    return problemas
+
+
+def _problemas_sqlite(cursor, sql, params):
+    cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+    problemas = []
+    for fila in cursor.fetchall():
+        detalle = fila[-1]
+        if detalle.startswith('SCAN ') and ' USING ' not in detalle:
+            problemas.append(detalle)
+        if 'TEMP B-TREE' in detalle:
+            problemas.append(detalle)
+    return problemas
+
+
+PLANES = {
+    'mysql': _problemas_mysql,
+    'sqlite': _problemas_sqlite,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Ejecuta EXPLAIN sobre las consultas de movimientos, pedidos y catálogo y falla si "
+        "alguna recorre la tabla completa u ordena en memoria. Conviene correrlo con datos "
+        "de volumen realista: con tablas casi vacías el optimizador puede preferir el recorrido."
+    )
+
+    def handle(self, *args, **options):
+        revisar = PLANES.get(connection.vendor)
+        if revisar is None:
+            raise CommandError(f"No se sabe leer el plan de {connection.vendor}.")
+
+        fallos = 0
+        with connection.cursor() as cursor:
+            for nombre, queryset in _consultas():
+                sql, params = queryset.query.sql_with_params()
+                problemas = revisar(cursor, sql, params)
+                if problemas:
+                    fallos += 1
+                    self.stdout.write(self.style.ERROR(f"{nombre}: {'; '.join(problemas)}"))
+                else:
+                    self.stdout.write(f"{nombre}: OK")
+
+        if fallos:
+            raise CommandError(f"{fallos} consultas sin un índice adecuado.")
+        self.stdout.write(self.style.SUCCESS("Todas las consultas usan índices."))
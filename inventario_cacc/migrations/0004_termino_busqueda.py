@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def indexar_productos_existentes(apps, schema_editor):
+    from inventario_cacc.busqueda import terminos_producto
+
+    Producto = apps.get_model('inventario_cacc', 'Producto')
+    TerminoBusqueda = apps.get_model('inventario_cacc', 'TerminoBusqueda')
+    terminos = []
+    for producto in Producto.objects.select_related('categoria').iterator(chunk_size=1000):
+        for termino, peso in terminos_producto(producto).items():
+            terminos.append(TerminoBusqueda(termino=termino, producto_id=producto.id, peso=peso))
+        if len(terminos) >= 5000:
+            TerminoBusqueda.objects.bulk_create(terminos)
+            terminos = []
+    TerminoBusqueda.objects.bulk_create(terminos)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario_cacc', '0003_movimientoinventario_pedido_alter_categoria_id_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TerminoBusqueda',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('termino', models.CharField(max_length=64)),
+                ('peso', models.PositiveSmallIntegerField(default=1)),
+                ('producto', models.ForeignKey(db_column='producto_id', on_delete=django.db.models.deletion.CASCADE, to='inventario_cacc.producto')),
+            ],
+            options={
+                'db_table': 'termino_busqueda',
+                'constraints': [models.UniqueConstraint(fields=('termino', 'producto'), name='termino_busqueda_unico')],
+            },
+        ),
+        migrations.RunPython(indexar_productos_existentes, migrations.RunPython.noop),
+    ]
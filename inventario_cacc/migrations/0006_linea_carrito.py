@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:08
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario_cacc', '0005_indices_consultas'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LineaCarrito',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cantidad', models.PositiveIntegerField()),
+                ('precio', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('producto', models.ForeignKey(db_column='producto_id', on_delete=django.db.models.deletion.CASCADE, to='inventario_cacc.producto')),
+                ('usuario', models.ForeignKey(db_column='usuario_id', on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'carrito_linea',
+                'constraints': [models.UniqueConstraint(fields=('usuario', 'producto'), name='carrito_linea_unica')],
+            },
+        ),
+    ]
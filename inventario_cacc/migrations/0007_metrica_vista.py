@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario_cacc', '0006_linea_carrito'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MetricaVista',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('vista', models.CharField(max_length=100, unique=True)),
+                ('peticiones', models.PositiveIntegerField(default=0)),
+                ('tiempo_ms', models.FloatField(default=0)),
+                ('tiempo_max_ms', models.FloatField(default=0)),
+                ('consultas', models.PositiveIntegerField(default=0)),
+                ('consultas_max', models.PositiveIntegerField(default=0)),
+                ('tiempo_sql_ms', models.FloatField(default=0)),
+                ('excesos', models.PositiveIntegerField(default=0)),
+                ('duplicadas', models.JSONField(default=dict)),
+                ('actualizado', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'metrica_vista',
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario_cacc', '0007_metrica_vista'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumenDiario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dia', models.DateField()),
+                ('tipo', models.CharField(choices=[('ENTRADA', 'Entrada'), ('SALIDA', 'Salida')], max_length=10)),
+                ('unidades', models.IntegerField(default=0)),
+                ('movimientos', models.IntegerField(default=0)),
+                ('producto', models.ForeignKey(db_column='producto_id', on_delete=django.db.models.deletion.CASCADE, to='inventario_cacc.producto')),
+            ],
+            options={
+                'db_table': 'resumen_movimiento_diario',
+                'indexes': [models.Index(fields=['dia', 'tipo'], name='resumen_dia_tipo_idx')],
+                'constraints': [models.UniqueConstraint(fields=('producto', 'dia', 'tipo'), name='resumen_diario_unico')],
+            },
+        ),
+    ]
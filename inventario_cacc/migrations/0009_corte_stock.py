@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario_cacc', '0008_resumen_diario'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CorteStock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateTimeField()),
+                ('stock', models.IntegerField()),
+                ('producto', models.ForeignKey(db_column='producto_id', on_delete=django.db.models.deletion.CASCADE, to='inventario_cacc.producto')),
+            ],
+            options={
+                'db_table': 'corte_stock',
+                'constraints': [models.UniqueConstraint(fields=('fecha', 'producto'), name='corte_stock_unico')],
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+from django.db import migrations
+
+
+def llenar_resumen(apps, schema_editor):
+    from inventario_cacc.resumen import reconstruir_con
+
+    reconstruir_con(
+        apps.get_model('inventario_cacc', 'MovimientoInventario'),
+        apps.get_model('inventario_cacc', 'ResumenDiario'),
+        # La columna ajuste llega en 0013, que rehace los días con ajustes
+        excluir_ajustes=False,
+    )
+
+
+class Migration(migrations.Migration):
+    # Cada tramo de la reconstrucción se confirma por separado
+    atomic = False
+
+    dependencies = [
+        ('inventario_cacc', '0011_cache_compartida'),
+    ]
+
+    operations = [
+        migrations.RunPython(llenar_resumen, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+from django.db import migrations, models
+from django.db.models.functions import TruncDate
+
+# conciliacion.DESCRIPCION_AJUSTE en el momento de esta migración
+DESCRIPCION_AJUSTE = "Ajuste por conciliación de stock"
+
+
+def marcar_ajustes(apps, schema_editor):
+    from inventario_cacc.resumen import reconstruir_con
+
+    MovimientoInventario = apps.get_model('inventario_cacc', 'MovimientoInventario')
+    ResumenDiario = apps.get_model('inventario_cacc', 'ResumenDiario')
+    ajustes = MovimientoInventario.objects.filter(descripcion=DESCRIPCION_AJUSTE)
+    dias = sorted(set(ajustes.annotate(dia=TruncDate('fecha')).values_list('dia', flat=True)))
+    ajustes.update(ajuste=True)
+    # Sacar los ajustes del resumen solo en los días donde hubo alguno
+    for dia in dias:
+        reconstruir_con(MovimientoInventario, ResumenDiario, dia, dia)
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('inventario_cacc', '0012_llenar_resumen_diario'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='movimientoinventario',
+            name='ajuste',
+            field=models.BooleanField(default=False, db_default=False),
+        ),
+        migrations.RunPython(marcar_ajustes, migrations.RunPython.noop),
+    ]
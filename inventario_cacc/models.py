@@ -11,6 +11,10 @@ class Categoria(models.Model):
 
     class Meta:
         db_table = 'categoria'
+        indexes = [
+            # Autocompletado por prefijo del nombre
+            models.Index(fields=['nombre'], name='categoria_nombre_idx'),
+        ]
 
     def __str__(self):
         return self.nombre
@@ -27,6 +31,10 @@ class Proveedor(models.Model):
 
     class Meta:
         db_table = 'proveedor'
+        indexes = [
+            # Autocompletado por prefijo del nombre
+            models.Index(fields=['nombre'], name='proveedor_nombre_idx'),
+        ]
 
     def __str__(self):
         return self.nombre
@@ -56,6 +64,12 @@ class Producto(models.Model):
 
     class Meta:
         db_table = 'producto'
+        indexes = [
+            # Catálogo: stock > 0 ordenado por nombre o precio; el stock va en
+            # el índice para filtrar sin leer la fila
+            models.Index(fields=['nombre', 'stock'], name='producto_nombre_stock_idx'),
+            models.Index(fields=['precio', 'stock'], name='producto_precio_stock_idx'),
+        ]
 
     def __str__(self):
         return self.nombre
@@ -72,6 +86,10 @@ class Cliente(models.Model):
 
     class Meta:
         db_table = 'cliente'
+        indexes = [
+            # Autocompletado por prefijo del nombre
+            models.Index(fields=['nombre'], name='cliente_nombre_idx'),
+        ]
 
     def __str__(self):
         return self.nombre
@@ -116,6 +134,12 @@ class Pedido(models.Model):
 
     class Meta:
         db_table = 'pedido'
+        indexes = [
+            # pedidos_admin (por fecha, con o sin estado) y mis_pedidos
+            models.Index(fields=['fecha'], name='pedido_fecha_idx'),
+            models.Index(fields=['estado', 'fecha'], name='pedido_estado_fecha_idx'),
+            models.Index(fields=['usuario', 'fecha'], name='pedido_usuario_fecha_idx'),
+        ]
 
     def __str__(self):
         return f"Pedido #{self.id} - {self.usuario.username}"
@@ -184,9 +208,19 @@ class MovimientoInventario(models.Model):
         db_column='pedido_id'
     )
     descripcion = models.TextField(null=True, blank=True)
+    # Ajuste de conciliación: corrige el historial, no es una venta ni una
+    # compra, así que no entra al resumen diario. El default también va en la
+    # base para los INSERT en crudo de generar_datos
+    ajuste = models.BooleanField(default=False, db_default=False)
 
     class Meta:
         db_table = 'movimiento_inventario'
+        indexes = [
+            # Historial de movimientos: orden por fecha, filtrado por tipo o producto
+            models.Index(fields=['fecha'], name='movimiento_fecha_idx'),
+            models.Index(fields=['tipo', 'fecha'], name='movimiento_tipo_fecha_idx'),
+            models.Index(fields=['producto', 'fecha'], name='movimiento_producto_fecha_idx'),
+        ]
 
     def __str__(self):
         return f"{self.tipo} - {self.producto.nombre} ({self.cantidad})"
@@ -194,3 +228,125 @@ class MovimientoInventario(models.Model):
     @property
     def pedido_relacionado(self):
         return self.pedido
+
+
+# =========================
+# TABLA ÍNDICE DE BÚSQUEDA
+# =========================
+class TerminoBusqueda(models.Model):
+    termino = models.CharField(max_length=64)
+    producto = models.ForeignKey(
+        Producto,
+        on_delete=models.CASCADE,
+        db_column='producto_id'
+    )
+    peso = models.PositiveSmallIntegerField(default=1)
+
+    class Meta:
+        db_table = 'termino_busqueda'
+        constraints = [
+            models.UniqueConstraint(fields=['termino', 'producto'], name='termino_busqueda_unico'),
+        ]
+
+    def __str__(self):
+        return f"{self.termino} -> {self.producto_id} ({self.peso})"
+
+
+# =========================
+# TABLA LÍNEAS DE CARRITO
+# =========================
+class LineaCarrito(models.Model):
+    usuario = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        db_column='usuario_id'
+    )
+    producto = models.ForeignKey(
+        Producto,
+        on_delete=models.CASCADE,
+        db_column='producto_id'
+    )
+    cantidad = models.PositiveIntegerField()
+    precio = models.DecimalField(max_digits=12, decimal_places=2)
+
+    class Meta:
+        db_table = 'carrito_linea'
+        constraints = [
+            models.UniqueConstraint(fields=['usuario', 'producto'], name='carrito_linea_unica'),
+        ]
+
+    def __str__(self):
+        return f"{self.usuario_id} - {self.producto_id} (x{self.cantidad})"
+
+
+# =========================
+# TABLA MÉTRICAS POR VISTA
+# =========================
+class MetricaVista(models.Model):
+    vista = models.CharField(max_length=100, unique=True)
+    peticiones = models.PositiveIntegerField(default=0)
+    tiempo_ms = models.FloatField(default=0)
+    tiempo_max_ms = models.FloatField(default=0)
+    consultas = models.PositiveIntegerField(default=0)
+    consultas_max = models.PositiveIntegerField(default=0)
+    tiempo_sql_ms = models.FloatField(default=0)
+    excesos = models.PositiveIntegerField(default=0)
+    duplicadas = models.JSONField(default=dict)
+    actualizado = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'metrica_vista'
+
+    def __str__(self):
+        return f"{self.vista} ({self.peticiones} peticiones)"
+
+
+# =========================
+# TABLA RESUMEN DIARIO DE MOVIMIENTOS
+# =========================
+class ResumenDiario(models.Model):
+    producto = models.ForeignKey(
+        Producto,
+        on_delete=models.CASCADE,
+        db_column='producto_id'
+    )
+    dia = models.DateField()
+    tipo = models.CharField(max_length=10, choices=MovimientoInventario.TIPO_CHOICES)
+    unidades = models.IntegerField(default=0)
+    movimientos = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'resumen_movimiento_diario'
+        constraints = [
+            models.UniqueConstraint(fields=['producto', 'dia', 'tipo'], name='resumen_diario_unico'),
+        ]
+        indexes = [
+            # Totales y series por día sin pasar por producto
+            models.Index(fields=['dia', 'tipo'], name='resumen_dia_tipo_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.dia} {self.tipo} - {self.producto_id} ({self.unidades} en {self.movimientos})"
+
+
+# =========================
+# TABLA CORTES DE STOCK
+# =========================
+class CorteStock(models.Model):
+    producto = models.ForeignKey(
+        Producto,
+        on_delete=models.CASCADE,
+        db_column='producto_id'
+    )
+    fecha = models.DateTimeField()
+    stock = models.IntegerField()
+
+    class Meta:
+        db_table = 'corte_stock'
+        constraints = [
+            # Empieza por fecha: buscar el corte más cercano y leerlo completo usa el mismo índice
+            models.UniqueConstraint(fields=['fecha', 'producto'], name='corte_stock_unico'),
+        ]
+
+    def __str__(self):
+        return f"{self.fecha:%Y-%m-%d %H:%M} - {self.producto_id}: {self.stock}"
@@ -0,0 +1,127 @@
+import base64
+from datetime import datetime
+
+from django.db.models import Q
+
+
+# =========================
+# PAGINACIÓN POR CURSOR (KEYSET)
+# =========================
+# En lugar de OFFSET, cada página se pide "después" o "antes" de la última
+# fila vista, usando el par (campo, id) como cursor. Así el costo de una
+# página no depende de qué tan atrás esté en el historial.
+
+POR_PAGINA = 50
+
+
+def codificar_cursor(valor, pk):
+    crudo = f"{valor.isoformat()}|{pk}"
+    return base64.urlsafe_b64encode(crudo.encode()).decode().rstrip('=')
+
+
+def decodificar_cursor(cursor):
+    """Devuelve (datetime, id) o None si el cursor no es válido."""
+    if not cursor:
+        return None
+    try:
+        relleno = '=' * (-len(cursor) % 4)
+        crudo = base64.urlsafe_b64decode(cursor + relleno).decode()
+        valor, pk = crudo.rsplit('|', 1)
+        return datetime.fromisoformat(valor), int(pk)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+class PaginaKeyset:
+    def __init__(self, objetos, cursor_siguiente=None, cursor_anterior=None):
+        self.objetos = objetos
+        self.cursor_siguiente = cursor_siguiente
+        self.cursor_anterior = cursor_anterior
+
+    @property
+    def tiene_siguiente(self):
+        return self.cursor_siguiente is not None
+
+    @property
+    def tiene_anterior(self):
+        return self.cursor_anterior is not None
+
+    def __iter__(self):
+        return iter(self.objetos)
+
+    def __len__(self):
+        return len(self.objetos)
+
+
+def consulta_pagina(queryset, despues=None, antes=None, por_pagina=POR_PAGINA, campo='fecha'):
+    """
+    La consulta que ejecuta paginar_keyset: ``por_pagina + 1`` filas después
+    del cursor en orden descendente, o antes del cursor en orden ascendente.
+    """
+    if antes:
+        valor, pk = antes
+        return (
+            queryset.filter(Q(**{f'{campo}__gt': valor}) | Q(**{campo: valor, 'id__gt': pk}))
+            .order_by(campo, 'id')[:por_pagina + 1]
+        )
+    if despues:
+        valor, pk = despues
+        queryset = queryset.filter(Q(**{f'{campo}__lt': valor}) | Q(**{campo: valor, 'id__lt': pk}))
+    return queryset.order_by(f'-{campo}', '-id')[:por_pagina + 1]
+
+
+def paginar_keyset(queryset, despues=None, antes=None, por_pagina=POR_PAGINA, campo='fecha'):
+    """
+    Pagina ``queryset`` en orden descendente por (campo, id).
+
+    ``despues`` y ``antes`` son cursores ya decodificados: ``despues`` pide la
+    página siguiente (filas más antiguas) y ``antes`` la anterior.
+    """
+    filas = list(consulta_pagina(queryset, despues, antes, por_pagina, campo))
+    if antes:
+        hay_mas_recientes = len(filas) > por_pagina
+        filas = filas[:por_pagina]
+        filas.reverse()
+        hay_mas_antiguas = True
+    else:
+        hay_mas_antiguas = len(filas) > por_pagina
+        filas = filas[:por_pagina]
+        hay_mas_recientes = despues is not None
+
+    if not filas:
+        return PaginaKeyset([])
+
+    primera, ultima = filas[0], filas[-1]
+    return PaginaKeyset(
+        filas,
+        cursor_siguiente=codificar_cursor(getattr(ultima, campo), ultima.pk) if hay_mas_antiguas else None,
+        cursor_anterior=codificar_cursor(getattr(primera, campo), primera.pk) if hay_mas_recientes else None,
+    )
+
+
+def lotes_por_id(queryset, tam_lote=2000):
+    """
+    Recorre ``queryset`` en orden de id en bloques de ``tam_lote`` filas,
+    pidiendo cada bloque con ``id > último id``. A diferencia de
+    ``.iterator()`` no depende de cursores del lado del servidor (MySQL no
+    los ofrece), así que la memoria usada es la de un solo bloque.
+    Con ``values_list()`` el id debe ser la primera columna.
+    """
+    ultimo_id = 0
+    while True:
+        lote = list(queryset.filter(id__gt=ultimo_id).order_by('id')[:tam_lote])
+        if not lote:
+            return
+        yield lote
+        ultimo = lote[-1]
+        if isinstance(ultimo, tuple):
+            ultimo_id = ultimo[0]
+        elif isinstance(ultimo, dict):
+            ultimo_id = ultimo['id']
+        else:
+            ultimo_id = ultimo.pk
+
+
+def iterar_por_lotes(queryset, tam_lote=2000):
+    for lote in lotes_por_id(queryset, tam_lote):
+        yield from lote
@@ -0,0 +1,86 @@
+from django.db import transaction
+from django.db.models import Case, F, When
+
+from .catalogo import invalidar_catalogo
+from .models import DetallePedido, MovimientoInventario, Pedido, Producto
+from .resumen import acumular, dia_de
+from .stock import StockInsuficiente
+
+
+# =========================
+# CHECKOUT POR LOTES
+# =========================
+# Todo el carrito se procesa con un número fijo de consultas: un bloqueo de
+# los productos en orden de id (evita deadlocks entre checkouts simultáneos),
+# una validación en memoria, un UPDATE con CASE para el stock, dos
+# inserciones masivas para detalles y movimientos y la suma al resumen diario.
+
+
+def procesar_pedido(usuario, carrito, direccion_entrega=None, observaciones=None):
+    """
+    Crea el pedido a partir de las líneas del carrito (producto_id ->
+    (cantidad, precio)) y descuenta el stock.
+    """
+    cantidades = {producto_id: cantidad for producto_id, (cantidad, precio) in carrito.items()}
+    ids = sorted(cantidades)
+
+    with transaction.atomic():
+        productos = {
+            producto.id: producto
+            for producto in Producto.objects.select_for_update()
+            .filter(id__in=ids)
+            .order_by('id')
+            .only('id', 'nombre', 'stock')
+        }
+
+        # Validar todas las líneas a la vez
+        if len(productos) != len(ids):
+            raise ValueError("Uno de los productos del carrito ya no existe")
+        sin_stock = [productos[pid].nombre for pid in ids if productos[pid].stock < cantidades[pid]]
+        if sin_stock:
+            raise StockInsuficiente(f"Stock insuficiente para {', '.join(sin_stock)}")
+
+        total = sum(cantidad * precio for cantidad, precio in carrito.values())
+        pedido = Pedido.objects.create(
+            usuario=usuario,
+            total=total,
+            direccion_entrega=direccion_entrega,
+            observaciones=observaciones,
+            estado='PENDIENTE'
+        )
+
+        # Descontar stock de todos los productos en un solo UPDATE
+        Producto.objects.filter(id__in=ids).update(
+            stock=Case(
+                *[When(id=pid, then=F('stock') - cantidades[pid]) for pid in ids],
+                default=F('stock'),
+            )
+        )
+        transaction.on_commit(invalidar_catalogo)
+
+        DetallePedido.objects.bulk_create([
+            DetallePedido(
+                pedido=pedido,
+                producto_id=pid,
+                cantidad=cantidades[pid],
+                precio_unitario=carrito[pid][1],
+                subtotal=carrito[pid][1] * cantidades[pid],
+            )
+            for pid in ids
+        ])
+
+        descripcion = f"Venta - Pedido #{pedido.id} - Cliente: {usuario.username}"
+        MovimientoInventario.objects.bulk_create([
+            MovimientoInventario(
+                producto_id=pid,
+                tipo='SALIDA',
+                cantidad=cantidades[pid],
+                usuario=usuario,
+                pedido=pedido,
+                descripcion=descripcion,
+            )
+            for pid in ids
+        ])
+        acumular(dia_de(), 'SALIDA', cantidades)
+
+    return pedido
@@ -0,0 +1,141 @@
+import math
+from datetime import timedelta
+from statistics import NormalDist
+
+import numpy as np
+
+from .models import Producto, Proveedor, ResumenDiario
+from .resumen import dia_de
+
+
+# =========================
+# PRONÓSTICO DE DEMANDA Y PUNTO DE REORDEN
+# =========================
+# Las ventas diarias de cada producto (salidas del resumen diario de los
+# últimos ``ventana`` días) se cargan en una matriz productos x días y todo
+# el cálculo se hace sobre columnas de NumPy, sin recorrer productos en
+# Python:
+#   - demanda diaria: media móvil de la ventana o suavizado exponencial
+#     simple (promedio ponderado con pesos alfa * (1 - alfa)^edad),
+#   - stock de seguridad: z(nivel de servicio) * desviación diaria * raíz del plazo,
+#   - punto de reorden: demanda * plazo + stock de seguridad,
+#   - días de cobertura: stock / demanda,
+#   - cantidad sugerida: lo que falta para cubrir plazo + revisión días más
+#     el stock de seguridad, solo para productos en o bajo su punto de reorden.
+# NumPy es una dependencia opcional del proyecto: sin ella este módulo no se
+# puede importar y la vista y el comando lo indican.
+
+METODOS = ('media', 'exponencial')
+
+
+def _ventas_diarias(ids, desde, dias):
+    """Matriz float32 (productos x días) con las unidades vendidas, en cero donde no hubo ventas."""
+    ventas = np.zeros((len(ids), dias), dtype=np.float32)
+    filas = ResumenDiario.objects.filter(tipo='SALIDA', dia__gte=desde).values_list('producto_id', 'dia', 'unidades')
+    datos = np.array(
+        [(pid, (dia - desde).days, unidades) for pid, dia, unidades in filas.iterator(chunk_size=10000)],
+        dtype=np.int64,
+    ).reshape(-1, 3)
+    if len(datos):
+        # Los ids vienen ordenados: la fila de cada producto sale de una búsqueda binaria
+        posiciones = np.searchsorted(ids, datos[:, 0])
+        validas = (posiciones < len(ids)) & (ids[np.minimum(posiciones, len(ids) - 1)] == datos[:, 0])
+        np.add.at(ventas, (posiciones[validas], datos[validas, 1]), datos[validas, 2])
+    return ventas
+
+
+def _demanda(ventas, metodo, alfa):
+    if metodo == 'media':
+        return ventas.mean(axis=1)
+    # Suavizado exponencial simple: el día más reciente pesa alfa, el anterior alfa*(1-alfa)...
+    edades = np.arange(ventas.shape[1] - 1, -1, -1)
+    pesos = alfa * (1 - alfa) ** edades
+    return ventas @ (pesos / pesos.sum()).astype(np.float32)
+
+
+def calcular(ventana=90, metodo='media', alfa=0.3, plazo=7, revision=30, servicio=0.95):
+    """
+    Pronóstico para todo el catálogo. Devuelve un diccionario de arreglos
+    alineados por producto (ids, stock, proveedor, demanda, desviacion,
+    seguridad, reorden, cobertura, sugerido) más los parámetros usados.
+    """
+    if metodo not in METODOS:
+        raise ValueError(f"Método no válido: {metodo}")
+    if ventana < 2 or plazo < 0 or revision < 0 or not 0 < alfa <= 1 or not 0.5 <= servicio < 1:
+        raise ValueError("Parámetros de pronóstico fuera de rango")
+
+    productos = Producto.objects.order_by('id').values_list('id', 'stock', 'proveedor_id')
+    catalogo = np.array(
+        [(pid, stock, proveedor_id or 0) for pid, stock, proveedor_id in productos.iterator(chunk_size=10000)],
+        dtype=np.int64,
+    ).reshape(-1, 3)
+    ids, stock, proveedor = catalogo[:, 0], catalogo[:, 1], catalogo[:, 2]
+
+    hoy = dia_de()
+    ventas = _ventas_diarias(ids, hoy - timedelta(days=ventana - 1), ventana)
+
+    demanda = _demanda(ventas, metodo, alfa)
+    desviacion = ventas.std(axis=1, ddof=1)
+    z = NormalDist().inv_cdf(servicio)
+    seguridad = z * desviacion * math.sqrt(plazo)
+    reorden = demanda * plazo + seguridad
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cobertura = np.where(demanda > 0, stock / demanda, np.inf)
+    objetivo = demanda * (plazo + revision) + seguridad
+    sugerido = np.where(
+        (stock <= reorden) & (demanda > 0),
+        np.ceil(np.maximum(objetivo - stock, 0)),
+        0,
+    ).astype(np.int64)
+
+    return {
+        'ids': ids, 'stock': stock, 'proveedor': proveedor, 'demanda': demanda,
+        'desviacion': desviacion, 'seguridad': seguridad, 'reorden': reorden,
+        'cobertura': cobertura, 'sugerido': sugerido,
+        'parametros': {
+            'ventana': ventana, 'metodo': metodo, 'alfa': alfa, 'plazo': plazo,
+            'revision': revision, 'servicio': servicio, 'hasta': hoy,
+        },
+    }
+
+
+def sugerencias_por_proveedor(resultado):
+    """
+    Productos a pedir agrupados por proveedor, del más urgente (menos días
+    de cobertura) al menos urgente. Los productos sin proveedor van en un
+    grupo con proveedor None.
+    """
+    seleccion = np.flatnonzero(resultado['sugerido'] > 0)
+    if not len(seleccion):
+        return []
+    # Orden por proveedor y, dentro de cada uno, por cobertura
+    seleccion = seleccion[np.lexsort((resultado['cobertura'][seleccion], resultado['proveedor'][seleccion]))]
+
+    ids = resultado['ids'][seleccion].tolist()
+    nombres = dict(Producto.objects.filter(id__in=ids).values_list('id', 'nombre'))
+    proveedores = {p.id: p for p in Proveedor.objects.filter(id__in=set(resultado['proveedor'][seleccion].tolist()))}
+
+    grupos = {}
+    for i in seleccion.tolist():
+        proveedor_id = int(resultado['proveedor'][i])
+        grupo = grupos.setdefault(proveedor_id, {
+            'proveedor': proveedores.get(proveedor_id), 'lineas': [], 'unidades': 0,
+        })
+        cobertura = float(resultado['cobertura'][i])
+        grupo['lineas'].append({
+            'producto_id': int(resultado['ids'][i]),
+            'nombre': nombres.get(int(resultado['ids'][i]), ''),
+            'stock': int(resultado['stock'][i]),
+            'demanda_diaria': round(float(resultado['demanda'][i]), 2),
+            'stock_seguridad': math.ceil(resultado['seguridad'][i]),
+            'punto_reorden': math.ceil(resultado['reorden'][i]),
+            'dias_cobertura': round(cobertura, 1),
+            'sugerido': int(resultado['sugerido'][i]),
+        })
+        grupo['unidades'] += int(resultado['sugerido'][i])
+
+    # Primero los proveedores con el producto más urgente; sin proveedor al final
+    return sorted(
+        grupos.values(),
+        key=lambda g: (g['proveedor'] is None, g['lineas'][0]['dias_cobertura']),
+    )
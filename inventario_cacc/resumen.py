@@ -0,0 +1,211 @@
+from datetime import datetime, time, timedelta
+
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, F, Max, Min, Q, Sum, Value, When
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import MovimientoInventario, ResumenDiario
+
+
+# =========================
+# RESUMEN DIARIO DE MOVIMIENTOS
+# =========================
+# Cada movimiento suma sus unidades (y cuenta uno) en la fila
+# (producto, día, tipo) de resumen_movimiento_diario, en la misma transacción
+# que lo crea o lo elimina. Las estadísticas y las gráficas leen de esta
+# tabla, así que su costo depende de días x productos y no del tamaño del
+# historial. Las columnas son con signo a propósito: revertir un movimiento
+# anterior a la última reconstrucción no debe hacer fallar la eliminación;
+# el comando reconstruir_resumen deja la tabla otra vez igual al historial.
+# Los ajustes de conciliación (ajuste=True) no son entradas ni salidas reales
+# y quedan fuera del resumen, de las estadísticas y del pronóstico.
+# Los totales de la página de movimientos se cachean TTL_ESTADISTICAS
+# segundos y se descartan en cuanto se confirma un cambio en el resumen.
+
+DIAS_POR_TRAMO = 31
+LOTE_RECONSTRUCCION = 2000
+TTL_ESTADISTICAS = 60
+CLAVE_ESTADISTICAS = 'resumen:estadisticas'
+
+
+def dia_de(fecha=None):
+    """Día (en la zona horaria del proyecto) al que pertenece un movimiento."""
+    return timezone.localdate(fecha)
+
+
+def acumular(dia, tipo, unidades, signo=1):
+    """
+    Suma (signo=1) o resta (signo=-1) en el resumen del día y tipo dados.
+    ``unidades`` es {producto_id: cantidad} y cada producto cuenta como un
+    movimiento. Debe llamarse dentro de la transacción del movimiento.
+    """
+    if not unidades:
+        return
+    transaction.on_commit(invalidar_estadisticas)
+    filas = ResumenDiario.objects.filter(dia=dia, tipo=tipo)
+    # Lectura con bloqueo: ve las filas que otra transacción acaba de confirmar
+    existentes = set(
+        filas.select_for_update().filter(producto_id__in=unidades).values_list('producto_id', flat=True)
+    )
+
+    if existentes:
+        filas.filter(producto_id__in=existentes).update(
+            unidades=F('unidades') + Case(
+                *[When(producto_id=pid, then=Value(signo * unidades[pid])) for pid in sorted(existentes)],
+                default=Value(0),
+            ),
+            movimientos=F('movimientos') + signo,
+        )
+        if signo < 0:
+            filas.filter(producto_id__in=existentes, movimientos__lte=0).delete()
+
+    # Restar de una fila que no existe no tiene sentido: ese movimiento nunca se contó
+    faltantes = {pid: cantidad for pid, cantidad in unidades.items() if pid not in existentes}
+    if not faltantes or signo < 0:
+        return
+    try:
+        with transaction.atomic():
+            ResumenDiario.objects.bulk_create([
+                ResumenDiario(producto_id=pid, dia=dia, tipo=tipo, unidades=cantidad, movimientos=1)
+                for pid, cantidad in sorted(faltantes.items())
+            ])
+    except IntegrityError:
+        # Otra transacción creó alguna de las filas entre la lectura y el INSERT
+        acumular(dia, tipo, faltantes)
+
+
+def registrar(movimiento):
+    if movimiento.ajuste:
+        return
+    acumular(dia_de(movimiento.fecha), movimiento.tipo, {movimiento.producto_id: movimiento.cantidad})
+
+
+def descontar(movimiento):
+    if movimiento.ajuste:
+        return
+    acumular(dia_de(movimiento.fecha), movimiento.tipo, {movimiento.producto_id: movimiento.cantidad}, signo=-1)
+
+
+# =========================
+# LECTURAS
+# =========================
+def _clave_estadisticas(hoy):
+    return f'{CLAVE_ESTADISTICAS}:{hoy.isoformat()}'
+
+
+def invalidar_estadisticas():
+    cache.delete(_clave_estadisticas(dia_de()))
+
+
+def estadisticas_movimientos(hoy=None):
+    """Entradas, salidas y movimientos del día en una sola consulta sobre el resumen (cacheada)."""
+    hoy = hoy or dia_de()
+    clave = _clave_estadisticas(hoy)
+    estadisticas = cache.get(clave)
+    if estadisticas is None:
+        totales = ResumenDiario.objects.aggregate(
+            entradas=Sum('movimientos', filter=Q(tipo='ENTRADA')),
+            salidas=Sum('movimientos', filter=Q(tipo='SALIDA')),
+            hoy=Sum('movimientos', filter=Q(dia=hoy)),
+        )
+        estadisticas = {nombre: valor or 0 for nombre, valor in totales.items()}
+        cache.set(clave, estadisticas, TTL_ESTADISTICAS)
+    return estadisticas
+
+
+def serie_diaria(desde, hasta, producto_id=None):
+    """
+    Unidades y movimientos por día entre ``desde`` y ``hasta`` (incluidos),
+    con los días sin actividad en cero.
+    """
+    filas = ResumenDiario.objects.filter(dia__range=(desde, hasta))
+    if producto_id:
+        filas = filas.filter(producto_id=producto_id)
+    agregados = {
+        (dia, tipo): (unidades, movimientos)
+        for dia, tipo, unidades, movimientos in filas.order_by()
+        .values_list('dia', 'tipo')
+        .annotate(Sum('unidades'), Sum('movimientos'))
+    }
+
+    serie = []
+    dia = desde
+    while dia <= hasta:
+        entradas = agregados.get((dia, 'ENTRADA'), (0, 0))
+        salidas = agregados.get((dia, 'SALIDA'), (0, 0))
+        serie.append({
+            'dia': dia.isoformat(),
+            'unidades_entrada': entradas[0],
+            'unidades_salida': salidas[0],
+            'entradas': entradas[1],
+            'salidas': salidas[1],
+        })
+        dia += timedelta(days=1)
+    return serie
+
+
+# =========================
+# RECONSTRUCCIÓN
+# =========================
+def _inicio_del_dia(dia):
+    return timezone.make_aware(datetime.combine(dia, time.min))
+
+
+def reconstruir(desde=None, hasta=None):
+    """
+    Rehace el resumen a partir del historial, por tramos de DIAS_POR_TRAMO
+    días (cada tramo en su propia transacción). Sin fechas cubre todo el
+    historial. Devuelve el número de filas escritas.
+    """
+    escritas = reconstruir_con(MovimientoInventario, ResumenDiario, desde, hasta)
+    invalidar_estadisticas()
+    return escritas
+
+
+def reconstruir_con(MovimientoInventario, ResumenDiario, desde=None, hasta=None, excluir_ajustes=True):
+    """
+    reconstruir() sobre los modelos indicados (los históricos en una
+    migración). excluir_ajustes=False es para los modelos anteriores a la
+    columna ajuste.
+    """
+    movimientos = MovimientoInventario.objects.all()
+    if excluir_ajustes:
+        movimientos = movimientos.filter(ajuste=False)
+    if desde is None or hasta is None:
+        rango = movimientos.aggregate(primero=Min('fecha'), ultimo=Max('fecha'))
+        if rango['primero'] is None:
+            # Historial vacío: no debe quedar nada en el resumen
+            sobrantes = ResumenDiario.objects.all()
+            if desde:
+                sobrantes = sobrantes.filter(dia__gte=desde)
+            if hasta:
+                sobrantes = sobrantes.filter(dia__lte=hasta)
+            sobrantes.delete()
+            return 0
+        desde = desde or dia_de(rango['primero'])
+        hasta = hasta or dia_de(rango['ultimo'])
+
+    escritas = 0
+    tramo = desde
+    while tramo <= hasta:
+        fin = min(tramo + timedelta(days=DIAS_POR_TRAMO - 1), hasta)
+        with transaction.atomic():
+            ResumenDiario.objects.filter(dia__range=(tramo, fin)).delete()
+            agregados = (
+                movimientos
+                .filter(fecha__gte=_inicio_del_dia(tramo), fecha__lt=_inicio_del_dia(fin + timedelta(days=1)))
+                .annotate(dia=TruncDate('fecha'))
+                .order_by()
+                .values_list('producto_id', 'dia', 'tipo')
+                .annotate(Sum('cantidad'), Count('id'))
+            )
+            filas = [
+                ResumenDiario(producto_id=pid, dia=dia, tipo=tipo, unidades=unidades, movimientos=movimientos)
+                for pid, dia, tipo, unidades, movimientos in agregados.iterator()
+            ]
+            ResumenDiario.objects.bulk_create(filas, batch_size=LOTE_RECONSTRUCCION)
+            escritas += len(filas)
+        tramo = fin + timedelta(days=1)
+    return escritas
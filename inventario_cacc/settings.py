@@ -41,6 +41,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'inventario_cacc.estaticos.EstaticosMiddleware',
+    'inventario_cacc.instrumentacion.InstrumentacionMiddleware',
+    'inventario_cacc.enrutador.ReplicasMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -75,17 +78,70 @@ WSGI_APPLICATION = 'inventario_cacc.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# El backend inventario_cacc.bd_mysql es el de MySQL de Django con un pool de
+# conexiones por proceso (OPTIONS['pool']); requiere CONN_MAX_AGE = 0 porque
+# cada petición devuelve su conexión al pool al terminar.
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.mysql',
+        'ENGINE': 'inventario_cacc.bd_mysql',
         'NAME': 'inventario_db',
         'USER': 'root',
         'PASSWORD': 'root',
         'HOST': 'localhost',
-        'PORT': '3306'
-    }
+        'PORT': '3306',
+        'CONN_MAX_AGE': 0,
+        'OPTIONS': {
+            'pool': {
+                'min_size': 2,
+                'max_size': 20,
+                'timeout': 10,
+                'max_lifetime': 1800,
+                'max_idle': 600,
+                'check_idle': 1,
+            },
+        },
+    },
+    # Réplicas de solo lectura: se declaran aquí y se listan en BD_REPLICAS.
+    # 'replica1': {
+    #     'ENGINE': 'inventario_cacc.bd_mysql',
+    #     'NAME': 'inventario_db',
+    #     'USER': 'lectura',
+    #     'PASSWORD': '...',
+    #     'HOST': 'replica1.local',
+    #     'PORT': '3306',
+    #     'TEST': {'MIRROR': 'default'},
+    # },
+}
+
+# Caché compartida por todos los procesos del servidor: la versión del
+# catálogo, el bloqueo del panel, los conteos cacheados, el conteo y el
+# almacén 'cache' del carrito y el autocompletado dependen de que todos los
+# workers vean los mismos valores. La caché local por proceso (LocMem, la de
+# Django por defecto) no sirve con más de un worker. La tabla la crea la
+# migración 0011 (o python manage.py createcachetable). Con Redis disponible
+# basta cambiar el backend:
+#     'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+#     'LOCATION': 'redis://127.0.0.1:6379/1',
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'cache_compartida',
+        'TIMEOUT': 300,
+        'OPTIONS': {
+            # Al llegar al máximo se descarta 1/CULL_FREQUENCY de las
+            # entradas; alto para no perder carritos del almacén 'cache'
+            'MAX_ENTRIES': 200000,
+            'CULL_FREQUENCY': 10,
+        },
+    },
 }
 
+# Las peticiones de solo lectura usan las réplicas; escrituras, transacciones
+# y los BD_FIJACION_SEGUNDOS siguientes a una escritura del usuario, la primaria
+DATABASE_ROUTERS = ['inventario_cacc.enrutador.EnrutadorReplicas']
+BD_REPLICAS = []
+BD_FIJACION_SEGUNDOS = 5
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -127,6 +183,20 @@ STATICFILES_DIRS = [
     'inventario_cacc/Public/',
 ]
 
+# collectstatic deja aquí los archivos con hash en el nombre, minificados y
+# con sus variantes .gz/.br; EstaticosMiddleware los sirve con caché de un
+# año. Se regenera en cada despliegue con: python manage.py collectstatic
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'inventario_cacc.estaticos.AlmacenEstaticos',
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -136,3 +206,21 @@ import os
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'inventario_cacc/Public/Img')
+
+# Almacén del carrito de compras: 'bd' (tabla carrito_linea) o 'cache'
+# (la caché compartida de CACHES; sus entradas pueden descartarse al llenarse)
+CARRITO_ALMACEN = 'bd'
+
+# Instrumentación por vista: fracción de peticiones medidas (0 la desactiva)
+# y presupuesto de consultas SQL por nombre de vista
+INSTRUMENTACION_MUESTREO = 0.0
+INSTRUMENTACION_PRESUPUESTOS = {
+    'home': 8,
+    'ver_carrito': 8,
+    'mis_pedidos': 10,
+    'movimientos': 10,
+    'pedidos_admin': 8,
+    'clientes': 10,
+    'admin_dashboard': 8,
+    'confirmar_pedido': 15,
+}
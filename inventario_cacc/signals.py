@@ -0,0 +1,57 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .busqueda import indexar_producto, indexar_productos
+from .catalogo import invalidar_catalogo
+from .models import Categoria, Producto, Proveedor
+
+
+# =========================
+# ÍNDICE DE BÚSQUEDA
+# =========================
+# Los productos eliminados salen del índice por el ON DELETE CASCADE de
+# termino_busqueda; al guardar se reindexa solo si cambió algún campo
+# indexado.
+
+CAMPOS_INDEXADOS = {'nombre', 'descripcion', 'categoria', 'categoria_id'}
+
+
+@receiver(post_save, sender=Producto)
+def reindexar_producto(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or CAMPOS_INDEXADOS & set(update_fields):
+        indexar_producto(instance)
+
+
+@receiver(post_save, sender=Categoria)
+def reindexar_categoria(sender, instance, created, **kwargs):
+    if not created:
+        indexar_productos(instance.producto_set.select_related('categoria'))
+
+
+@receiver(pre_delete, sender=Categoria)
+def recordar_productos_categoria(sender, instance, **kwargs):
+    instance._productos_afectados = list(instance.producto_set.values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=Categoria)
+def reindexar_productos_sin_categoria(sender, instance, **kwargs):
+    ids = getattr(instance, '_productos_afectados', [])
+    if ids:
+        indexar_productos(Producto.objects.filter(id__in=ids))
+
+
+# =========================
+# CACHÉ DEL CATÁLOGO
+# =========================
+# Los cambios de stock hechos con UPDATE (stock.py, pedidos.py) no disparan
+# señales; esos módulos invalidan la caché por su cuenta.
+
+@receiver(post_save, sender=Producto)
+@receiver(post_delete, sender=Producto)
+@receiver(post_save, sender=Categoria)
+@receiver(post_delete, sender=Categoria)
+@receiver(post_save, sender=Proveedor)
+@receiver(post_delete, sender=Proveedor)
+def invalidar_cache_catalogo(sender, **kwargs):
+    transaction.on_commit(invalidar_catalogo)
@@ -0,0 +1,74 @@
+from django.db import transaction
+from django.db.models import F
+
+from . import resumen
+from .catalogo import invalidar_catalogo
+from .models import MovimientoInventario, Producto
+
+
+# =========================
+# MUTACIONES DE STOCK
+# =========================
+# El stock nunca se lee, modifica en Python y guarda con save(): cada cambio
+# es un UPDATE condicional sobre la columna stock, de modo que dos operadores
+# simultáneos no pierden actualizaciones y una salida no puede dejar stock
+# negativo.
+
+class StockInsuficiente(ValueError):
+    pass
+
+
+def _ajustar_stock(producto_id, delta):
+    """Suma ``delta`` al stock solo si el resultado no queda negativo."""
+    productos = Producto.objects.filter(id=producto_id)
+    if delta < 0:
+        productos = productos.filter(stock__gte=-delta)
+    if productos.update(stock=F('stock') + delta):
+        transaction.on_commit(invalidar_catalogo)
+        return
+
+    stock_actual = Producto.objects.filter(id=producto_id).values_list('stock', flat=True).first()
+    if stock_actual is None:
+        raise Producto.DoesNotExist
+    raise StockInsuficiente(f"Stock insuficiente. Stock actual: {stock_actual}, cantidad solicitada: {-delta}")
+
+
+def _delta(tipo, cantidad):
+    if cantidad <= 0:
+        raise ValueError("La cantidad debe ser mayor que cero")
+    if tipo == 'ENTRADA':
+        return cantidad
+    if tipo == 'SALIDA':
+        return -cantidad
+    raise ValueError(f"Tipo de movimiento no válido: {tipo}")
+
+
+def registrar_movimiento(producto_id, tipo, cantidad, usuario=None, cliente_id=None, descripcion=None):
+    """Registra una entrada o salida y ajusta el stock en la misma transacción."""
+    delta = _delta(tipo, cantidad)
+    with transaction.atomic():
+        _ajustar_stock(producto_id, delta)
+        movimiento = MovimientoInventario.objects.create(
+            producto_id=producto_id,
+            tipo=tipo,
+            cantidad=cantidad,
+            cliente_id=cliente_id,
+            usuario=usuario,
+            descripcion=descripcion
+        )
+        resumen.registrar(movimiento)
+    return movimiento
+
+
+def revertir_movimiento(movimiento_id):
+    """Elimina un movimiento deshaciendo su efecto sobre el stock."""
+    with transaction.atomic():
+        movimiento = MovimientoInventario.objects.select_for_update().get(id=movimiento_id)
+        _ajustar_stock(movimiento.producto_id, -_delta(movimiento.tipo, movimiento.cantidad))
+        movimiento.delete()
+        resumen.descontar(movimiento)
+    return movimiento
+
+
+def nombre_y_stock(producto_id):
+    return Producto.objects.filter(id=producto_id).values_list('nombre', 'stock').get()
@@ -18,13 +18,15 @@ from django.contrib import admin
 from django.urls import path
 from .views import (
     login_view, home, registro, admin_dashboard, logout_view,
-    productos, crear_producto, editar_producto, eliminar_producto,
+    productos, crear_producto, editar_producto, eliminar_producto, importar_productos,
     categorias, crear_categoria, editar_categoria, eliminar_categoria,
-    proveedores, crear_proveedor, editar_proveedor, eliminar_proveedor,
+    proveedores, crear_proveedor, editar_proveedor, eliminar_proveedor, sugerencias_compra,
     clientes, crear_cliente, editar_cliente, eliminar_cliente,
     movimientos, crear_movimiento, eliminar_movimiento,
     agregar_carrito, ver_carrito, eliminar_del_carrito, actualizar_cantidad_carrito, vaciar_carrito, mis_pedidos, confirmar_pedido, cambiar_estado_pedido,
-    pedidos_admin
+    pedidos_admin, catalogo_estadisticas, instrumentacion_estadisticas, tendencia_movimientos, stock_historico,
+    fragmento_producto, fragmento_producto_editar, fragmento_movimiento, fragmento_pedido, fragmento_pedido_estado,
+    exportar_movimientos, exportar_pedidos, autocompletar
 )
 
 urlpatterns = [
@@ -34,12 +36,17 @@ urlpatterns = [
     path('registro/', registro, name='registro'),
     path('home/', home, name='home'),
     path('admin-dashboard/', admin_dashboard, name='admin_dashboard'),
+    path('catalogo/estadisticas/', catalogo_estadisticas, name='catalogo_estadisticas'),
+    path('instrumentacion/', instrumentacion_estadisticas, name='instrumentacion_estadisticas'),
+    path('autocompletar/<str:tipo>/', autocompletar, name='autocompletar'),
     
     # Productos
     path('productos/', productos, name='productos'),
     path('productos/crear/', crear_producto, name='crear_producto'),
     path('productos/editar/<int:id>/', editar_producto, name='editar_producto'),
     path('productos/eliminar/<int:id>/', eliminar_producto, name='eliminar_producto'),
+    path('productos/importar/', importar_productos, name='importar_productos'),
+    path('productos/stock-historico/', stock_historico, name='stock_historico'),
     
     # Categorías
     path('categorias/', categorias, name='categorias'),
@@ -52,6 +59,7 @@ urlpatterns = [
     path('proveedores/crear/', crear_proveedor, name='crear_proveedor'),
     path('proveedores/editar/<int:id>/', editar_proveedor, name='editar_proveedor'),
     path('proveedores/eliminar/<int:id>/', eliminar_proveedor, name='eliminar_proveedor'),
+    path('proveedores/sugerencias-compra/', sugerencias_compra, name='sugerencias_compra'),
     
     # Clientes
     path('clientes/', clientes, name='clientes'),
@@ -63,6 +71,8 @@ urlpatterns = [
     path('movimientos/', movimientos, name='movimientos'),
     path('movimientos/crear/', crear_movimiento, name='crear_movimiento'),
     path('movimientos/eliminar/<int:id>/', eliminar_movimiento, name='eliminar_movimiento'),
+    path('movimientos/exportar/', exportar_movimientos, name='exportar_movimientos'),
+    path('movimientos/tendencia/', tendencia_movimientos, name='tendencia_movimientos'),
     
     # Carrito y Pedidos
     path('carrito/agregar/', agregar_carrito, name='agregar_carrito'),
@@ -74,4 +84,12 @@ urlpatterns = [
     path('confirmar-pedido/', confirmar_pedido, name='confirmar_pedido'),
     path('pedido/cambiar-estado/<int:pedido_id>/', cambiar_estado_pedido, name='cambiar_estado_pedido'),
     path('pedidos/', pedidos_admin, name='pedidos_admin'),
+    path('pedidos/exportar/', exportar_pedidos, name='exportar_pedidos'),
+    
+    # Fragmentos para modales bajo demanda
+    path('fragmentos/producto/<int:id>/', fragmento_producto, name='fragmento_producto'),
+    path('fragmentos/producto/<int:id>/editar/', fragmento_producto_editar, name='fragmento_producto_editar'),
+    path('fragmentos/movimiento/<int:id>/', fragmento_movimiento, name='fragmento_movimiento'),
+    path('fragmentos/pedido/<int:id>/', fragmento_pedido, name='fragmento_pedido'),
+    path('fragmentos/pedido/<int:id>/estado/', fragmento_pedido_estado, name='fragmento_pedido_estado'),
 ]
@@ -4,6 +4,7 @@ from django.contrib import messages
 from django.contrib.auth.models import User
 from django.contrib.auth.decorators import login_required
 from .models import *
+from .decorators import admin_requerido
 
 #region login
 def login_view(request):
@@ -30,7 +31,7 @@ def login_view(request):
         messages.error(request, "Usuario o contraseña incorrectos.")
         return redirect("login")
 
-    return render(request, "auth/login.html")
+    return render(request, "Auth/login.html")
 
 def registro(request):
     if request.method == "POST":
@@ -51,7 +52,7 @@ def registro(request):
         messages.success(request, "Cuenta creada correctamente. Ahora puedes iniciar sesión.")
         return redirect("login")
 
-    return render(request, "auth/registro.html")
+    return render(request, "Auth/registro.html")
 
 #endregion
 
@@ -60,13 +61,10 @@ def registro(request):
 @login_required
 def productos(request):
     productos = Producto.objects.all().select_related('categoria', 'proveedor')
-    categorias = Categoria.objects.all()
-    proveedores = Proveedor.objects.all()
     
+    # Categoría y proveedor del formulario se eligen con autocompletado
     context = {
         'productos': productos,
-        'categorias': categorias,
-        'proveedores': proveedores,
     }
     return render(request, 'Productos/productos.html', context)
 
@@ -129,6 +127,39 @@ def editar_producto(request, id):
     
     return redirect("productos")
 
+@admin_requerido
+def importar_productos(request):
+    if request.method == "POST":
+        import csv
+        from . import importar
+
+        archivo = request.FILES.get("archivo")
+        if not archivo:
+            messages.error(request, "Seleccione un archivo CSV o JSON.")
+            return redirect("productos")
+
+        formato = request.POST.get("formato")
+        if formato not in ("csv", "json"):
+            formato = "json" if archivo.name.lower().endswith((".json", ".jsonl")) else "csv"
+
+        try:
+            resultado = importar.importar_productos(
+                archivo, formato, crear_faltantes=bool(request.POST.get("crear_faltantes")),
+                usuario=request.user,
+            )
+        except (UnicodeDecodeError, ValueError, csv.Error) as e:
+            messages.error(request, f"No se pudo leer el archivo: {str(e)}")
+            return redirect("productos")
+
+        if resultado.creados or resultado.actualizados:
+            messages.success(request, f"Importación terminada: {resultado}.")
+        for fila, mensaje in resultado.errores[:10]:
+            messages.warning(request, f"Fila {fila}: {mensaje}")
+        if resultado.total_errores > 10:
+            messages.warning(request, f"... y {resultado.total_errores - 10} errores más.")
+
+    return redirect("productos")
+
 #endregion
 
 
@@ -242,13 +273,79 @@ def editar_proveedor(request, id):
     
     return redirect("proveedores")
 
+@admin_requerido
+def sugerencias_compra(request):
+    parametros = {
+        'metodo': request.GET.get('metodo', 'media'),
+        'ventana': request.GET.get('ventana', '90'),
+        'plazo': request.GET.get('plazo', '7'),
+        'revision': request.GET.get('revision', '30'),
+        'servicio': request.GET.get('servicio', '0.95'),
+    }
+    grupos = []
+    productos_pronosticados = 0
+    try:
+        from .pronostico import calcular, sugerencias_por_proveedor
+        resultado = calcular(
+            ventana=int(parametros['ventana']),
+            metodo=parametros['metodo'],
+            plazo=int(parametros['plazo']),
+            revision=int(parametros['revision']),
+            servicio=float(parametros['servicio']),
+        )
+        grupos = sugerencias_por_proveedor(resultado)
+        productos_pronosticados = len(resultado['ids'])
+    except ImportError:
+        messages.error(request, "El pronóstico necesita la librería NumPy instalada en el servidor.")
+    except ValueError as e:
+        messages.error(request, f"Parámetros no válidos: {str(e)}")
+    
+    context = {
+        'grupos': grupos,
+        'parametros': parametros,
+        'productos_pronosticados': productos_pronosticados,
+    }
+    return render(request, 'Proveedores/sugerencias_compra.html', context)
+
 @login_required
 def clientes(request):
-    clientes = Cliente.objects.all()
+    from django.core.paginator import Paginator
+    from django.db.models import Count, Max, Q, Sum
+    
+    buscar = request.GET.get('buscar', '').strip()
+    
+    clientes_query = Cliente.objects.order_by('nombre', 'id')
+    if buscar:
+        clientes_query = clientes_query.filter(
+            Q(nombre__icontains=buscar) | Q(email__icontains=buscar) | Q(telefono__icontains=buscar)
+        )
+    
+    paginator = Paginator(clientes_query, 50)
+    pagina = paginator.get_page(request.GET.get('page'))
+    
+    # Compras de los clientes de la página en un solo GROUP BY
+    compras = {
+        fila['cliente_id']: fila
+        for fila in MovimientoInventario.objects.filter(cliente_id__in=[c.id for c in pagina])
+        .values('cliente_id')
+        .annotate(num_compras=Count('id'), unidades=Sum('cantidad'), ultima_compra=Max('fecha'))
+        .order_by()
+    }
+    for cliente in pagina:
+        fila = compras.get(cliente.id, {})
+        cliente.num_compras = fila.get('num_compras', 0)
+        cliente.unidades = fila.get('unidades') or 0
+        cliente.ultima_compra = fila.get('ultima_compra')
+    
+    total_clientes = Cliente.objects.count() if buscar else paginator.count
     total_usuarios = Perfil.objects.filter(rol=2).count()
     context = {
-        'clientes': clientes,
-        'total_usuarios': total_usuarios
+        'clientes': pagina,
+        'pagina': pagina,
+        'buscar': buscar,
+        'total_clientes': total_clientes,
+        'total_usuarios': total_usuarios,
+        'total_general': total_clientes + total_usuarios,
     }
     return render(request, 'Clientes/clientes.html', context)
 
@@ -307,82 +404,76 @@ def eliminar_cliente(request, id):
 
 @login_required
 def movimientos(request):
-    from django.utils import timezone
-    from datetime import datetime
-    
-    # Obtener filtros
-    tipo_filtro = request.GET.get('tipo')
-    producto_filtro = request.GET.get('producto')
-    fecha_desde = request.GET.get('fecha_desde')
-    fecha_hasta = request.GET.get('fecha_hasta')
-    
-    # Query inicial
-    movimientos_query = MovimientoInventario.objects.all().select_related('producto', 'cliente', 'usuario')
-    
-    # Aplicar filtros
-    if tipo_filtro:
-        movimientos_query = movimientos_query.filter(tipo=tipo_filtro)
-    if producto_filtro:
-        movimientos_query = movimientos_query.filter(producto_id=producto_filtro)
-    if fecha_desde:
-        movimientos_query = movimientos_query.filter(fecha__gte=fecha_desde)
-    if fecha_hasta:
-        fecha_hasta_dt = datetime.strptime(fecha_hasta, '%Y-%m-%d')
-        fecha_hasta_dt = fecha_hasta_dt.replace(hour=23, minute=59, second=59)
-        movimientos_query = movimientos_query.filter(fecha__lte=fecha_hasta_dt)
-    
-    movimientos_query = movimientos_query.order_by('-fecha')
-    
-    # Estadísticas
-    total_entradas = MovimientoInventario.objects.filter(tipo='ENTRADA').count()
-    total_salidas = MovimientoInventario.objects.filter(tipo='SALIDA').count()
-    movimientos_hoy = MovimientoInventario.objects.filter(fecha__date=timezone.now().date()).count()
+    from urllib.parse import urlencode
+    from .paginacion import paginar_keyset, decodificar_cursor
+    from .conteos import conteo_aproximado, conteo_cacheado, clave_filtros
+    from .resumen import estadisticas_movimientos
+    from .filtros import leer_filtros, consulta_movimientos, CAMPOS_MOVIMIENTOS
+    
+    # Obtener y aplicar filtros
+    filtros = leer_filtros(request.GET, CAMPOS_MOVIMIENTOS)
+    movimientos_query = consulta_movimientos(filtros)
+    
+    # Paginación por cursor sobre (fecha, id)
+    pagina = paginar_keyset(
+        movimientos_query,
+        despues=decodificar_cursor(request.GET.get('despues')),
+        antes=decodificar_cursor(request.GET.get('antes')),
+    )
+    
+    # Estadísticas desde el resumen diario; el total, aproximado o cacheado
+    estadisticas = estadisticas_movimientos()
+    if any(filtros.values()):
+        total_movimientos = conteo_cacheado(clave_filtros('movimientos', filtros), movimientos_query)
+        total_aproximado = False
+    else:
+        total_movimientos = conteo_aproximado(MovimientoInventario)
+        total_aproximado = True
     
     context = {
-        'movimientos': movimientos_query,
-        'productos': Producto.objects.all(),
-        'clientes': Cliente.objects.all(),
-        'total_entradas': total_entradas,
-        'total_salidas': total_salidas,
-        'movimientos_hoy': movimientos_hoy,
+        'movimientos': pagina,
+        'pagina': pagina,
+        'filtros_qs': urlencode({k: v for k, v in filtros.items() if v}),
+        # Producto y cliente se eligen con autocompletado; solo hace falta el filtrado
+        'producto_filtrado': Producto.objects.filter(id=filtros['producto']).first() if filtros['producto'] else None,
+        'total_entradas': estadisticas['entradas'],
+        'total_salidas': estadisticas['salidas'],
+        'movimientos_hoy': estadisticas['hoy'],
+        'total_movimientos': total_movimientos,
+        'total_aproximado': total_aproximado,
     }
     return render(request, 'Movimientos/movimientos.html', context)
 
 @login_required
 def crear_movimiento(request):
+    from .stock import registrar_movimiento, nombre_y_stock, StockInsuficiente
+    
     if request.method == "POST":
         tipo = request.POST.get("tipo")
-        producto_id = request.POST.get("producto")
-        cantidad = int(request.POST.get("cantidad"))
+        try:
+            producto_id = int(request.POST.get("producto"))
+            cantidad = int(request.POST.get("cantidad"))
+        except (TypeError, ValueError):
+            messages.error(request, "Seleccione un producto e indique una cantidad válida.")
+            return redirect("movimientos")
         cliente_id = request.POST.get("cliente")
         descripcion = request.POST.get("descripcion")
         
         try:
-            producto = Producto.objects.get(id=producto_id)
-            
-            # Validar stock para salidas
-            if tipo == 'SALIDA' and producto.stock < cantidad:
-                messages.error(request, f"Stock insuficiente. Stock actual: {producto.stock}, cantidad solicitada: {cantidad}")
-                return redirect("movimientos")
-            
-            # Crear movimiento
-            MovimientoInventario.objects.create(
-                producto=producto,
-                tipo=tipo,
-                cantidad=cantidad,
-                cliente_id=cliente_id if cliente_id else None,
+            # Crear movimiento y actualizar stock de forma atómica
+            registrar_movimiento(
+                producto_id,
+                tipo,
+                cantidad,
                 usuario=request.user,
+                cliente_id=cliente_id if cliente_id else None,
                 descripcion=descripcion
             )
+            nombre, stock = nombre_y_stock(producto_id)
             
-            # Actualizar stock
-            if tipo == 'ENTRADA':
-                producto.stock += cantidad
-            else:  # SALIDA
-                producto.stock -= cantidad
-            producto.save()
-            
-            messages.success(request, f"Movimiento registrado exitosamente. Nuevo stock de {producto.nombre}: {producto.stock}")
+            messages.success(request, f"Movimiento registrado exitosamente. Nuevo stock de {nombre}: {stock}")
+        except StockInsuficiente as e:
+            messages.error(request, str(e))
         except Producto.DoesNotExist:
             messages.error(request, "El producto no existe.")
         except Exception as e:
@@ -392,21 +483,17 @@ def crear_movimiento(request):
 
 @login_required
 def eliminar_movimiento(request, id):
+    from .stock import revertir_movimiento, nombre_y_stock, StockInsuficiente
+    
     if request.method == "POST":
         try:
-            movimiento = MovimientoInventario.objects.get(id=id)
-            producto = movimiento.producto
-            
-            # Revertir el cambio en el stock
-            if movimiento.tipo == 'ENTRADA':
-                producto.stock -= movimiento.cantidad
-            else:  # SALIDA
-                producto.stock += movimiento.cantidad
+            # Revertir el cambio en el stock y eliminar el movimiento
+            movimiento = revertir_movimiento(id)
+            nombre, stock = nombre_y_stock(movimiento.producto_id)
             
-            producto.save()
-            movimiento.delete()
-            
-            messages.success(request, f"Movimiento eliminado. Stock actualizado de {producto.nombre}: {producto.stock}")
+            messages.success(request, f"Movimiento eliminado. Stock actualizado de {nombre}: {stock}")
+        except StockInsuficiente as e:
+            messages.error(request, f"No se puede eliminar el movimiento. {e}")
         except MovimientoInventario.DoesNotExist:
             messages.error(request, "El movimiento no existe.")
         except Exception as e:
@@ -423,49 +510,27 @@ from django.views.decorators.http import require_POST
 @login_required
 @require_POST
 def agregar_carrito(request):
+    from .carrito import carrito_de
+    
     producto_id = request.POST.get('producto_id')
     cantidad = int(request.POST.get('cantidad', 1))
     
     try:
-        producto = Producto.objects.get(id=producto_id)
+        producto = Producto.objects.only('id', 'precio', 'stock').get(id=producto_id)
+        carrito = carrito_de(request)
         
-        # Validar stock
-        if producto.stock < cantidad:
+        # Validar stock contando lo que ya está en el carrito
+        if carrito.cantidad(producto.id) + cantidad > producto.stock:
             return JsonResponse({
                 'success': False,
                 'error': f'Stock insuficiente. Solo hay {producto.stock} unidades disponibles.'
             })
         
-        # Obtener o crear carrito en sesión
-        carrito = request.session.get('carrito', {})
-        
-        # Si el producto ya está en el carrito, aumentar cantidad
-        if str(producto_id) in carrito:
-            nueva_cantidad = carrito[str(producto_id)]['cantidad'] + cantidad
-            if nueva_cantidad > producto.stock:
-                return JsonResponse({
-                    'success': False,
-                    'error': f'Stock insuficiente. Solo hay {producto.stock} unidades disponibles.'
-                })
-            carrito[str(producto_id)]['cantidad'] = nueva_cantidad
-        else:
-            # Agregar nuevo producto al carrito
-            carrito[str(producto_id)] = {
-                'nombre': producto.nombre,
-                'precio': float(producto.precio),
-                'cantidad': cantidad,
-            }
-        
-        # Guardar carrito en sesión
-        request.session['carrito'] = carrito
-        request.session.modified = True
-        
-        # Calcular total de items en carrito
-        carrito_count = sum(item['cantidad'] for item in carrito.values())
+        carrito.agregar(producto.id, cantidad, producto.precio)
         
         return JsonResponse({
             'success': True,
-            'carrito_count': carrito_count
+            'carrito_count': carrito.conteo()
         })
         
     except Producto.DoesNotExist:
@@ -475,75 +540,91 @@ def agregar_carrito(request):
         })
 
 @login_required
-def ver_carrito(request):
-    carrito = request.session.get('carrito', {})
+async def ver_carrito(request):
+    from .carrito import acarrito_de
+    
+    lineas = await (await acarrito_de(request)).alineas()
+    nombres = {
+        producto_id: nombre
+        async for producto_id, nombre in Producto.objects.filter(id__in=lineas).values_list('id', 'nombre')
+    }
+    
+    carrito = {
+        producto_id: {
+            'nombre': nombres.get(producto_id, 'Producto no disponible'),
+            'precio': precio,
+            'cantidad': cantidad,
+        }
+        for producto_id, (cantidad, precio) in lineas.items()
+    }
     
     # Calcular totales
-    total = sum(item['precio'] * item['cantidad'] for item in carrito.values())
-    carrito_count = sum(item['cantidad'] for item in carrito.values())
+    total = sum(cantidad * precio for cantidad, precio in lineas.values())
+    carrito_count = sum(cantidad for cantidad, precio in lineas.values())
     
     context = {
         'carrito': carrito,
         'total': total,
         'carrito_count': carrito_count,
     }
-    return render(request, 'Home/carrito.html', context)
+    return await _render_async(request, 'Home/carrito.html', context)
 
 @login_required
 def eliminar_del_carrito(request, producto_id):
-    carrito = request.session.get('carrito', {})
+    from .carrito import carrito_de
     
-    if str(producto_id) in carrito:
-        del carrito[str(producto_id)]
-        request.session['carrito'] = carrito
-        request.session.modified = True
-        messages.success(request, "Producto eliminado del carrito")
+    carrito_de(request).quitar(producto_id)
+    messages.success(request, "Producto eliminado del carrito")
     
     return redirect('ver_carrito')
 
 @login_required
 def actualizar_cantidad_carrito(request, producto_id):
+    from .carrito import carrito_de
+    
     if request.method == "POST":
         cantidad = int(request.POST.get('cantidad', 1))
-        carrito = request.session.get('carrito', {})
+        carrito = carrito_de(request)
         
-        if str(producto_id) in carrito and cantidad > 0:
+        if cantidad > 0 and carrito.cantidad(producto_id):
             # Validar stock
-            try:
-                producto = Producto.objects.get(id=producto_id)
-                if cantidad <= producto.stock:
-                    carrito[str(producto_id)]['cantidad'] = cantidad
-                    request.session['carrito'] = carrito
-                    request.session.modified = True
-                    messages.success(request, "Cantidad actualizada")
-                else:
-                    messages.error(request, f"Stock insuficiente. Solo hay {producto.stock} unidades disponibles.")
-            except Producto.DoesNotExist:
+            stock = Producto.objects.filter(id=producto_id).values_list('stock', flat=True).first()
+            if stock is None:
                 messages.error(request, "Producto no encontrado")
+            elif cantidad <= stock:
+                carrito.fijar(producto_id, cantidad)
+                messages.success(request, "Cantidad actualizada")
+            else:
+                messages.error(request, f"Stock insuficiente. Solo hay {stock} unidades disponibles.")
     
     return redirect('ver_carrito')
 
 @login_required
 def vaciar_carrito(request):
-    request.session['carrito'] = {}
-    request.session.modified = True
+    from .carrito import carrito_de
+    
+    carrito_de(request).vaciar()
     messages.success(request, "Carrito vaciado")
     return redirect('ver_carrito')
 
 @login_required
-def mis_pedidos(request):
-    from .models import Pedido
+async def mis_pedidos(request):
+    from .filtros import consulta_mis_pedidos
+    from .carrito import acarrito_de
     
-    pedidos = Pedido.objects.filter(usuario=request.user).prefetch_related('detallepedido_set__producto').order_by('-fecha')
+    usuario = await request.auser()
+    pedidos = [
+        pedido async for pedido in
+        consulta_mis_pedidos(usuario.id).prefetch_related('detallepedido_set__producto')
+    ]
     
-    # Estadísticas
-    total_pedidos = pedidos.count()
-    pedidos_pendientes = pedidos.filter(estado='PENDIENTE').count()
-    pedidos_entregados = pedidos.filter(estado='ENTREGADO').count()
+    # Estadísticas sobre los pedidos ya cargados
+    total_pedidos = len(pedidos)
+    pedidos_pendientes = sum(1 for pedido in pedidos if pedido.estado == 'PENDIENTE')
+    pedidos_entregados = sum(1 for pedido in pedidos if pedido.estado == 'ENTREGADO')
     
     # Contador del carrito
-    carrito = request.session.get('carrito', {})
-    carrito_count = sum(item['cantidad'] for item in carrito.values())
+    carrito_count = await (await acarrito_de(request)).aconteo()
     
     context = {
         'pedidos': pedidos,
@@ -552,17 +633,18 @@ def mis_pedidos(request):
         'pedidos_entregados': pedidos_entregados,
         'carrito_count': carrito_count,
     }
-    return render(request, 'Pedidos/pedidos.html', context)
+    return await _render_async(request, 'Pedidos/pedidos.html', context)
 
 @login_required
 def confirmar_pedido(request):
-    from .models import Pedido, DetallePedido
-    from django.db import transaction
+    from .pedidos import procesar_pedido
+    from .carrito import carrito_de
     
     if request.method == "POST":
-        carrito = request.session.get('carrito', {})
+        carrito = carrito_de(request)
+        lineas = carrito.lineas()
         
-        if not carrito:
+        if not lineas:
             messages.error(request, "El carrito está vacío")
             return redirect('ver_carrito')
         
@@ -570,57 +652,13 @@ def confirmar_pedido(request):
         observaciones = request.POST.get('observaciones')
         
         try:
-            with transaction.atomic():
-                # Calcular total
-                total = sum(item['precio'] * item['cantidad'] for item in carrito.values())
-                
-                # Crear pedido
-                pedido = Pedido.objects.create(
-                    usuario=request.user,
-                    total=total,
-                    direccion_entrega=direccion_entrega,
-                    observaciones=observaciones,
-                    estado='PENDIENTE'
-                )
-                
-                # Crear detalles, actualizar stock y registrar movimientos
-                for producto_id, item in carrito.items():
-                    producto = Producto.objects.select_for_update().get(id=producto_id)
-                    
-                    # Validar stock
-                    if producto.stock < item['cantidad']:
-                        raise ValueError(f"Stock insuficiente para {producto.nombre}")
-                    
-                    # Crear detalle del pedido
-                    subtotal = item['precio'] * item['cantidad']
-                    DetallePedido.objects.create(
-                        pedido=pedido,
-                        producto=producto,
-                        cantidad=item['cantidad'],
-                        precio_unitario=item['precio'],
-                        subtotal=subtotal
-                    )
-                    
-                    # Actualizar stock
-                    producto.stock -= item['cantidad']
-                    producto.save()
-                    
-                    # Registrar movimiento de inventario (SALIDA)
-                    MovimientoInventario.objects.create(
-                        producto=producto,
-                        tipo='SALIDA',
-                        cantidad=item['cantidad'],
-                        usuario=request.user,
-                        pedido=pedido,  # Relacionar con el pedido
-                        descripcion=f"Venta - Pedido #{pedido.id} - Cliente: {request.user.username}"
-                    )
-                
-                # Vaciar carrito
-                request.session['carrito'] = {}
-                request.session.modified = True
-                
-                messages.success(request, f"¡Pedido #{pedido.id} realizado exitosamente! Te contactaremos pronto.")
-                return redirect('mis_pedidos')
+            pedido = procesar_pedido(request.user, lineas, direccion_entrega, observaciones)
+            
+            # Vaciar carrito
+            carrito.vaciar()
+            
+            messages.success(request, f"¡Pedido #{pedido.id} realizado exitosamente! Te contactaremos pronto.")
+            return redirect('mis_pedidos')
                 
         except ValueError as e:
             messages.error(request, str(e))
@@ -655,97 +693,259 @@ def cambiar_estado_pedido(request, pedido_id):
 @login_required
 def pedidos_admin(request):
     from .models import Pedido
-    from django.utils import timezone
-    from datetime import datetime
-    
-    # Obtener filtros
-    estado_filtro = request.GET.get('estado')
-    fecha_desde = request.GET.get('fecha_desde')
-    fecha_hasta = request.GET.get('fecha_hasta')
-    
-    # Query inicial
-    pedidos_query = Pedido.objects.all().prefetch_related('detallepedido_set__producto', 'usuario').order_by('-fecha')
-    
-    # Aplicar filtros
-    if estado_filtro:
-        pedidos_query = pedidos_query.filter(estado=estado_filtro)
-    if fecha_desde:
-        pedidos_query = pedidos_query.filter(fecha__gte=fecha_desde)
-    if fecha_hasta:
-        fecha_hasta_dt = datetime.strptime(fecha_hasta, '%Y-%m-%d')
-        fecha_hasta_dt = fecha_hasta_dt.replace(hour=23, minute=59, second=59)
-        pedidos_query = pedidos_query.filter(fecha__lte=fecha_hasta_dt)
-    
-    # Estadísticas
-    total_pedidos = Pedido.objects.count()
-    pedidos_pendientes = Pedido.objects.filter(estado='PENDIENTE').count()
-    pedidos_proceso = Pedido.objects.filter(estado='EN_PROCESO').count()
-    pedidos_entregados = Pedido.objects.filter(estado='ENTREGADO').count()
+    from django.db.models import Count
+    from urllib.parse import urlencode
+    from .paginacion import paginar_keyset, decodificar_cursor
+    from .filtros import leer_filtros, consulta_pedidos, items_por_pedido, CAMPOS_PEDIDOS
+    
+    # Obtener y aplicar filtros
+    filtros = leer_filtros(request.GET, CAMPOS_PEDIDOS)
+    pedidos_query = consulta_pedidos(filtros)
+    
+    # Paginación por cursor sobre (fecha, id)
+    pagina = paginar_keyset(
+        pedidos_query,
+        despues=decodificar_cursor(request.GET.get('despues')),
+        antes=decodificar_cursor(request.GET.get('antes')),
+    )
+    
+    # Artículos de los pedidos de la página en un solo GROUP BY; agruparlos
+    # en la consulta paginada impediría usar el índice (fecha, id) para ordenar
+    items = dict(items_por_pedido([p.id for p in pagina]))
+    for pedido in pagina:
+        pedido.num_items = items.get(pedido.id, 0)
+    
+    # Estadísticas: un solo GROUP BY por estado
+    por_estado = dict(Pedido.objects.order_by().values_list('estado').annotate(total=Count('id')))
     
     context = {
-        'pedidos': pedidos_query,
-        'total_pedidos': total_pedidos,
-        'pedidos_pendientes': pedidos_pendientes,
-        'pedidos_proceso': pedidos_proceso,
-        'pedidos_entregados': pedidos_entregados,
+        'pedidos': pagina,
+        'pagina': pagina,
+        'filtros_qs': urlencode({k: v for k, v in filtros.items() if v}),
+        'total_pedidos': sum(por_estado.values()),
+        'pedidos_pendientes': por_estado.get('PENDIENTE', 0),
+        'pedidos_proceso': por_estado.get('EN_PROCESO', 0) + por_estado.get('PROCESANDO', 0),
+        'pedidos_entregados': por_estado.get('ENTREGADO', 0),
     }
     return render(request, 'Pedidos/pedidos_admin.html', context)
 #endregion
 
 
 #region home
+async def _render_async(request, plantilla, context):
+    # La plantilla usa request.user: se resuelve antes de renderizar para que
+    # el render (síncrono) no tenga que consultar la base desde el event loop
+    request.user = await request.auser()
+    return render(request, plantilla, context)
+
 @login_required
-def home(request):
+async def home(request):
     # Obtener parámetros de búsqueda y filtros
     buscar = request.GET.get('buscar', '')
     categoria_id = request.GET.get('categoria', '')
     orden = request.GET.get('orden', '')
     
-    # Query inicial - solo productos con stock
-    productos = Producto.objects.filter(stock__gt=0).select_related('categoria', 'proveedor')
-    
-    # Aplicar búsqueda
-    if buscar:
-        productos = productos.filter(nombre__icontains=buscar)
-    
-    # Aplicar filtro de categoría
-    if categoria_id:
-        productos = productos.filter(categoria_id=categoria_id)
-    
-    # Aplicar ordenamiento
-    if orden:
-        productos = productos.order_by(orden)
-    else:
-        productos = productos.order_by('nombre')
-    
-    # Obtener todas las categorías para el filtro
-    categorias = Categoria.objects.all()
+    # Productos con stock y categorías, desde la caché del catálogo
+    from .catalogo import aobtener_catalogo, atarjetas_catalogo
+    catalogo = await aobtener_catalogo(buscar, categoria_id, orden)
+    tarjetas = await atarjetas_catalogo(catalogo, filtrado=bool(buscar or categoria_id))
     
     # Obtener contador del carrito
-    carrito = request.session.get('carrito', {})
-    carrito_count = sum(item['cantidad'] for item in carrito.values())
+    from .carrito import acarrito_de
+    carrito_count = await (await acarrito_de(request)).aconteo()
     
     context = {
-        'productos': productos,
-        'categorias': categorias,
+        'productos': catalogo['productos'],
+        'categorias': catalogo['categorias'],
+        'tarjetas': tarjetas,
         'carrito_count': carrito_count,
     }
-    return render(request, 'Home/home.html', context)
+    return await _render_async(request, 'Home/home.html', context)
 
 def logout_view(request):
     logout(request)
     return redirect('login')
 
 @login_required
-def admin_dashboard(request):
+async def admin_dashboard(request):
+    from .dashboard import ametricas_dashboard
+    context = await ametricas_dashboard()
+    return await _render_async(request, "Home/dashboard_admin.html", context)
+
+@admin_requerido
+def catalogo_estadisticas(request):
+    from .catalogo import cache_catalogo
+    return JsonResponse(cache_catalogo.estadisticas())
+
+@admin_requerido
+def tendencia_movimientos(request):
+    from datetime import timedelta
+    from .resumen import dia_de, serie_diaria
+    
+    try:
+        dias = min(max(int(request.GET.get('dias', 30)), 1), 366)
+        producto_id = int(request.GET.get('producto') or 0)
+    except ValueError:
+        return JsonResponse({'error': 'Parámetros no válidos'}, status=400)
+    
+    hasta = dia_de()
+    desde = hasta - timedelta(days=dias - 1)
+    return JsonResponse({
+        'desde': desde.isoformat(),
+        'hasta': hasta.isoformat(),
+        'producto': producto_id or None,
+        'serie': serie_diaria(desde, hasta, producto_id),
+    })
+
+@admin_requerido
+def stock_historico(request):
+    from datetime import date
+    from .historico import fin_del_dia, stock_en, stock_por_categoria_en
+    
+    try:
+        dia = date.fromisoformat(request.GET.get('fecha', ''))
+        categoria_id = int(request.GET.get('categoria') or 0)
+        producto_id = int(request.GET.get('producto') or 0)
+    except ValueError:
+        return JsonResponse({'error': 'Indique fecha=AAAA-MM-DD y filtros numéricos'}, status=400)
+    
+    momento = fin_del_dia(dia)
+    productos = Producto.objects.all()
+    if producto_id:
+        productos = productos.filter(id=producto_id)
+    if categoria_id:
+        productos = productos.filter(categoria_id=categoria_id)
+    
+    # Sin filtros, totales por categoría; con filtros, el detalle por producto
+    if producto_id or categoria_id:
+        stocks = stock_en(momento, productos)
+        nombres = dict(productos.filter(id__in=stocks).values_list('id', 'nombre'))
+        filas = [{'id': pid, 'nombre': nombres[pid], 'stock': stock} for pid, stock in sorted(stocks.items())]
+        return JsonResponse({'momento': momento.isoformat(), 'productos': filas, 'total': sum(stocks.values())})
+    
+    totales = stock_por_categoria_en(momento, productos)
+    nombres = dict(Categoria.objects.values_list('id', 'nombre'))
+    filas = [
+        {'id': cid, 'nombre': nombres.get(cid, 'Sin categoría'), 'stock': stock}
+        for cid, stock in sorted(totales.items(), key=lambda item: item[0] or 0)
+    ]
+    return JsonResponse({'momento': momento.isoformat(), 'categorias': filas, 'total': sum(totales.values())})
+
+@admin_requerido
+def instrumentacion_estadisticas(request):
+    from .instrumentacion import acumulador, resumen
+    from .bd_mysql.pool import estadisticas_pools
+    
+    # Incluir lo que este proceso aún no ha volcado
+    acumulador.volcar()
+    filas = resumen(MetricaVista.objects.order_by('-tiempo_ms'))
+    return JsonResponse({'vistas': filas, 'pools': estadisticas_pools()})
+
+#endregion
+
+
+#region exportaciones
+@admin_requerido
+def exportar_movimientos(request):
+    from .exportar import respuesta_exportacion
+    from .filtros import leer_filtros, CAMPOS_MOVIMIENTOS
+    return respuesta_exportacion('movimientos', request.GET.get('formato'), leer_filtros(request.GET, CAMPOS_MOVIMIENTOS))
+
+@admin_requerido
+def exportar_pedidos(request):
+    from .exportar import respuesta_exportacion
+    from .filtros import leer_filtros, CAMPOS_PEDIDOS
+    return respuesta_exportacion('pedidos', request.GET.get('formato'), leer_filtros(request.GET, CAMPOS_PEDIDOS))
+#endregion
+
+
+#region autocompletar
+@login_required
+def autocompletar(request, tipo):
+    from .autocompletar import sugerencias, FUENTES, LIMITE_SUGERENCIAS, TTL_SUGERENCIAS
+    from django.utils.cache import patch_cache_control
+    
+    if tipo not in FUENTES:
+        return JsonResponse({'error': 'Tipo de autocompletado no válido'}, status=404)
+    try:
+        limite = int(request.GET.get('limite') or LIMITE_SUGERENCIAS)
+    except ValueError:
+        return JsonResponse({'error': 'El límite debe ser numérico'}, status=400)
+    
+    response = JsonResponse({'resultados': sugerencias(tipo, request.GET.get('q', ''), limite)})
+    patch_cache_control(response, private=True, max_age=TTL_SUGERENCIAS)
+    return response
+#endregion
+
+
+#region fragmentos
+import hashlib
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import etag
+
+def _etag_de(*partes):
+    return hashlib.md5(repr(partes).encode()).hexdigest()
+
+def _fragmento(request, plantilla, context):
+    # Sin caché compartida y siempre revalidando con el ETag
+    response = render(request, plantilla, context)
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+def _etag_producto(request, id):
+    # La versión del catálogo cambia con cualquier producto, categoría,
+    # proveedor o movimiento de stock, así que sirve de ETag sin consultar la BD.
+    from .catalogo import version_catalogo
+    return _etag_de('producto', id, request.path, version_catalogo())
+
+def _etag_movimiento(request, id):
+    from .catalogo import version_catalogo
+    return _etag_de('movimiento', id, version_catalogo())
+
+def _etag_pedido(request, id):
+    from .catalogo import version_catalogo
+    fila = Pedido.objects.filter(id=id).values_list('estado', 'direccion_entrega', 'observaciones', 'usuario__email').first()
+    return _etag_de('pedido', id, fila, request.path, version_catalogo())
+
+@login_required
+@etag(_etag_producto)
+def fragmento_producto(request, id):
+    producto = get_object_or_404(Producto.objects.select_related('categoria', 'proveedor'), id=id)
+    return _fragmento(request, 'Fragmentos/producto_detalle.html', {'producto': producto})
+
+@admin_requerido
+@etag(_etag_producto)
+def fragmento_producto_editar(request, id):
+    producto = get_object_or_404(Producto.objects.select_related('categoria', 'proveedor'), id=id)
+    return _fragmento(request, 'Fragmentos/producto_editar.html', {'producto': producto})
+
+@admin_requerido
+@etag(_etag_movimiento)
+def fragmento_movimiento(request, id):
+    movimiento = get_object_or_404(
+        MovimientoInventario.objects.select_related('producto', 'cliente', 'usuario'), id=id
+    )
+    return _fragmento(request, 'Fragmentos/movimiento_detalle.html', {'movimiento': movimiento})
+
+@login_required
+@etag(_etag_pedido)
+def fragmento_pedido(request, id):
+    pedido = get_object_or_404(Pedido.objects.select_related('usuario'), id=id)
+    es_admin = request.user.is_superuser or Perfil.objects.filter(user=request.user, rol=1).exists()
+    if pedido.usuario_id != request.user.id and not es_admin:
+        raise Http404
     context = {
-        "total_categorias": Categoria.objects.count(),
-        "total_proveedores": Proveedor.objects.count(),
-        "total_productos": Producto.objects.count(),
-        "total_clientes": Cliente.objects.count(),
-        "total_usuarios": Perfil.objects.filter(rol=2).count(),  # Usuarios clientes del sistema
-        "movimientos": MovimientoInventario.objects.order_by('-fecha')[:10],
+        'pedido': pedido,
+        'detalles': pedido.detallepedido_set.select_related('producto'),
+        'es_admin': es_admin,
     }
-    return render(request, "Home/dashboard_admin.html", context)
+    return _fragmento(request, 'Fragmentos/pedido_detalle.html', context)
 
-#endregion
\ No newline at end of file
+@admin_requerido
+@etag(_etag_pedido)
+def fragmento_pedido_estado(request, id):
+    pedido = get_object_or_404(Pedido.objects.select_related('usuario'), id=id)
+    return _fragmento(request, 'Fragmentos/pedido_estado.html', {'pedido': pedido})
+#endregion